@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+בנייה מחדש של טבלת daily_stats (rollup לדוחות המהירים) מתוך orders ו-shifts
+
+שימוש:
+    python backfill_daily_stats.py              # כל ההיסטוריה
+    python backfill_daily_stats.py 01.04.2025   # רק מתאריך זה והלאה
+
+יש להריץ פעם אחת אחרי db/migrations/003_daily_stats.sql, ובכל פעם שרוצים לתקן סטייה.
+עדיף להריץ כשאין משמרת פתוחה - הזמנה שמושלמת בזמן ה-backfill עלולה להיספר פעמיים.
+"""
+
+import asyncio
+import datetime
+import sys
+import os
+
+# הוספת הנתיב לפרויקט
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.db import backfill_daily_stats_async, async_db_client
+
+
+async def backfill(since=None):
+    """בנייה מחדש של daily_stats"""
+    print(f"🚀 מתחיל backfill של daily_stats {'מ-' + since.strftime('%d.%m.%Y') if since else '(כל ההיסטוריה)'}...")
+    try:
+        await backfill_daily_stats_async(since)
+    finally:
+        await async_db_client.aclose()
+    print("🎉 backfill הושלם!")
+
+
+if __name__ == "__main__":
+    since = None
+    if len(sys.argv) > 1:
+        since = datetime.datetime.strptime(sys.argv[1], "%d.%m.%Y")
+    asyncio.run(backfill(since))
@@ -1,10 +1,14 @@
-import logging, os, signal, sys
+import asyncio, logging, os, signal, sys
 import telegram
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, Defaults, ContextTypes
 from config.config import *
 from funcs.bot_funcs import *
 from funcs.admin_funcs import *
-from db.db import if_table
+from db.db import if_table, async_db_client, order_index, product_catalog
+from funcs.report_store import precomputed_reports
+from funcs.worker_client import worker_pool
+from funcs.outbound_scheduler import outbound_scheduler
+from funcs.webhook import run_bot
 from config.translations import t, get_user_lang
 from handlers.new_order_handler import NEW_ORDER_HANDLER
 from handlers.edit_product_handler import EDIT_PRODUCT_HANDLER
@@ -20,7 +24,6 @@ from handlers.change_links_handler import CHANGE_LINK_HANDLER
 from handlers.make_tg_session_handler import MAKE_TG_SESSION_HANDLER
 from handlers.new_order_handler import collect_username
 from handlers.manage_stock_handler import MANAGE_STOCK_HANDLER, manage_stock, list_products, edit_product, delete_product_confirm, delete_product_execute
-from db.db import initialize_default_settings
 
 # Global variable to store the application
 bot_application = None
@@ -32,6 +35,24 @@ def signal_handler(signum, frame):
         bot_application.stop()
     sys.exit(0)
 
+async def close_db_pool(application: Application) -> None:
+    """Close the shared Supabase HTTP connection pool on shutdown."""
+    for table, stats in async_db_client.get_select_stats().items():
+        logging.info("select %s: %d calls, %d coalesced", table, stats['calls'], stats['coalesced'])
+    await precomputed_reports.stop()
+    await worker_pool.stop()
+    await async_db_client.aclose()
+    logging.info("✅ Supabase connection pool closed")
+
+async def start_background_jobs(application: Application) -> None:
+    """Start precomputing the week / daily-profit reports (job_queue, or an asyncio task without it),
+    build the orders search index and connect the worker accounts in the background.
+    The products catalog is loaded before the first update - sync pickers never load it in the loop."""
+    await product_catalog.load_async()
+    precomputed_reports.start(application)
+    asyncio.get_running_loop().create_task(order_index.ensure_loaded_async())
+    worker_pool.start()
+
 # Register signal handlers
 signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
@@ -43,17 +64,16 @@ def main() -> None:
     # Using Supabase - tables managed in cloud
     print("✅ Using Supabase - tables managed in cloud")
     
-    # Initialize bot settings if needed
-    initialize_default_settings()
+    # bot_settings are initialized once in __main__ (initialize_default_settings loads the settings snapshot)
     # Create the Application and pass it your bot's token.
-    application = Application.builder().token(BOT_TOKEN).concurrent_updates(True).build()
+    application = Application.builder().token(BOT_TOKEN).concurrent_updates(UPDATE_CONCURRENCY).rate_limiter(outbound_scheduler).post_init(start_background_jobs).post_shutdown(close_db_pool).build()
     bot_application = application  # Store globally for signal handler
     # Health log on startup for Railway
     import logging, os
     logging.getLogger(__name__).setLevel(logging.INFO)
     logging.info("Bot starting...")
     logging.info("ENV set: %s", ','.join(sorted([k for k in os.environ.keys() if k in {
-        'BOT_TOKEN','ADMIN_CHAT','ORDER_CHAT','API_ID','API_HASH','DB_NAME','DB_DIR','DB_PATH'
+        'BOT_TOKEN','ADMIN_CHAT','ORDER_CHAT','API_ID','API_HASH','DB_NAME','DB_DIR','DB_PATH','WEBHOOK_URL'
     }])))
 
     # Language Selection
@@ -90,7 +110,7 @@ def main() -> None:
 
     application.add_handler(CallbackQueryHandler(del_roles, pattern="del_o|del_c|del_s"))
     application.add_handler(CallbackQueryHandler(delete_staff_user, pattern="del_*[0-9]"))
-    application.add_handler(CallbackQueryHandler(show_week_report, pattern="week_report"))
+    application.add_handler(CallbackQueryHandler(show_week_report, pattern=WEEK_REPORT_CALLBACK))
     application.add_handler(CallbackQueryHandler(all_orders, pattern="all_orders"))
     application.add_handler(CallbackQueryHandler(filter_orders_by_param, pattern="fdate|fproduct|fclient|fstatus"))
     application.add_handler(CallbackQueryHandler(manage_roles, pattern="manage_roles"))
@@ -98,7 +118,7 @@ def main() -> None:
     
     # Schedule weekly report (only if job_queue is available)
     if application.job_queue:
-        application.job_queue.run_daily(show_week_report, time=datetime.time(hour=12), days=(6,),)
+        application.job_queue.run_daily(send_week_report_to_admins, time=datetime.time(hour=12), days=(6,),)
 
     # CONVERSATION HANDLERS - MUST BE BEFORE MESSAGE HANDLERS AND NAVIGATION HANDLERS!
     application.add_handler(MANAGE_STOCK_HANDLER)
@@ -137,11 +157,12 @@ def main() -> None:
 
     application.add_handler(CallbackQueryHandler(show_cleanup_tip, pattern="cleanup"))
     application.add_handler(CallbackQueryHandler(dump_choose_format, pattern="dump"))
-    application.add_handler(CallbackQueryHandler(dump_database, pattern="json|xlsx"))
+    application.add_handler(CallbackQueryHandler(dump_database, pattern="json|xlsx|ndjson_gz"))
 
     application.add_handler(CallbackQueryHandler(quick_reports, pattern='quick_reports'))
     application.add_handler(CallbackQueryHandler(show_daily_profit_options, pattern='daily_profit'))
-    application.add_handler(CallbackQueryHandler(daily_profit_report, pattern='profit_today|profit_yesterday'))
+    application.add_handler(CallbackQueryHandler(daily_profit_report, pattern='profit_today|profit_yesterday|profit_[0-9]+'))
+    application.add_handler(CallbackQueryHandler(set_report_window, pattern='report_window_[0-9]+'))
     application.add_handler(CallbackQueryHandler(report_by_product, pattern='report_by_product'))
     application.add_handler(CallbackQueryHandler(report_by_client, pattern='report_by_client'))
     application.add_handler(CallbackQueryHandler(report_by_price, pattern='report_by_price'))
@@ -171,7 +192,7 @@ def main() -> None:
         """Handle errors gracefully, especially conflicts and network issues."""
         error = context.error
         
-        # Handle Telegram API conflicts (multiple bot instances)
+        # Handle Telegram API conflicts (multiple bot instances polling - use WEBHOOK_URL to avoid them)
         if isinstance(error, telegram.error.Conflict):
             logging.warning("⚠️ Conflict detected - another bot instance may be running")
         
@@ -189,8 +210,8 @@ def main() -> None:
     
     application.add_error_handler(error_handler)
     
-    # Run the bot until the user presses Ctrl-C
-    application.run_polling()
+    # Run the bot until the user presses Ctrl-C - webhook if WEBHOOK_URL is set, otherwise polling
+    run_bot(application)
 
 
 if __name__ == "__main__":
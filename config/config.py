@@ -22,6 +22,16 @@ BOT_TOKEN = os.getenv('BOT_TOKEN', '')
 API_ID = os.getenv('API_ID', '')
 API_HASH = os.getenv('API_HASH', '')
 
+# Webhook (אופציונלי): עם WEBHOOK_URL טלגרם דוחף updates לבוט במקום run_polling - funcs/webhook.py
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '').rstrip('/')  # https://<service>.up.railway.app
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram').strip('/')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')  # ריק = נגזר מ-BOT_TOKEN
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('PORT') or os.getenv('WEBHOOK_PORT') or 8080)  # Railway נותן PORT
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))  # חיבורים במקביל מטלגרם (1-100)
+WEBHOOK_RECORD_FILE = os.getenv('WEBHOOK_RECORD_FILE', '')  # שמירת updates נכנסים (JSONL) ל-webhook_selftest.py
+UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', '256'))  # updates שמטופלים במקביל
+
 # רשימת מנהלים ראשית - מ-ENV (קבועה)
 try:
     ADMINS = list(map(int, os.getenv("ADMINS", "").split(","))) if os.getenv("ADMINS") else []
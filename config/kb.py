@@ -1,7 +1,7 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from enum import Enum
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from db.db import *
 
 class Notifications(Enum):
@@ -10,10 +10,14 @@ class Notifications(Enum):
 
 async def get_all_active_orders_to_msg_kb():
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
-    all_orders = db_client.select('orders')
-    orders = [o for o in all_orders if o.get('status') in ['active', 'delay', 'pending']]
+    orders = await async_db_client.select(
+        'orders',
+        {'status': ('in', ['active', 'delay', 'pending'])},
+        order='id',
+        columns='id,client_username',
+    )
 
     if orders:
         mrkp = InlineKeyboardMarkup(
@@ -40,14 +44,13 @@ async def build_start_menu(user_id):
     logger.info(f"🔧 build_start_menu() called for user {user_id}")
 
     # Using Supabase only
-    from db.db import db_client, get_opened_shift
+    from db.db import get_user_by_id_async, get_opened_shift_async
 
-    users = db_client.select('users', {'user_id': user_id})
-    user = users[0] if users else None
+    user = await get_user_by_id_async(user_id)
     logger.info(f"👤 User data loaded: {user}")
 
     # Check for open shift using the centralized function
-    shift = get_opened_shift()
+    shift = await get_opened_shift_async()
     logger.info(f"🔧 Shift check result: {shift is not None}")
 
     # Get user's language
@@ -78,8 +81,8 @@ async def build_start_menu(user_id):
         elif user_role == 'stockman':
             inline_keyboard = inline_keyboard[-1:]
         elif user_role == 'courier':  # CRITICAL FIX: Use 'courier' (Role.RUNNER.value) not 'runner'!
-            from db.db import get_bot_setting
-            order_chat = get_bot_setting('order_chat') or links.ORDER_CHAT
+            from db.db import get_bot_setting_async
+            order_chat = await get_bot_setting_async('order_chat') or links.ORDER_CHAT
             logger.info(f"🚚 Courier order_chat: {order_chat}")
             if order_chat:
                 inline_keyboard=[
@@ -132,9 +135,9 @@ ADD_MORE_PRODUCTS_OR_CONFIRM_KB = get_add_more_or_confirm_kb('ru')
 
 def get_products_markup(user):
     # Using Supabase only
-    from db.db import db_client
+    from db.db import product_catalog
     
-    products = db_client.select('products')
+    products = product_catalog.all()
     
     inline_keyboard = []
     delimiter = []
@@ -171,10 +174,10 @@ def get_products_markup(user):
 
 def get_products_markup_left_edit_stock(lang='ru'):
     # Using Supabase only
-    from db.db import db_client
+    from db.db import product_catalog
     from config.translations import t
     
-    products = db_client.select('products')
+    products = product_catalog.all()
     
     inline_keyboard = []
     delimiter = []
@@ -210,9 +213,9 @@ def get_products_markup_left_edit_stock(lang='ru'):
 
 def get_products_markup_left_edit_stock_crude(lang='ru'):
     # Using Supabase only
-    from db.db import db_client
+    from db.db import product_catalog
     
-    products = db_client.select('products')
+    products = product_catalog.all()
     
     inline_keyboard = []
     delimiter = []
@@ -338,15 +341,15 @@ def show_tg_session_action_kb(sess_id: str, lang='ru'):
 
     return SESS_ACT_KB
 
-def create_tg_sessions_kb(lang='ru'):
-    # Using Supabase only
-    from db.db import db_client
+async def create_tg_sessions_kb_async(lang='ru'):
+    # Using Supabase only - one awaitable select, split on is_worker here
+    from db.db import async_db_client
     
-    tgsessions = db_client.select('tgsessions', {'is_worker': False})
-    worker_sessions = db_client.select('tgsessions', {'is_worker': True})
-    worker_session = worker_sessions[0] if worker_sessions else None
+    sessions = await async_db_client.select('tgsessions', order='id', columns='id,name,username,is_worker')
+    tgsessions = [sess for sess in sessions if not sess.get('is_worker')]
+    worker_sessions = [sess for sess in sessions if sess.get('is_worker')]
 
-    if not tgsessions and not worker_session:
+    if not tgsessions and not worker_sessions:
         inline_keyboard = [
             [InlineKeyboardButton(t('btn_add_account', lang), callback_data='make_tg_session')],
             [InlineKeyboardButton(t("btn_back", lang), callback_data="back"), InlineKeyboardButton(t("btn_home", lang), callback_data="home")]
@@ -355,8 +358,8 @@ def create_tg_sessions_kb(lang='ru'):
 
     inline_keyboard = [[InlineKeyboardButton(f'{sess.get("name", "")[:10]} {sess.get("username", "")[:10]}', callback_data=f'sess_{sess.get("id")}')] for sess in tgsessions]
 
-    if worker_session:
-        inline_keyboard = [[InlineKeyboardButton(f'✅ {worker_session.get("name", "")[:10]} {worker_session.get("username", "")[:10]}', callback_data=f'sess_{worker_session.get("id")}')]] + inline_keyboard
+    # כל חשבונות ה-worker שולחים ללקוחות (funcs/worker_client.py)
+    inline_keyboard = [[InlineKeyboardButton(f'✅ {sess.get("name", "")[:10]} {sess.get("username", "")[:10]}', callback_data=f'sess_{sess.get("id")}')] for sess in worker_sessions] + inline_keyboard
 
     inline_keyboard = [[InlineKeyboardButton(t('btn_add', lang), callback_data='make_tg_session')]] + inline_keyboard
     inline_keyboard.append([InlineKeyboardButton(t("btn_back", lang), callback_data="back"), InlineKeyboardButton(t("btn_home", lang), callback_data="home")])
@@ -481,6 +484,7 @@ def get_db_format_kb(lang='ru'):
         inline_keyboard=[
             [InlineKeyboardButton(t("btn_excel", lang), callback_data="xlsx")],
             [InlineKeyboardButton(t("btn_json", lang), callback_data="json")],
+            [InlineKeyboardButton(t("btn_ndjson_gz", lang), callback_data="ndjson_gz")],
             [InlineKeyboardButton(t("btn_back", lang), callback_data="back"), InlineKeyboardButton(t("btn_home", lang), callback_data="home")],
         ]
     )
@@ -489,9 +493,16 @@ SECURITY_KB = get_security_kb('ru')
 DB_FORMAT_KB = get_db_format_kb('ru')
 
 
-def get_quick_reports_kb(lang='ru'):
+def get_quick_reports_kb(lang='ru', window_days=7, windows=(7, 30, 90, 365)):
+    # שורת בחירת חלון הזמן לדוחות (✅ על החלון הנוכחי)
+    window_row = [
+        InlineKeyboardButton(("✅ " if days == window_days else "") + t("btn_last_n_days", lang).format(days),
+                             callback_data=f"report_window_{days}")
+        for days in windows
+    ]
     return InlineKeyboardMarkup(
         inline_keyboard = [
+            window_row,
             [InlineKeyboardButton(t("daily_profit_report", lang), callback_data='daily_profit')],
             [InlineKeyboardButton(t("report_by_product", lang), callback_data='report_by_product')],
             [InlineKeyboardButton(t("report_by_area", lang), callback_data='report_by_area')],
@@ -558,9 +569,9 @@ ADMIN_ACTION_KB = get_admin_action_kb('ru')
 
 async def form_operator_templates_kb(order: Order, lang: str = 'ru'):
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
-    templates = db_client.select('templates')
+    templates = await async_db_client.select('templates')
 
     inline_keyboard=[
         [InlineKeyboardButton(t('btn_add_template', lang), callback_data="new_shab")],
@@ -596,6 +596,14 @@ TEXTS = {
         "ru": "📅 Вчера",
         "he": "📅 אתמול"
     },
+    "btn_last_n_days": {
+        "ru": "{} дн.",
+        "he": "{} ימים"
+    },
+    "last_n_days": {
+        "ru": "последние {} дн.",
+        "he": "{} הימים האחרונים"
+    },
     "choose_period": {
         "ru": "Выберите период:",
         "he": "בחר תקופה:"
@@ -896,6 +904,18 @@ TEXTS = {
         "ru": "📒 Json",
         "he": "📒 Json"
     },
+    "computed_at": {
+        "ru": "⏱ Обновлено: {}",
+        "he": "⏱ עודכן: {}"
+    },
+    "btn_refresh": {
+        "ru": "🔄 Обновить",
+        "he": "🔄 רענן"
+    },
+    "btn_ndjson_gz": {
+        "ru": "🗜 NDJSON (gzip)",
+        "he": "🗜 NDJSON (gzip)"
+    },
     "btn_export_excel": {
         "ru": "Выгрузить Excel",
         "he": "ייצוא Excel"
@@ -940,6 +960,26 @@ TEXTS = {
         "ru": "Чтобы добавить новый аккаунт, нажмите Добавить. Чтобы назначить аккаунт рабочим для отправки сообщений клиентам, нажмите соответствующую кнопку аккаунта:",
         "he": "כדי להוסיף חשבון חדש, לחץ הוסף. כדי להגדיר חשבון כעובד לשליחת הודעות ללקוחות, לחץ על הכפתור המתאים של החשבון:"
     },
+    "worker_pool_status": {
+        "ru": "<b>Рабочие аккаунты:</b>",
+        "he": "<b>חשבונות עובדים:</b>"
+    },
+    "worker_pool_account": {
+        "ru": "{} {} — отправлено: {}, в очереди: {}",
+        "he": "{} {} — נשלחו: {}, בתור: {}"
+    },
+    "worker_pool_flood_wait": {
+        "ru": "⏳ ограничение Telegram ещё {} сек.",
+        "he": "⏳ הגבלת טלגרם עוד {} שנ׳"
+    },
+    "worker_pool_idle": {
+        "ru": "ещё не подключён",
+        "he": "עדיין לא מחובר"
+    },
+    "workers_throttled": {
+        "ru": "⏳ Все рабочие аккаунты временно ограничены Telegram. Попробуйте через {} сек.",
+        "he": "⏳ כל חשבונות העובדים מוגבלים זמנית ע״י טלגרם. נסו שוב בעוד {} שנ׳."
+    },
     "btn_add_account": {
         "ru": "➕ Добавить",
         "he": "➕ הוסף"
@@ -1090,11 +1130,29 @@ def get_user_lang(user_id: int) -> str:
     Returns:
         קוד השפה ('ru' או 'he')
     """
-    from db.db import db_client
+    from db.db import get_user_by_id
     
-    users = db_client.select('users', {'user_id': user_id})
-    if users and users[0].get('lang'):
-        return users[0]['lang']
+    user = get_user_by_id(user_id)
+    if user and user.get('lang'):
+        return user['lang']
+    return 'ru'  # ברירת מחדל
+
+
+async def get_user_lang_async(user_id: int) -> str:
+    """
+    גרסה אסינכרונית של get_user_lang - לשימוש בתוך handlers (לא חוסמת את ה-event loop)
+
+    Args:
+        user_id: מזהה המשתמש
+
+    Returns:
+        קוד השפה ('ru' או 'he')
+    """
+    from db.db import get_user_by_id_async
+
+    user = await get_user_by_id_async(user_id)
+    if user and user.get('lang'):
+        return user['lang']
     return 'ru'  # ברירת מחדל
 
 # תרגומים חדשים לתיקון דוחות
@@ -0,0 +1,61 @@
+"""
+Cache בזיכרון התהליך - TTL + LRU
+
+הבוט רץ בתהליך אחד, כך שמספיק cache מקומי פשוט כדי לחסוך round trips ל-Supabase
+על נתונים שנקראים בכל לחיצה (תפקיד ושפת משתמש וכו').
+כל כתיבה ל-DB שמשנה נתון שנמצא ב-cache חייבת לקרוא ל-invalidate.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache עם זמן תפוגה (ttl בשניות) ומגבלת גודל (maxsize, LRU)
+
+    - get מחזיר default אם המפתח לא קיים או שפג תוקפו
+    - set מוסיף/מעדכן ומוציא את הפריט שהשתמשו בו הכי מזמן כשעוברים את maxsize
+    - hits / misses לסטטיסטיקה
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
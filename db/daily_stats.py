@@ -0,0 +1,132 @@
+"""
+Rollup יומי (טבלת daily_stats) - בניית שורות מהזמנות וממשמרות
+
+אותן פונקציות משמשות גם לעדכון השוטף (order_ready / confirm_end_shift -> bump_daily_stats)
+וגם ל-backfill מההיסטוריה, כך שהמספרים בדוחות זהים בשני המסלולים.
+ראה db/migrations/003_daily_stats.sql למבנה הטבלה.
+"""
+import datetime
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from .order_items import order_items
+
+
+COUNTER_FIELDS = ('orders', 'quantity', 'revenue', 'shifts', 'brutto', 'netto',
+                  'operator_paid', 'runner_paid', 'petrol_paid')
+
+
+def stat_day(value: Any) -> Optional[str]:
+    """'YYYY-MM-DD' מתוך datetime / date / מחרוזת ISO (None אם אין תאריך)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def number(value: Any):
+    """מספר מ-PostgREST (numeric יכול לחזור כ-float) - int כשאין חלק עשרוני"""
+    if not value:
+        return 0
+    if isinstance(value, str):
+        value = float(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def client_key(name: Any, username: Any, phone: Any) -> str:
+    return json.dumps([name or '', username or '', phone or ''], ensure_ascii=False)
+
+
+def parse_client_key(key: str) -> tuple:
+    try:
+        name, username, phone = json.loads(key)
+        return name, username, phone
+    except (ValueError, TypeError):
+        return key, '', ''
+
+
+def _summary(value: Any) -> Dict[str, dict]:
+    if isinstance(value, str):
+        if not value.strip():
+            return {}
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def order_stat_rows(order: dict) -> List[dict]:
+    """שורות daily_stats להזמנה שהושלמה (לפי יום ה-delivered)"""
+    day = stat_day(order.get('delivered'))
+    if not day:
+        return []
+
+    products = order_items(order.get('products'))
+    revenue = sum(number(product.get('total_price')) for product in products)
+    rows = [
+        {'day': day, 'dimension': 'total', 'key': '', 'orders': 1, 'revenue': revenue},
+        {'day': day, 'dimension': 'client', 'orders': 1,
+         'key': client_key(order.get('client_name'), order.get('client_username'), order.get('client_phone'))},
+    ]
+    for product in products:
+        if not product.get('name'):
+            continue
+        rows.append({'day': day, 'dimension': 'product', 'key': product['name'],
+                     'quantity': number(product.get('quantity')), 'revenue': number(product.get('total_price'))})
+    return rows
+
+
+def shift_stat_rows(shift: dict) -> List[dict]:
+    """שורות daily_stats למשמרת שנסגרה (לפי יום ה-closed_time)"""
+    day = stat_day(shift.get('closed_time'))
+    if not day:
+        return []
+
+    rows = [{
+        'day': day, 'dimension': 'total', 'key': '', 'shifts': 1,
+        'brutto': number(shift.get('brutto')),
+        'netto': number(shift.get('netto')),
+        'operator_paid': number(shift.get('operator_paid')),
+        'runner_paid': number(shift.get('runner_paid')),
+        'petrol_paid': number(shift.get('petrol_paid')),
+    }]
+    for product_name, data in _summary(shift.get('summary')).items():
+        if not isinstance(data, dict):
+            continue
+        rows.append({'day': day, 'dimension': 'shift_product', 'key': product_name,
+                     'quantity': number(data.get('total_quantity')), 'revenue': number(data.get('total_price'))})
+    return rows
+
+
+def merge_stat_rows(rows: Iterable[dict]) -> List[dict]:
+    """איחוד שורות עם אותו (dimension, day, key) - סכום המונים"""
+    merged: Dict[tuple, dict] = {}
+    for row in rows:
+        key = (row['dimension'], row['day'], row.get('key', ''))
+        target = merged.setdefault(key, {'day': row['day'], 'dimension': row['dimension'], 'key': key[2]})
+        for field in COUNTER_FIELDS:
+            if row.get(field):
+                target[field] = target.get(field, 0) + row[field]
+    return list(merged.values())
+
+
+def negate_stat_rows(rows: Iterable[dict]) -> List[dict]:
+    """אותן שורות עם מונים שליליים - להורדת הזמנות שנמחקו דרך bump_daily_stats"""
+    return [{**row, **{field: -row[field] for field in COUNTER_FIELDS if row.get(field)}} for row in rows]
+
+
+def sum_by_key(rows: Iterable[dict], field: str) -> Dict[str, Any]:
+    """סכום field לכל key על פני כמה ימים (בסדר ההופעה הראשונה)"""
+    totals: Dict[str, Any] = {}
+    for row in rows:
+        totals[row.get('key', '')] = totals.get(row.get('key', ''), 0) + number(row.get(field))
+    return totals
@@ -5,72 +5,75 @@ from telegram.constants import ParseMode
 from telegram import Update
 from functools import wraps
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 import datetime, json, io
+from dataclasses import dataclass, field
+from typing import Any, Optional
 
 # Import Supabase client
-from .supabase_client import get_supabase_client
+from .supabase_client import get_supabase_client, get_async_supabase_client
+from .cache import TTLCache
+from .settings_store import BotSettingsStore
+from .product_catalog import ProductCatalog
+from .order_index import OrderIndex
+from .shift_summary import ShiftAccumulator, summary_delta
+from .order_items import order_items
+from .daily_stats import order_stat_rows, shift_stat_rows, merge_stat_rows, negate_stat_rows, stat_day
 
 # Initialize Supabase client only
 db_client = get_supabase_client()
+# Async client (pooled keep-alive) - לשימוש בתוך handlers כדי לא לחסום את ה-event loop
+async_db_client = get_async_supabase_client()
 print("✅ Using Supabase database")
 
+# Cache של שורות users לפי user_id - תפקיד ושפה נקראים בכל לחיצה (decorators, get_user_lang, תפריט)
+# חובה לקרוא ל-invalidate_user_cache אחרי כל שינוי בטבלת users
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "300")),
+)
 
-def dump_db(format: str):
-    """
-    Export database to file using Supabase only
-    """
-    try:
-        import pandas as pd
-        from io import BytesIO
-        
-        # List of tables to export
-        tables = ['users', 'products', 'orders', 'shifts', 'tgsessions', 'templates']
-        output = BytesIO()
-
-        if format == "xlsx":
-            filename = f'dump_db_{datetime.datetime.now().strftime("%d_%m_%Y")}.xlsx'
-            output.name = filename
-
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                for table_name in tables:
-                    try:
-                        data = db_client.select(table_name)
-                        if data:
-                            df = pd.DataFrame(data)
-                            df.to_excel(writer, sheet_name=table_name, index=False)
-                        else:
-                            print(f"Table '{table_name}' is empty and will not be added to Excel.")
-                    except Exception as e:
-                        print(f"Error exporting table '{table_name}': {e}")
-
-            output.seek(0)
-            return output
-        else:
-            filename = f'dump_db_{datetime.datetime.now().strftime("%d_%m_%Y")}.json'
-            output.name = filename
+# Snapshot של bot_settings - get_bot_setting קורא מהזיכרון, set_bot_setting כותב דרכו
+settings_store = BotSettingsStore(
+    db_client, async_db_client,
+    refresh_interval=float(os.getenv("BOT_SETTINGS_REFRESH_INTERVAL", "60")),
+)
 
-            all_data = {}
+# קטלוג products בזיכרון (by id / by name) - כל כתיבה למוצרים עוברת דרך insert/update/delete_product_async
+product_catalog = ProductCatalog(
+    db_client, async_db_client,
+    ttl=float(os.getenv("PRODUCT_CATALOG_TTL", "300")),
+)
 
-            for table_name in tables:
-                try:
-                    data = db_client.select(table_name)
-                    if data:
-                        all_data[table_name] = data
-                    else:
-                        print(f"Table '{table_name}' is empty and will not be added to JSON.")
-                except Exception as e:
-                    print(f"Error exporting table '{table_name}': {e}")
+# אינדקס חיפוש הזמנות (client / product / status / created) - כל כתיבה להזמנות מעדכנת אותו (upsert / remove)
+order_index = OrderIndex(
+    async_db_client,
+    ttl=float(os.getenv("ORDER_INDEX_TTL", "3600")),
+)
 
-            # Save data to JSON in byte stream
-            json_data = json.dumps(all_data, ensure_ascii=False, indent=4, default=str)
-            output.write(json_data.encode('utf-8'))
-            output.seek(0)
+# סיכום המוצרים של המשמרת הפתוחה - מתעדכן בכל הזמנה שנמסרת (order_rollup_params_async)
+shift_accumulator = ShiftAccumulator(async_db_client)
 
-            return output
-    except Exception as e:
-        print(f"Error in dump_db: {e}")
-        return None
+
+# טבלאות לייצוא ועמודת ה-keyset של כל אחת (ברירת מחדל: id)
+DUMP_TABLES = ['users', 'products', 'orders', 'shifts', 'tgsessions', 'templates']
+DUMP_TABLE_KEYS = {'users': 'user_id'}
+
+
+async def dump_db(format: str):
+    """
+    Export database to file using Supabase only - streaming (db/dump.py)
+    
+    format: 'json' / 'ndjson_gz' / 'xlsx'. כל הטבלאות נקראות במקביל בעמודים (iter_rows),
+    והקובץ נכתב שורה אחרי שורה ל-SpooledTemporaryFile - הזיכרון לא גדל עם גודל ה-DB.
+    מחזיר (file, filename); הקורא סוגר את הקובץ אחרי השליחה. שגיאה נזרקת לקורא.
+    """
+    from .dump import dump_to_file
+    
+    def iter_table(table_name):
+        return async_db_client.iter_rows(table_name, key=DUMP_TABLE_KEYS.get(table_name, 'id'))
+    
+    return await dump_to_file(DUMP_TABLES, iter_table, format)
 
 
 class Status(Enum):
@@ -82,8 +85,14 @@ class Status(Enum):
 
 
 class ShiftStatus(Enum):
-    opened = "Открыта / פתוחה"
-    closed = "Закрыта / סגורה"
+    # קודים קנוניים שנשמרים ב-shifts.status (התוויות לתצוגה ב-translations)
+    opened = "opened"
+    closed = "closed"
+
+
+# ערכים ישנים שנשמרו ב-shifts.status לפני הקודים הקנוניים (ראה db/migrations/001_canonical_shift_status.sql)
+LEGACY_OPENED_SHIFT_STATUSES = ["Открыта / פתוחה"]
+OPENED_SHIFT_STATUSES = [ShiftStatus.opened.value] + LEGACY_OPENED_SHIFT_STATUSES
 
 
 class Role(Enum):
@@ -92,14 +101,98 @@ class Role(Enum):
     STOCKMAN = "stockman"
     RUNNER = "courier"
     GUEST = "guest"
-# Note: Models are now managed in Supabase, these classes are kept for type hints only
-class User:
-    """User model - Supabase managed"""
-    pass
+# ---------- records ----------
+# שורה מ-Supabase -> record עם __slots__ (dataclass(slots=True)): from_row מפענח timestamps ו-JSON
+# פעם אחת, בלי class חדש לכל שורה. עמודות שלא מוגדרות כאן נשמרות ב-extra ונגישות כ-attribute.
 
-class Product:
-    """Product model - Supabase managed"""
-    pass
+def _parse_timestamp(value):
+    """datetime ממחרוזת ISO; כל ערך אחר (None, datetime) חוזר כמו שהוא"""
+    if isinstance(value, str) and value:
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+def _parse_json(value, default):
+    """list / dict ממחרוזת JSON; default אם ריק, לא תקין או מסוג אחר"""
+    if isinstance(value, str):
+        if not value.strip():
+            return default
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return default
+    return value if isinstance(value, type(default)) else default
+
+def _split_row(cls, row: dict):
+    """(עמודות מוכרות, שאר העמודות או None)"""
+    fields = cls.__dataclass_fields__
+    values, extra = {}, None
+    for key, value in row.items():
+        if key in fields and key != 'extra':
+            values[key] = value
+        else:
+            if extra is None:
+                extra = {}
+            extra[key] = value
+    return values, extra
+
+
+class _Record:
+    """בסיס ל-records: extra כ-attributes, to_dict בחזרה לשורה"""
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        # נקרא רק כשאין slot בשם הזה
+        extra = object.__getattribute__(self, 'extra')
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def to_dict(self) -> dict:
+        row = {}
+        for name in self.__dataclass_fields__:
+            if name == 'extra':
+                continue
+            value = getattr(self, name)
+            row[name] = value.isoformat() if isinstance(value, datetime.datetime) else value
+        row.update(self.extra or {})
+        return row
+
+
+@dataclass(slots=True)
+class User(_Record):
+    """שורת users"""
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    firstname: Optional[str] = None
+    lastname: Optional[str] = None
+    role: Optional[str] = None
+    lang: Optional[str] = None
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "User":
+        values, extra = _split_row(cls, row)
+        return cls(**values, extra=extra)
+
+
+@dataclass(slots=True)
+class Product(_Record):
+    """שורת products"""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    stock: int = 0
+    price: float = 0
+    crude: float = 0
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Product":
+        values, extra = _split_row(cls, row)
+        return cls(**values, extra=extra)
 
 class Template:
     """Template model - Supabase managed"""
@@ -117,40 +210,117 @@ class TgSession:
         import os
         return os.getenv("API_HASH")
 
-class Order:
-    """Order model - Supabase managed"""
-    pass
+@dataclass(slots=True)
+class Order(_Record):
+    """שורת orders - created / delivered כ-datetime, products כרשימה"""
+    id: Optional[int] = None
+    client_name: Optional[str] = None
+    client_username: Optional[str] = None
+    client_phone: Optional[str] = None
+    client_address: Optional[str] = None
+    products: list = field(default_factory=list)
+    total_order_price: Optional[float] = None
+    status: Optional[str] = None
+    created: Optional[datetime.datetime] = None
+    delivered: Optional[datetime.datetime] = None
+    courier_id: Optional[int] = None
+    courier_name: Optional[str] = None
+    courier_username: Optional[str] = None
+    courier_minutes: Optional[int] = None
+    delay_minutes: Optional[int] = None
+    delay_reason: Optional[str] = None
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Order":
+        values, extra = _split_row(cls, row)
+        if extra and 'address' in extra and values.get('client_address') is None:
+            # טיוטת הזמנה (preview) משתמשת ב-address
+            values['client_address'] = extra.pop('address')
+        values['products'] = order_items(values.get('products'))
+        values['created'] = _parse_timestamp(values.get('created'))
+        values['delivered'] = _parse_timestamp(values.get('delivered'))
+        return cls(**values, extra=extra or None)
+
+    @property
+    def address(self) -> Optional[str]:
+        return self.client_address
+
+    @property
+    def total(self) -> float:
+        if self.total_order_price is not None:
+            return self.total_order_price
+        return sum(product.get('total_price', 0) or 0 for product in self.products if isinstance(product, dict))
+
+    def get_products(self) -> list:
+        return self.products
+
+
+@dataclass(slots=True)
+class Shift(_Record):
+    """שורת shifts - opened_time / closed_time כ-datetime, products_start / products_end / summary מפוענחים"""
+    id: Optional[int] = None
+    operator_id: Optional[int] = None
+    operator_username: Optional[str] = None
+    operator_close_id: Optional[int] = None
+    operator_close_username: Optional[str] = None
+    status: Any = None
+    opened_time: Optional[datetime.datetime] = None
+    closed_time: Optional[datetime.datetime] = None
+    products_start: Any = None
+    products_end: Any = None
+    products_fetched_text: Optional[str] = None
+    summary: Any = None
+    brutto: float = 0
+    netto: float = 0
+    operator_paid: float = 0
+    runner_paid: float = 0
+    petrol_paid: float = 0
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Shift":
+        values, extra = _split_row(cls, row)
+        for name in ('opened_time', 'closed_time'):
+            values[name] = _parse_timestamp(values.get(name))
+        for name in ('products_start', 'products_end'):
+            values[name] = _parse_json(values.get(name), [])
+        values['summary'] = _parse_json(values.get('summary'), {})
+        return cls(**values, extra=extra)
 
-class Shift:
-    """Shift model - Supabase managed"""
     @staticmethod
     def set_products():
-        # Using Supabase only
-        products = db_client.select('products')
+        # Using Supabase only - from the in-memory catalog
+        products = product_catalog.all()
         data = [{'id': product['id'], 'name': product['name'], 'stock': product['stock']} for product in products]
         return data
     
+    @staticmethod
+    async def set_products_async():
+        """Same as set_products, awaitable"""
+        products = await product_catalog.all_async()
+        return [{'id': product['id'], 'name': product['name'], 'stock': product['stock']} for product in products]
+    
     def get_products(self):
         """Get products from shift's products_start field"""
-        if hasattr(self, 'products_start') and self.products_start:
-            try:
-                import json
-                return json.loads(self.products_start)
-            except:
-                return []
-        return []
+        return _parse_json(self.products_start, [])
 
 class BotSettings:
     """BotSettings model - Supabase managed"""
     pass
 
 def get_bot_setting(key: str, default_value: str = "") -> str:
-    """קבלת הגדרה מהמסד הנתונים - Supabase only"""
+    """קבלת הגדרה - מה-snapshot בזיכרון (settings_store)"""
     try:
-        results = db_client.select('bot_settings', {'key': key})
-        if results:
-            return results[0].get('value', default_value)
+        return settings_store.get(key, default_value)
+    except Exception as e:
+        # If table doesn't exist yet, return default value
         return default_value
+
+async def get_bot_setting_async(key: str, default_value: str = "") -> str:
+    """קבלת הגדרה - מה-snapshot בזיכרון (awaitable, רענון ברקע)"""
+    try:
+        return await settings_store.get_async(key, default_value)
     except Exception as e:
         # If table doesn't exist yet, return default value
         return default_value
@@ -168,8 +338,11 @@ def get_bot_setting_list(key: str) -> list:
 def set_bot_setting(key: str, value: str, user_id: int = None, value_type: str = 'string', description: str = None) -> None:
     """עדכון הגדרה במסד הנתונים - Supabase only"""
     try:
-        # Check if setting exists
-        results = db_client.select('bot_settings', {'key': key})
+        # Check if setting exists (snapshot first, DB only if the key is unknown)
+        if settings_store.has(key):
+            results = [settings_store.get_row(key)]
+        else:
+            results = db_client.select('bot_settings', {'key': key})
         
         # Telegram user_id is bigint, but updated_by column is integer - can't store it
         # So we skip updated_by if it's too large
@@ -191,7 +364,9 @@ def set_bot_setting(key: str, value: str, user_id: int = None, value_type: str =
             # Update existing setting
             if description:
                 update_data['description'] = description or results[0].get('description', '')
-            db_client.update('bot_settings', update_data, {'key': key})
+            updated = db_client.update('bot_settings', update_data, {'key': key})
+            for row in updated:
+                settings_store.apply_write(row)
             print(f"✅ Updated bot_setting: {key} = '{value}'")
         else:
             # Create new setting
@@ -205,7 +380,8 @@ def set_bot_setting(key: str, value: str, user_id: int = None, value_type: str =
             # Only add updated_by if it fits
             if user_id is not None and user_id <= 2147483647:
                 insert_data['updated_by'] = user_id
-            db_client.insert('bot_settings', insert_data)
+            inserted = db_client.insert('bot_settings', insert_data)
+            settings_store.apply_write(inserted)
             print(f"✅ Created bot_setting: {key} = '{value}'")
     except Exception as e:
         # If table doesn't exist yet, ignore the error
@@ -226,30 +402,31 @@ def initialize_default_settings():
     - רק BOT_TOKEN + ADMINS מ-ENV (קבוע)
     - כל השאר (operators, stockmen, couriers, chats) רק מ-DATABASE!
     - לעולם לא לדרוס ערכים קיימים!
+    
+    כל bot_settings נטען פעם אחת (settings_store.load) והבדיקות נעשות מול ה-snapshot.
     """
+    settings_store.load()
     
     # =========================================
     # 💾 קבוצות - רק DATABASE (לא ENV!)
     # =========================================
     try:
-        admin_chat_exists = db_client.select('bot_settings', {'key': 'admin_chat'})
-        if not admin_chat_exists:
+        if not settings_store.has('admin_chat'):
             set_bot_setting('admin_chat', '', description='קבוצת מנהלים')
             print("🆕 Created empty admin_chat setting (set via bot UI)")
         else:
-            value = admin_chat_exists[0].get('value', '')
+            value = settings_store.get_row('admin_chat').get('value', '')
             print(f"✅ admin_chat from DB: '{value}' (never from ENV!)")
     except Exception as e:
         print(f"⚠️ Error with admin_chat: {e}")
         set_bot_setting('admin_chat', '', description='קבוצת מנהלים')
     
     try:
-        order_chat_exists = db_client.select('bot_settings', {'key': 'order_chat'})
-        if not order_chat_exists:
+        if not settings_store.has('order_chat'):
             set_bot_setting('order_chat', '', description='קבוצת שליחים')
             print("🆕 Created empty order_chat setting (set via bot UI)")
         else:
-            value = order_chat_exists[0].get('value', '')
+            value = settings_store.get_row('order_chat').get('value', '')
             print(f"✅ order_chat from DB: '{value}' (never from ENV!)")
     except Exception as e:
         print(f"⚠️ Error with order_chat: {e}")
@@ -260,8 +437,7 @@ def initialize_default_settings():
     # =========================================
     # operators, stockmen, couriers מנוהלים רק דרך הבוט/DATABASE
     try:
-        operators_exists = db_client.select('bot_settings', {'key': 'operators'})
-        if not operators_exists:
+        if not settings_store.has('operators'):
             set_bot_setting_list('operators', [], description='רשימת מפעילים')
             print("🆕 Created empty operators list")
         else:
@@ -270,8 +446,7 @@ def initialize_default_settings():
         set_bot_setting_list('operators', [], description='רשימת מפעילים')
     
     try:
-        stockmen_exists = db_client.select('bot_settings', {'key': 'stockmen'})
-        if not stockmen_exists:
+        if not settings_store.has('stockmen'):
             set_bot_setting_list('stockmen', [], description='רשימת מחסנאים')
             print("🆕 Created empty stockmen list")
         else:
@@ -280,8 +455,7 @@ def initialize_default_settings():
         set_bot_setting_list('stockmen', [], description='רשימת מחסנאים')
     
     try:
-        couriers_exists = db_client.select('bot_settings', {'key': 'couriers'})
-        if not couriers_exists:
+        if not settings_store.has('couriers'):
             set_bot_setting_list('couriers', [], description='רשימת שליחים')
             print("🆕 Created empty couriers list")
         else:
@@ -294,19 +468,19 @@ def initialize_default_settings():
     # =========================================
     # bot_token, api_id, api_hash - stored in DB for UI editing, but loaded from ENV in code
     try:
-        if not db_client.select('bot_settings', {'key': 'bot_token'}):
+        if not settings_store.has('bot_token'):
             set_bot_setting('bot_token', '', description='טוקן הבוט')
     except:
         pass
     
     try:
-        if not db_client.select('bot_settings', {'key': 'api_id'}):
+        if not settings_store.has('api_id'):
             set_bot_setting('api_id', '', description='API ID')
     except:
         pass
     
     try:
-        if not db_client.select('bot_settings', {'key': 'api_hash'}):
+        if not settings_store.has('api_hash'):
             set_bot_setting('api_hash', '', description='API Hash')
     except:
         pass
@@ -408,15 +582,15 @@ def is_admin(func):
         
         print(f"🔧 is_admin decorator called for user {user.id}")
         
-        # Check user role - Supabase only
-        results = db_client.select('users', {'user_id': user.id, 'role': 'admin'})
-        is_admin_role = len(results) > 0
+        # Check user role - Supabase only (cached)
+        user_data = await get_user_by_id_async(user.id)
+        is_admin_role = bool(user_data) and user_data.get('role') == 'admin'
         
         print(f"🔧 Is admin role: {is_admin_role}")
         
         if not is_admin_role:
             print(f"❌ Access denied - not admin")
-            lang = get_user_lang(user.id)
+            lang = user_data.get('lang', 'ru') if user_data else 'ru'
             await msg.reply_text(t("admin_only", lang))
             return None  # Explicitly return None for ConversationHandler
 
@@ -436,9 +610,8 @@ def is_operator(func):
         
         print(f"🔧 is_operator decorator called for user {user.id}")
         
-        # Check user role - Supabase only
-        results = db_client.select('users', {'user_id': user.id})
-        user_data = results[0] if results else None
+        # Check user role - Supabase only (cached)
+        user_data = await get_user_by_id_async(user.id)
         is_operator_role = user_data and user_data['role'] in ['operator', 'admin']
         
         print(f"🔧 User role check: {user_data['role'] if user_data else 'None'}")
@@ -446,7 +619,7 @@ def is_operator(func):
         
         if not is_operator_role:
             print(f"❌ Access denied - not operator")
-            lang = get_user_lang(user.id)
+            lang = user_data.get('lang', 'ru') if user_data else 'ru'
             await msg.reply_text(t("operator_only", lang))
             return None
 
@@ -463,13 +636,12 @@ def is_stockman(func):
         user = update.effective_user
         msg = update.effective_message
         
-        # Check user role - Supabase only
-        results = db_client.select('users', {'user_id': user.id})
-        user_data = results[0] if results else None
+        # Check user role - Supabase only (cached)
+        user_data = await get_user_by_id_async(user.id)
         is_stockman_role = user_data and user_data['role'] in ['stockman', 'admin']
         
         if not is_stockman_role:
-            lang = get_user_lang(user.id)
+            lang = user_data.get('lang', 'ru') if user_data else 'ru'
             await msg.reply_text(t("stockman_only", lang))
             return None
 
@@ -485,13 +657,12 @@ def is_courier(func):
         user = update.effective_user
         msg = update.effective_message
         
-        # Check user role - Supabase only
-        results = db_client.select('users', {'user_id': user.id})
-        user_data = results[0] if results else None
+        # Check user role - Supabase only (cached)
+        user_data = await get_user_by_id_async(user.id)
         is_courier_role = user_data and user_data['role'] in ['courier', 'admin']
         
         if not is_courier_role:
-            lang = get_user_lang(user.id)
+            lang = user_data.get('lang', 'ru') if user_data else 'ru'
             await msg.reply_text(t("courier_only", lang))
             return None
 
@@ -512,8 +683,7 @@ def is_user_in_db(func):
         
         try:
             # Check if user exists in database - Supabase only
-            results = db_client.select('users', {'user_id': user.id})
-            user_db = results[0] if results else None
+            user_db = await get_user_by_id_async(user.id)
             
             if not user_db:
                 # משתמש חדש - צריך ליצור אותו
@@ -541,7 +711,8 @@ def is_user_in_db(func):
                 }
                 
                 # Using Supabase only
-                db_client.insert('users', user_data)
+                await async_db_client.insert('users', user_data)
+                invalidate_user_cache(user.id)
                 
                 print(f"New user created: {user}")
                 
@@ -555,8 +726,8 @@ def is_user_in_db(func):
                     ]
                     reply_markup = InlineKeyboardMarkup(keyboard)
                     
-                    # שליחת הודעת תפקיד לפי שפת המשתמש
-                    user_lang = get_user_lang(user.id)
+                    # שליחת הודעת תפקיד לפי שפת המשתמש (המשתמש הרגע נוצר)
+                    user_lang = user_data['lang']
                     
                     # אם המשתמש עדיין לא בחר שפה, נשלח הודעה דו-לשונית
                     if user_lang == "ru":  # ברירת מחדל
@@ -620,90 +791,258 @@ def if_table():
 # Helper functions for Supabase migration
 
 def get_user_by_id(user_id: int):
-    """Get user by ID - Supabase only"""
+    """Get user by ID - Supabase only (through user_cache)"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
     results = db_client.select('users', {'user_id': user_id})
     if results:
+        user_cache.set(user_id, results[0])
         return results[0]
     return None
 
-def get_product_by_id(product_id: int):
-    """Get product by ID - Supabase only"""
-    results = db_client.select('products', {'id': product_id})
+async def get_user_by_id_async(user_id: int):
+    """Get user by ID - Supabase only (awaitable, through user_cache)"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    results = await async_db_client.select('users', {'user_id': user_id})
     if results:
+        user_cache.set(user_id, results[0])
         return results[0]
     return None
 
+def invalidate_user_cache(user_id: int):
+    """מחיקת משתמש מה-cache - לקרוא אחרי כל insert/update בטבלת users"""
+    user_cache.invalidate(user_id)
+
+def get_product_by_id(product_id: int):
+    """Get product by ID - from the products catalog"""
+    return product_catalog.get(product_id)
+
+async def get_product_by_id_async(product_id: int):
+    """Get product by ID - from the products catalog (awaitable)"""
+    return await product_catalog.get_async(product_id)
+
+async def get_product_by_name_async(name: str):
+    """Get product by name - from the products catalog"""
+    return await product_catalog.get_by_name_async(name)
+
 def get_all_products():
-    """Get all products - Supabase only"""
-    return db_client.select('products')
+    """Get all products - from the products catalog"""
+    return product_catalog.all()
+
+async def get_all_products_async():
+    """Get all products - from the products catalog (awaitable)"""
+    return await product_catalog.all_async()
+
+async def insert_product_async(product_data: dict) -> dict:
+    """Insert a product and add it to the catalog"""
+    result = await async_db_client.insert('products', product_data)
+    product_catalog.apply_write(result)
+    return result
+
+async def update_product_async(product_id: int, data: dict) -> list:
+    """Update a product and apply the change to the catalog"""
+    result = await async_db_client.update('products', data, {'id': product_id})
+    if result:
+        for row in result:
+            product_catalog.apply_write(row)
+    else:
+        product_catalog.invalidate()
+    return result
+
+async def delete_product_async(product_id: int) -> bool:
+    """Delete a product and remove it from the catalog"""
+    result = await async_db_client.delete('products', {'id': product_id})
+    product_catalog.remove(product_id)
+    return result
+
+def invalidate_product_catalog():
+    """לקרוא אחרי שינוי מלאי שלא עבר דרך הפונקציות למעלה (למשל RPC)"""
+    product_catalog.invalidate()
+
+# ---------- daily_stats rollup (db/migrations/003_daily_stats.sql) ----------
+
+async def bump_daily_stats_async(rows: list) -> None:
+    """הוספת מונים ל-daily_stats ב-RPC אטומי אחד"""
+    if rows:
+        await async_db_client.rpc('bump_daily_stats', {'p_rows': rows})
+
+async def record_shift_stats_async(shift: dict) -> None:
+    """עדכון ה-rollup אחרי סגירת משמרת"""
+    try:
+        await bump_daily_stats_async(shift_stat_rows(shift))
+    except Exception as e:
+        print(f"⚠️ Could not update daily_stats for shift {shift.get('id')}: {e}")
+
+# ---------- shift summary (db/migrations/005_shift_summary.sql) ----------
+
+async def order_rollup_params_async(order: dict) -> dict:
+    """
+    ה-rollups של הזמנה שנמסרת (daily_stats + סיכום המשמרת הפתוחה) כפרמטרים ל-complete_order_with_stock
+    (db/migrations/006_complete_order_rollups.sql) - נכתבים באותה טרנזקציה עם ההשלמה.
+    order - שורת ההזמנה עם ה-delivered של ההשלמה
+    """
+    shift = await get_opened_shift_async()
+    return {
+        'p_stats': order_stat_rows(order),
+        'p_shift_id': shift['id'] if shift else None,
+        'p_shift_delta': summary_delta(order_items(order.get('products'))),
+    }
+
+async def get_daily_stats_async(dimension: str, since, until=None, columns=None) -> list:
+    """שורות daily_stats של dimension בטווח ימים (כולל) - כמה שורות במקום כל ההזמנות"""
+    day_range = {'gte': stat_day(since)}
+    if until:
+        day_range['lte'] = stat_day(until)
+    return await async_db_client.select('daily_stats', {'dimension': dimension, 'day': day_range},
+                                        order=['day', 'key'], columns=columns)
+
+async def backfill_daily_stats_async(since=None, batch_size: int = 500) -> int:
+    """
+    בנייה מחדש של daily_stats מההיסטוריה (הזמנות שהושלמו + משמרות שנסגרו)
+    since - מתאריך זה והלאה (ימים שלמים); None = הכל. מחזיר את מספר השורות שנכתבו.
+    """
+    since_day = stat_day(since) if since else None
+    order_filters = {'status': 'completed'}
+    shift_filters = {'status': ShiftStatus.closed.value}
+    if since_day:
+        order_filters['delivered'] = ('gte', since_day)
+        shift_filters['closed_time'] = ('gte', since_day)
+
+    rows = []
+    async for order in async_db_client.iter_rows(
+            'orders', order_filters, columns='delivered,products,client_name,client_username,client_phone'):
+        rows.extend(order_stat_rows(order))
+    async for shift in async_db_client.iter_rows(
+            'shifts', shift_filters, columns='closed_time,brutto,netto,operator_paid,runner_paid,petrol_paid,summary'):
+        rows.extend(shift_stat_rows(shift))
+    rows = merge_stat_rows(rows)
+
+    deleted = await async_db_client.delete_many('daily_stats', {'day': ('gte', since_day or '0001-01-01')})
+    print(f"🧹 daily_stats: removed {deleted} rows from {since_day or 'the beginning'}")
+    for start in range(0, len(rows), batch_size):
+        await bump_daily_stats_async(rows[start:start + batch_size])
+    print(f"✅ daily_stats: wrote {len(rows)} rows")
+    return len(rows)
+
+async def erase_orders_before_async(date, batch_size: Optional[int] = None) -> int:
+    """
+    מחיקת כל ההזמנות שנוצרו לפני date (DELETE מסונן אחד, או בעמודים) - מחזיר כמה נמחקו.
+    ההזמנות שהושלמו יורדות גם מ-daily_stats, לפי יום ה-delivered שלהן כמו בעדכון השוטף.
+    """
+    rows = []
+    async for order in async_db_client.iter_rows(
+            'orders', {'created': ('lt', date), 'status': 'completed'},
+            columns='delivered,products,client_name,client_username,client_phone'):
+        rows.extend(order_stat_rows(order))
+
+    deleted = await async_db_client.delete_many('orders', {'created': ('lt', date)}, batch_size=batch_size)
+    order_index.remove_created_before(date)
+
+    rows = negate_stat_rows(merge_stat_rows(rows))
+    for start in range(0, len(rows), 500):
+        await bump_daily_stats_async(rows[start:start + 500])
+    # לקוחות / מוצרים שכל ההזמנות שלהם באותו יום נמחקו - לא נשארות שורות אפס בדוחות
+    await async_db_client.delete_many('daily_stats', {'dimension': 'client', 'orders': 0})
+    await async_db_client.delete_many('daily_stats', {'dimension': 'product', 'quantity': 0, 'revenue': 0})
+    print(f"🧹 daily_stats: removed {len(rows)} rows of {deleted} erased orders")
+    return deleted
 
 def create_shift(shift_data: dict):
     """Create a new shift - Supabase only"""
     result = db_client.insert('shifts', shift_data)
     return result
 
+async def create_shift_async(shift_data: dict):
+    """Create a new shift - Supabase only (awaitable)"""
+    return await async_db_client.insert('shifts', shift_data)
+
+# Pointer למשמרת הנוכחית (שורה מלאה או None) - מתעדכן ב-send_shift_start_msg / confirm_end_shift,
+# ונבדק מול ה-DB שוב אחרי CURRENT_SHIFT_TTL שניות
+current_shift_cache = TTLCache(maxsize=1, ttl=float(os.getenv("CURRENT_SHIFT_TTL", "30")))
+_CURRENT_SHIFT_KEY = 'current'
+_NO_CACHED_SHIFT = object()
+
+# query של המשמרת הפתוחה האחרונה: status=in.(...)&order=id.desc&limit=1 (index על status, id)
+OPENED_SHIFT_FILTERS = {'status': ('in', OPENED_SHIFT_STATUSES)}
+
+def _cached_current_shift():
+    shift = current_shift_cache.get(_CURRENT_SHIFT_KEY, _NO_CACHED_SHIFT)
+    if shift is _NO_CACHED_SHIFT:
+        return _NO_CACHED_SHIFT
+    # עותק - כדי ש-caller שמשנה את ה-dict לא ישנה את ה-pointer
+    return dict(shift) if shift else None
+
+def set_current_shift(shift: dict = None):
+    """עדכון ה-pointer: השורה של המשמרת שנפתחה, או None אחרי סגירה"""
+    current_shift_cache.set(_CURRENT_SHIFT_KEY, dict(shift) if shift else None)
+
+def invalidate_current_shift():
+    """הבא get_opened_shift יקרא שוב מה-DB"""
+    current_shift_cache.invalidate(_CURRENT_SHIFT_KEY)
+
 def get_opened_shift():
-    """Get the currently opened shift - Supabase only"""
-    all_shifts = db_client.select('shifts')  # Get all shifts
-    # Sort by id descending to get most recent first
-    all_shifts.sort(key=lambda x: x.get('id', 0), reverse=True)
-    print(f"🔧 get_opened_shift: Checking {len(all_shifts)} shifts")
-    
-    for shift in all_shifts:
-        status = shift.get('status', '')
-        shift_id = shift.get('id', 'unknown')
-        print(f"🔧 get_opened_shift: Shift ID={shift_id}, Status='{status}'")
-        
-        # Check for opened status (Hebrew, Russian, or English)
-        is_opened = (
-            status == 'opened' or 
-            status == 'Открыта / פתוחה' or
-            ('פתוח' in status and 'closed' not in status.lower()) or 
-            ('Открыта' in status and 'closed' not in status.lower())
-        )
-        
-        # Double check it's not closed
-        is_closed = (
-            status == 'closed' or 
-            'closed' in status.lower() or 
-            'закрыт' in status.lower() or
-            'סגור' in status
-        )
-        
-        if is_opened and not is_closed:
-            print(f"🔧 get_opened_shift: Found opened shift ID={shift_id}, Status='{status}'")
-            return shift  # Return first (most recent) opened shift
+    """
+    Get the currently opened shift - Supabase only
     
-    print(f"🔧 get_opened_shift: No opened shift found")
-    return None
+    מה-pointer בזיכרון אם קיים, אחרת query אחד של השורה האחרונה עם status פתוח -
+    העלות לא תלויה בכמות המשמרות הישנות.
+    """
+    shift = _cached_current_shift()
+    if shift is not _NO_CACHED_SHIFT:
+        return shift
+    rows = db_client.select('shifts', OPENED_SHIFT_FILTERS, order='id.desc', limit=1)
+    set_current_shift(rows[0] if rows else None)
+    return _cached_current_shift()
+
+async def get_opened_shift_async():
+    """Get the currently opened shift - Supabase only (awaitable)"""
+    shift = _cached_current_shift()
+    if shift is not _NO_CACHED_SHIFT:
+        return shift
+    rows = await async_db_client.select('shifts', OPENED_SHIFT_FILTERS, order='id.desc', limit=1)
+    set_current_shift(rows[0] if rows else None)
+    return _cached_current_shift()
 
 def update_shift(shift_id: int, updates: dict):
     """Update a shift - Supabase only"""
     db_client.update('shifts', updates, {'id': shift_id})
+    invalidate_current_shift()
 
-def get_orders_by_filter(filters: dict, sort_by: str = None):
-    """Get orders by filter - Supabase only"""
-    # Get all orders and filter in Python
-    all_orders = db_client.select('orders')
-    filtered = all_orders
-    
-    if filters:
-        for key, value in filters.items():
-            if key == 'created' and isinstance(value, dict):
-                # Handle date ranges
-                if '>=' in value:
-                    filtered = [o for o in filtered if o.get('created') and o['created'] >= str(value['>='])]
-                if '<=' in value:
-                    filtered = [o for o in filtered if o.get('created') and o['created'] <= str(value['<='])]
-            else:
-                filtered = [o for o in filtered if o.get(key) == value]
-    
+async def update_shift_async(shift_id: int, updates: dict):
+    """Update a shift - Supabase only (awaitable)"""
+    await async_db_client.update('shifts', updates, {'id': shift_id})
+    invalidate_current_shift()
+
+def _orders_to_objects(orders: list, sort_by: str = None):
+    """מיון (אופציונלי) והמרת שורות הזמנות לאובייקטים"""
     if sort_by:
-        filtered = sorted(filtered, key=lambda x: x.get(sort_by))
+        # None values last, so missing dates don't break the sort
+        orders = sorted(orders, key=lambda x: (x.get(sort_by) is None, x.get(sort_by) or 0))
+    return [Order.from_row(order) for order in orders]
+
+def get_orders_by_filter(filters: dict, sort_by: str = None):
+    """
+    Get orders by filter - Supabase only
     
-    # Convert to objects
-    return [type('Order', (), order)() for order in filtered]
+    הסינון מתבצע בצד השרת, כולל טווחי תאריכים:
+    {'created': {'>=': start, '<=': end}} -> created=gte.start&created=lte.end
+    השורות נקראות בעמודים (iter_rows) כך שהתוצאה לא נחתכת ע"י max-rows.
+    """
+    orders = list(db_client.iter_rows('orders', filters))
+    return _orders_to_objects(orders, sort_by)
+
+async def get_orders_by_filter_async(filters: dict, sort_by: str = None):
+    """Get orders by filter - Supabase only (awaitable)"""
+    orders = [order async for order in async_db_client.iter_rows('orders', filters)]
+    return _orders_to_objects(orders, sort_by)
 
 def get_all_orders():
     """Get all orders - Supabase only"""
-    return db_client.select('orders')
\ No newline at end of file
+    return list(db_client.iter_rows('orders'))
+
+async def get_all_orders_async():
+    """Get all orders - Supabase only (awaitable)"""
+    return [order async for order in async_db_client.iter_rows('orders')]
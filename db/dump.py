@@ -0,0 +1,179 @@
+"""
+ייצוא מסד הנתונים בזיכרון קבוע (dump_db)
+
+- כל טבלה נקראת בעמודים (iter_rows) ב-task משלה, כל הטבלאות במקביל.
+  השורות עוברות דרך asyncio.Queue חסום, כך שטבלה שממתינה לתורה לא נטענת כולה לזיכרון.
+- ה-writer כותב טבלה אחרי טבלה לקובץ זמני (SpooledTemporaryFile - בזיכרון עד DUMP_SPOOL_MAX_SIZE,
+  ואחר כך לדיסק):
+    json        {"table": [row, ...], ...} - נכתב שורה אחרי שורה
+    ndjson.gz   שורת JSON לכל רשומה: {"table": ..., "row": {...}}, דחוס ב-gzip
+    xlsx        openpyxl write-only - גיליון לכל טבלה, השורות לא נשמרות בזיכרון
+"""
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+
+DUMP_FORMATS = {'json': 'json', 'ndjson_gz': 'ndjson.gz', 'xlsx': 'xlsx'}
+
+_END = object()
+
+
+class _TableError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+# ---------- writers ----------
+
+class JsonDumpWriter:
+    """{"table": [row, ...], ...} - טבלה ריקה לא נכתבת; הקובץ תקין גם אם טבלה נכשלה באמצע"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.tables_written = 0
+        self.fileobj.write(b"{")
+
+    def begin_table(self, table: str) -> None:
+        self._table = table
+        self._rows = 0
+
+    def write_row(self, row: dict) -> None:
+        if self._rows == 0:
+            prefix = ",\n" if self.tables_written else "\n"
+            self.fileobj.write(f'{prefix}    {json.dumps(self._table)}: [\n'.encode('utf-8'))
+        else:
+            self.fileobj.write(b",\n")
+        row_json = json.dumps(row, ensure_ascii=False, indent=4, default=str)
+        self.fileobj.write(("        " + row_json.replace("\n", "\n        ")).encode('utf-8'))
+        self._rows += 1
+
+    def end_table(self) -> None:
+        if self._rows:
+            self.fileobj.write(b"\n    ]")
+            self.tables_written += 1
+
+    def close(self) -> None:
+        self.fileobj.write(b"\n}" if self.tables_written else b"}")
+
+
+class NdjsonGzipDumpWriter:
+    """שורה לכל רשומה: {"table": ..., "row": {...}} - gzip"""
+
+    def __init__(self, fileobj):
+        self._gzip = gzip.GzipFile(fileobj=fileobj, mode='wb')
+
+    def begin_table(self, table: str) -> None:
+        self._table = table
+
+    def write_row(self, row: dict) -> None:
+        line = json.dumps({'table': self._table, 'row': row}, ensure_ascii=False, default=str)
+        self._gzip.write(line.encode('utf-8') + b"\n")
+
+    def end_table(self) -> None:
+        pass
+
+    def close(self) -> None:
+        # סוגר רק את שכבת ה-gzip; הקובץ עצמו נשאר פתוח לשליחה
+        self._gzip.close()
+
+
+class XlsxDumpWriter:
+    """openpyxl write-only: גיליון לכל טבלה (נוצר עם השורה הראשונה), כותרות לפי מפתחות השורה הראשונה"""
+
+    def __init__(self, fileobj):
+        from openpyxl import Workbook
+        self.fileobj = fileobj
+        self.workbook = Workbook(write_only=True)
+
+    def begin_table(self, table: str) -> None:
+        self._table = table
+        self._sheet = None
+        self._columns: List[str] = []
+
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return value
+
+    def write_row(self, row: dict) -> None:
+        if self._sheet is None:
+            self._sheet = self.workbook.create_sheet(title=self._table[:31])
+            self._columns = list(row)
+            self._sheet.append(self._columns)
+        self._sheet.append([self._cell(row.get(column)) for column in self._columns])
+
+    def end_table(self) -> None:
+        if self._sheet is None:
+            print(f"Table '{self._table}' is empty and will not be added to Excel.")
+
+    def close(self) -> None:
+        if not self.workbook.worksheets:
+            # קובץ xlsx חייב גיליון אחד לפחות
+            self.workbook.create_sheet(title='empty')
+        self.workbook.save(self.fileobj)
+
+
+WRITERS = {'json': JsonDumpWriter, 'ndjson_gz': NdjsonGzipDumpWriter, 'xlsx': XlsxDumpWriter}
+
+
+# ---------- streaming ----------
+
+async def _produce(rows: AsyncIterator[dict], queue: asyncio.Queue) -> None:
+    try:
+        async for row in rows:
+            await queue.put(row)
+    except Exception as e:
+        await queue.put(_TableError(e))
+    finally:
+        await queue.put(_END)
+
+
+async def stream_dump(tables: List[str], iter_rows: Callable[[str], AsyncIterator[dict]], writer,
+                      queue_size: int = 1000) -> None:
+    """
+    כל הטבלאות נקראות במקביל (task לכל טבלה), וה-writer מקבל אותן לפי הסדר.
+    כל תור חסום ב-queue_size שורות - הזיכרון לא תלוי בגודל הטבלאות.
+    """
+    queues = {table: asyncio.Queue(maxsize=queue_size) for table in tables}
+    tasks = [asyncio.create_task(_produce(iter_rows(table), queues[table])) for table in tables]
+    try:
+        for table in tables:
+            writer.begin_table(table)
+            while True:
+                item = await queues[table].get()
+                if item is _END:
+                    break
+                if isinstance(item, _TableError):
+                    print(f"Error exporting table '{table}': {item.error}")
+                    continue
+                writer.write_row(item)
+            writer.end_table()
+        writer.close()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def dump_to_file(tables: List[str], iter_rows: Callable[[str], AsyncIterator[dict]],
+                       format: str) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """ייצוא לקובץ זמני - מחזיר (file, filename); הקורא אחראי לסגור את הקובץ"""
+    if format not in WRITERS:
+        raise ValueError(f"Unknown dump format: {format}")
+
+    filename = f'dump_db_{datetime.datetime.now().strftime("%d_%m_%Y")}.{DUMP_FORMATS[format]}'
+    output = tempfile.SpooledTemporaryFile(max_size=int(os.getenv("DUMP_SPOOL_MAX_SIZE", str(8 * 1024 * 1024))))
+    try:
+        await stream_dump(tables, iter_rows, WRITERS[format](output),
+                          queue_size=int(os.getenv("DUMP_QUEUE_SIZE", "1000")))
+        output.seek(0)
+        return output, filename
+    except Exception:
+        output.close()
+        raise
@@ -0,0 +1,17 @@
+-- Canonical shift status codes + index for the current-shift lookup
+-- הרצה פעם אחת ב-Supabase SQL Editor
+
+-- 1. המרת התוויות הישנות (רוסית/עברית) לקודים קנוניים
+UPDATE shifts SET status = 'opened'
+WHERE status <> 'opened'
+  AND (status = 'Открыта / פתוחה' OR status LIKE '%Открыта%' OR status LIKE '%פתוח%')
+  AND status NOT ILIKE '%closed%';
+
+UPDATE shifts SET status = 'closed'
+WHERE status <> 'closed'
+  AND (status = 'Закрыта / סגורה' OR status ILIKE '%закрыт%' OR status LIKE '%סגור%' OR status ILIKE '%closed%');
+
+-- 2. index עבור status=eq.opened&order=id.desc&limit=1 (get_opened_shift)
+--    ועבור דוחות על משמרות סגורות לפי closed_time
+CREATE INDEX IF NOT EXISTS idx_shifts_status_id ON shifts (status, id DESC);
+CREATE INDEX IF NOT EXISTS idx_shifts_status_closed_time ON shifts (status, closed_time);
@@ -0,0 +1,90 @@
+-- Atomic order completion: stock check + decrement + order status in one transaction
+-- נקרא מ-order_ready דרך POST /rest/v1/rpc/complete_order_with_stock
+--
+-- p_items: {"<product_id>": <quantity>, ...} (כמויות מאוחדות לכל מוצר)
+-- מחזיר jsonb:
+--   {"ok": true, "order": {...}}                                     - ההזמנה הושלמה והמלאי ירד
+--   {"ok": false, "error": "order_not_found"}
+--   {"ok": false, "error": "already_completed"}
+--   {"ok": false, "error": "product_not_found", "details": [id, ...]}
+--   {"ok": false, "error": "insufficient_stock", "details": [{"product_id", "stock", "required"}, ...]}
+-- בכל מקרה של ok=false שום דבר לא משתנה.
+
+CREATE OR REPLACE FUNCTION complete_order_with_stock(
+    p_order_id bigint,
+    p_items jsonb,
+    p_courier_id bigint,
+    p_courier_name text,
+    p_courier_username text,
+    p_delivered timestamp
+) RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_order orders%ROWTYPE;
+    v_item record;
+    v_stock integer;
+    v_missing jsonb := '[]'::jsonb;
+    v_short jsonb := '[]'::jsonb;
+BEGIN
+    -- נעילת ההזמנה: שני שליחים שלוחצים ביחד - השני יחכה ויקבל already_completed
+    SELECT * INTO v_order FROM orders WHERE id = p_order_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'order_not_found');
+    END IF;
+
+    IF v_order.status = 'completed' OR v_order.delivered IS NOT NULL THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'already_completed');
+    END IF;
+
+    -- נעילת המוצרים לפי סדר id (מונע deadlock בין הזמנות במקביל) ובדיקת מלאי
+    FOR v_item IN
+        SELECT key::bigint AS product_id, value::integer AS qty
+        FROM jsonb_each_text(p_items)
+        ORDER BY key::bigint
+    LOOP
+        SELECT stock INTO v_stock FROM products WHERE id = v_item.product_id FOR UPDATE;
+        IF NOT FOUND THEN
+            v_missing := v_missing || to_jsonb(v_item.product_id);
+        ELSIF COALESCE(v_stock, 0) < v_item.qty THEN
+            v_short := v_short || jsonb_build_array(jsonb_build_object(
+                'product_id', v_item.product_id,
+                'stock', COALESCE(v_stock, 0),
+                'required', v_item.qty
+            ));
+        END IF;
+    END LOOP;
+
+    IF jsonb_array_length(v_missing) > 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'product_not_found', 'details', v_missing);
+    END IF;
+
+    IF jsonb_array_length(v_short) > 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'insufficient_stock', 'details', v_short);
+    END IF;
+
+    UPDATE products p
+    SET stock = COALESCE(p.stock, 0) - i.qty
+    FROM (
+        SELECT key::bigint AS product_id, value::integer AS qty
+        FROM jsonb_each_text(p_items)
+    ) i
+    WHERE p.id = i.product_id;
+
+    UPDATE orders
+    SET status = 'completed',
+        delivered = p_delivered,
+        courier_id = p_courier_id,
+        courier_name = p_courier_name,
+        courier_username = p_courier_username
+    WHERE id = p_order_id
+    RETURNING * INTO v_order;
+
+    RETURN jsonb_build_object('ok', true, 'order', to_jsonb(v_order));
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION complete_order_with_stock(bigint, jsonb, bigint, text, text, timestamp) TO anon, authenticated;
+
+-- רענון ה-schema cache של PostgREST כדי שה-RPC יהיה זמין מיד
+NOTIFY pgrst, 'reload schema';
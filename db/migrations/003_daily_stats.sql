@@ -0,0 +1,61 @@
+-- daily_stats: rollup יומי לדוחות המהירים (report_by_product / client / days, week report, daily profit)
+-- הרצה פעם אחת ב-Supabase SQL Editor, ואחר כך: python backfill_daily_stats.py
+--
+-- dimension / key:
+--   total          ''                              - orders, revenue (הזמנות שנמסרו ביום) + shifts, brutto, netto, *_paid (משמרות שנסגרו ביום)
+--   product        שם המוצר                        - quantity, revenue מהזמנות שנמסרו
+--   client         '["name","@username","phone"]'   - orders
+--   shift_product  שם המוצר                        - quantity, revenue מתוך shifts.summary
+-- השורות נבנות ב-db/daily_stats.py (אותו קוד גם לעדכון השוטף וגם ל-backfill).
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    dimension text NOT NULL,
+    day date NOT NULL,
+    key text NOT NULL DEFAULT '',
+    orders bigint NOT NULL DEFAULT 0,
+    quantity numeric NOT NULL DEFAULT 0,
+    revenue numeric NOT NULL DEFAULT 0,
+    shifts bigint NOT NULL DEFAULT 0,
+    brutto numeric NOT NULL DEFAULT 0,
+    netto numeric NOT NULL DEFAULT 0,
+    operator_paid numeric NOT NULL DEFAULT 0,
+    runner_paid numeric NOT NULL DEFAULT 0,
+    petrol_paid numeric NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (dimension, day, key)
+);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON daily_stats TO anon, authenticated;
+
+-- הוספה אטומית של מונים: p_rows = [{"day", "dimension", "key", "orders", "quantity", ...}, ...]
+-- שורות כפולות באותה קריאה מאוחדות לפני ה-upsert
+CREATE OR REPLACE FUNCTION bump_daily_stats(p_rows jsonb) RETURNS void
+LANGUAGE sql
+AS $$
+    INSERT INTO daily_stats AS s (dimension, day, key, orders, quantity, revenue, shifts,
+                                  brutto, netto, operator_paid, runner_paid, petrol_paid)
+    SELECT r.dimension, r.day, coalesce(r.key, ''),
+           sum(coalesce(r.orders, 0)), sum(coalesce(r.quantity, 0)), sum(coalesce(r.revenue, 0)),
+           sum(coalesce(r.shifts, 0)), sum(coalesce(r.brutto, 0)), sum(coalesce(r.netto, 0)),
+           sum(coalesce(r.operator_paid, 0)), sum(coalesce(r.runner_paid, 0)), sum(coalesce(r.petrol_paid, 0))
+    FROM jsonb_to_recordset(p_rows) AS r(dimension text, day date, key text, orders bigint, quantity numeric,
+                                         revenue numeric, shifts bigint, brutto numeric, netto numeric,
+                                         operator_paid numeric, runner_paid numeric, petrol_paid numeric)
+    GROUP BY r.dimension, r.day, coalesce(r.key, '')
+    ON CONFLICT (dimension, day, key) DO UPDATE SET
+        orders = s.orders + EXCLUDED.orders,
+        quantity = s.quantity + EXCLUDED.quantity,
+        revenue = s.revenue + EXCLUDED.revenue,
+        shifts = s.shifts + EXCLUDED.shifts,
+        brutto = s.brutto + EXCLUDED.brutto,
+        netto = s.netto + EXCLUDED.netto,
+        operator_paid = s.operator_paid + EXCLUDED.operator_paid,
+        runner_paid = s.runner_paid + EXCLUDED.runner_paid,
+        petrol_paid = s.petrol_paid + EXCLUDED.petrol_paid,
+        updated_at = now();
+$$;
+
+GRANT EXECUTE ON FUNCTION bump_daily_stats(jsonb) TO anon, authenticated;
+
+-- רענון ה-schema cache של PostgREST כדי שה-RPC יהיה זמין מיד
+NOTIFY pgrst, 'reload schema';
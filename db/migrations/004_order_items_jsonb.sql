@@ -0,0 +1,66 @@
+-- orders.products: text (מחרוזת JSON) -> jsonb של שורות מוצר
+-- הרצה פעם אחת ב-Supabase SQL Editor. בטוח להריץ שוב.
+--
+-- כל שורה: {"product_id": <products.id או null>, "name": ..., "quantity": <number>, "total_price": <number>}
+-- PostgREST מחזיר jsonb כ-JSON מוכן - הבוט לא מפענח מחרוזת בכל קריאה (db/order_items.py).
+-- ערכים שאינם JSON תקין (או אינם מערך) הופכים ל-[].
+
+CREATE OR REPLACE FUNCTION pg_temp.to_order_items(p_value text)
+RETURNS jsonb
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    v_items jsonb;
+BEGIN
+    IF p_value IS NULL OR btrim(p_value) = '' THEN
+        RETURN '[]'::jsonb;
+    END IF;
+    v_items := p_value::jsonb;
+    IF jsonb_typeof(v_items) <> 'array' THEN
+        RETURN '[]'::jsonb;
+    END IF;
+    RETURN v_items;
+EXCEPTION WHEN others THEN
+    RETURN '[]'::jsonb;
+END;
+$$;
+
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'orders' AND column_name = 'products') <> 'jsonb' THEN
+        ALTER TABLE orders ALTER COLUMN products TYPE jsonb USING pg_temp.to_order_items(products::text);
+    END IF;
+END;
+$$;
+
+-- נרמול השורות: quantity / total_price כמספרים, product_id לפי שם המוצר (אם חסר)
+UPDATE orders o
+SET products = normalized.items
+FROM (
+    SELECT o2.id,
+           COALESCE(jsonb_agg(
+               item
+               || jsonb_build_object(
+                   'product_id', COALESCE(NULLIF(item->'product_id', 'null'::jsonb), to_jsonb(p.id)),
+                   'quantity', CASE WHEN btrim(item->>'quantity') ~ '^-?[0-9]+(\.[0-9]+)?$'
+                                    THEN btrim(item->>'quantity')::numeric ELSE 0 END,
+                   'total_price', CASE WHEN btrim(item->>'total_price') ~ '^-?[0-9]+(\.[0-9]+)?$'
+                                       THEN btrim(item->>'total_price')::numeric ELSE 0 END
+               )
+               ORDER BY ordinality
+           ) FILTER (WHERE jsonb_typeof(item) = 'object'), '[]'::jsonb) AS items
+    FROM orders o2
+    CROSS JOIN LATERAL jsonb_array_elements(o2.products) WITH ORDINALITY AS elements(item, ordinality)
+    LEFT JOIN products p ON p.name = item->>'name'
+    WHERE jsonb_typeof(o2.products) = 'array'
+    GROUP BY o2.id
+) AS normalized
+WHERE o.id = normalized.id
+  AND o.products IS DISTINCT FROM normalized.items;
+
+ALTER TABLE orders ALTER COLUMN products SET DEFAULT '[]'::jsonb;
+
+-- PostgREST: רענון ה-schema cache אחרי שינוי סוג עמודה
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,68 @@
+-- סיכום משמרת מצטבר: order_ready מוסיף כל הזמנה שנמסרה ל-shifts.summary של המשמרת הפתוחה
+-- נקרא דרך POST /rest/v1/rpc/bump_shift_summary (db/shift_summary.py)
+--
+-- p_delta: {"<שם מוצר>": {"total_quantity": <number>, "total_price": <number>}, ...}
+-- מחזיר את הסיכום המעודכן (NULL אם המשמרת לא קיימת).
+-- shifts.summary נשאר text (JSON) כמו שנכתב בסגירת משמרת.
+--
+-- summary = NULL: משמרת שנפתחה לפני שהסיכום המצטבר היה קיים - הסיכום נבנה מכל ההזמנות שהושלמו
+-- מאז opened_time (כולל ההזמנה הנוכחית, שכבר completed), ו-p_delta לא מתווסף שוב.
+
+CREATE OR REPLACE FUNCTION bump_shift_summary(p_shift_id bigint, p_delta jsonb) RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_raw text;
+    v_opened shifts.opened_time%TYPE;
+    v_summary jsonb;
+    v_name text;
+    v_delta jsonb;
+BEGIN
+    -- נעילת שורת המשמרת: שתי הזמנות שנמסרות ביחד מתווספות אחת אחרי השנייה
+    SELECT summary, opened_time INTO v_raw, v_opened
+    FROM shifts WHERE id = p_shift_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF v_raw IS NULL THEN
+        SELECT coalesce(jsonb_object_agg(s.name, jsonb_build_object(
+                   'total_quantity', s.total_quantity, 'total_price', s.total_price)), '{}'::jsonb)
+        INTO v_summary
+        FROM (
+            SELECT item->>'name' AS name,
+                   sum(coalesce((item->>'quantity')::numeric, 0)) AS total_quantity,
+                   sum(coalesce((item->>'total_price')::numeric, 0)) AS total_price
+            FROM orders o
+            CROSS JOIN LATERAL jsonb_array_elements(
+                CASE WHEN jsonb_typeof(o.products) = 'array' THEN o.products ELSE '[]'::jsonb END) AS item
+            WHERE o.status = 'completed' AND o.delivered >= v_opened
+              AND jsonb_typeof(item) = 'object'
+              AND coalesce(item->>'name', '') <> ''
+            GROUP BY item->>'name'
+        ) AS s;
+
+        UPDATE shifts SET summary = v_summary::text WHERE id = p_shift_id;
+        RETURN v_summary;
+    END IF;
+
+    v_summary := coalesce(nullif(btrim(v_raw), '')::jsonb, '{}'::jsonb);
+
+    FOR v_name, v_delta IN SELECT key, value FROM jsonb_each(p_delta) LOOP
+        v_summary := v_summary || jsonb_build_object(v_name, jsonb_build_object(
+            'total_quantity', coalesce((v_summary -> v_name ->> 'total_quantity')::numeric, 0)
+                              + coalesce((v_delta ->> 'total_quantity')::numeric, 0),
+            'total_price', coalesce((v_summary -> v_name ->> 'total_price')::numeric, 0)
+                           + coalesce((v_delta ->> 'total_price')::numeric, 0)
+        ));
+    END LOOP;
+
+    UPDATE shifts SET summary = v_summary::text WHERE id = p_shift_id;
+    RETURN v_summary;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION bump_shift_summary(bigint, jsonb) TO anon, authenticated;
+
+-- רענון ה-schema cache של PostgREST כדי שה-RPC יהיה זמין מיד
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,109 @@
+-- complete_order_with_stock + ה-rollups של ההזמנה באותה טרנזקציה
+-- order_ready עושה קריאה אחת במקום complete + bump_daily_stats + bump_shift_summary
+--
+-- ⚠️ דורש שכבר הורצו, בסדר הזה:
+--   002_complete_order_rpc.sql  - complete_order_with_stock (הגרסה שמוחלפת כאן)
+--   003_daily_stats.sql         - טבלת daily_stats + bump_daily_stats
+--   005_shift_summary.sql       - bump_shift_summary
+-- בלי 003 / 005 הפונקציה נוצרת, אבל כל השלמת הזמנה תיכשל (function does not exist).
+--
+-- פרמטרים חדשים (אופציונליים):
+--   p_stats        - שורות daily_stats של ההזמנה (db/daily_stats.py: order_stat_rows), נשלחות ל-bump_daily_stats
+--   p_shift_id     - המשמרת הפתוחה; NULL = אין משמרת פתוחה
+--   p_shift_delta  - התוספת לסיכום המשמרת (db/shift_summary.py: summary_delta), נשלחת ל-bump_shift_summary
+-- מחזיר כמו ב-002, ובהצלחה גם "shift_summary": הסיכום המעודכן של המשמרת (או null).
+
+-- החתימה השתנתה - הגרסה הקודמת נמחקת כדי ש-PostgREST לא יראה שתי פונקציות באותו שם
+DROP FUNCTION IF EXISTS complete_order_with_stock(bigint, jsonb, bigint, text, text, timestamp);
+
+CREATE OR REPLACE FUNCTION complete_order_with_stock(
+    p_order_id bigint,
+    p_items jsonb,
+    p_courier_id bigint,
+    p_courier_name text,
+    p_courier_username text,
+    p_delivered timestamp,
+    p_stats jsonb DEFAULT '[]'::jsonb,
+    p_shift_id bigint DEFAULT NULL,
+    p_shift_delta jsonb DEFAULT '{}'::jsonb
+) RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_order orders%ROWTYPE;
+    v_item record;
+    v_stock integer;
+    v_missing jsonb := '[]'::jsonb;
+    v_short jsonb := '[]'::jsonb;
+    v_shift_summary jsonb;
+BEGIN
+    -- נעילת ההזמנה: שני שליחים שלוחצים ביחד - השני יחכה ויקבל already_completed
+    SELECT * INTO v_order FROM orders WHERE id = p_order_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'order_not_found');
+    END IF;
+
+    IF v_order.status = 'completed' OR v_order.delivered IS NOT NULL THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'already_completed');
+    END IF;
+
+    -- נעילת המוצרים לפי סדר id (מונע deadlock בין הזמנות במקביל) ובדיקת מלאי
+    FOR v_item IN
+        SELECT key::bigint AS product_id, value::integer AS qty
+        FROM jsonb_each_text(p_items)
+        ORDER BY key::bigint
+    LOOP
+        SELECT stock INTO v_stock FROM products WHERE id = v_item.product_id FOR UPDATE;
+        IF NOT FOUND THEN
+            v_missing := v_missing || to_jsonb(v_item.product_id);
+        ELSIF COALESCE(v_stock, 0) < v_item.qty THEN
+            v_short := v_short || jsonb_build_array(jsonb_build_object(
+                'product_id', v_item.product_id,
+                'stock', COALESCE(v_stock, 0),
+                'required', v_item.qty
+            ));
+        END IF;
+    END LOOP;
+
+    IF jsonb_array_length(v_missing) > 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'product_not_found', 'details', v_missing);
+    END IF;
+
+    IF jsonb_array_length(v_short) > 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'insufficient_stock', 'details', v_short);
+    END IF;
+
+    UPDATE products p
+    SET stock = COALESCE(p.stock, 0) - i.qty
+    FROM (
+        SELECT key::bigint AS product_id, value::integer AS qty
+        FROM jsonb_each_text(p_items)
+    ) i
+    WHERE p.id = i.product_id;
+
+    UPDATE orders
+    SET status = 'completed',
+        delivered = p_delivered,
+        courier_id = p_courier_id,
+        courier_name = p_courier_name,
+        courier_username = p_courier_username
+    WHERE id = p_order_id
+    RETURNING * INTO v_order;
+
+    -- ה-rollups באותה טרנזקציה: אין קריאות נוספות לפני שההודעה לשליח מתעדכנת
+    IF jsonb_array_length(coalesce(p_stats, '[]'::jsonb)) > 0 THEN
+        PERFORM bump_daily_stats(p_stats);
+    END IF;
+    IF p_shift_id IS NOT NULL THEN
+        v_shift_summary := bump_shift_summary(p_shift_id, coalesce(p_shift_delta, '{}'::jsonb));
+    END IF;
+
+    RETURN jsonb_build_object('ok', true, 'order', to_jsonb(v_order), 'shift_summary', v_shift_summary);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION complete_order_with_stock(bigint, jsonb, bigint, text, text, timestamp, jsonb, bigint, jsonb)
+    TO anon, authenticated;
+
+-- רענון ה-schema cache של PostgREST כדי שה-RPC יהיה זמין מיד
+NOTIFY pgrst, 'reload schema';
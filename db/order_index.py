@@ -0,0 +1,206 @@
+"""
+אינדקס חיפוש הזמנות בזיכרון (order@..., order$..., order:dd.mm.yyyy:dd.mm.yyyy, fstatus)
+
+posting lists (set של order ids) לפי:
+    username    בלי '@', אותיות קטנות
+    phone       ספרות בלבד
+    product     שם מוצר (casefold) - ה-JSON של products מפוענח פעם אחת, בהכנסה
+    status
+ואינדקס תאריכים ממוין (created, id) - טווח נמצא ב-bisect.
+
+נבנה בסריקה בעמודים (iter_rows) בעליית הבוט, ומתעדכן ב-write-through מ-confirm_order,
+order_ready, handlers של השליח (minutes / delay) ו-erase_orders_before_date.
+שינויים מבחוץ (dashboard, סקריפטים) נקלטים אחרי ttl שניות לכל היותר.
+"""
+import asyncio
+import bisect
+import datetime
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .order_items import order_items
+
+
+def normalize_username(value) -> str:
+    return str(value or '').strip().lstrip('@').lower()
+
+
+def normalize_phone(value) -> str:
+    return ''.join(char for char in str(value or '') if char.isdigit())
+
+
+def normalize_product(value) -> str:
+    return str(value or '').strip().casefold()
+
+
+def _created(value) -> Optional[datetime.datetime]:
+    if isinstance(value, datetime.datetime):
+        created = value
+    else:
+        try:
+            created = datetime.datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+    # השוואה מול תאריכים מהמשתמש (naive)
+    return created.replace(tzinfo=None)
+
+
+def _product_names(value) -> Set[str]:
+    return {normalize_product(product.get('name')) for product in order_items(value) if product.get('name')}
+
+
+class OrderIndex:
+    """Snapshot של orders עם posting lists; כל החיפושים בזיכרון"""
+
+    def __init__(self, async_db_client, ttl: float = 3600.0, page_size: int = 1000):
+        self.async_db_client = async_db_client
+        self.ttl = ttl
+        self.page_size = page_size
+        self._clear()
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _clear(self) -> None:
+        self._orders: Dict[int, dict] = {}
+        self._keys: Dict[int, tuple] = {}
+        self._by_username: Dict[str, Set[int]] = {}
+        self._by_phone: Dict[str, Set[int]] = {}
+        self._by_product: Dict[str, Set[int]] = {}
+        self._by_status: Dict[str, Set[int]] = {}
+        self._by_created: List[Tuple[datetime.datetime, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    # ---------- posting lists ----------
+
+    @staticmethod
+    def _post(postings: Dict[str, Set[int]], key: str, order_id: int) -> None:
+        if key:
+            postings.setdefault(key, set()).add(order_id)
+
+    @staticmethod
+    def _unpost(postings: Dict[str, Set[int]], key: str, order_id: int) -> None:
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(order_id)
+            if not ids:
+                del postings[key]
+
+    def _index(self, row: dict) -> None:
+        order_id = row['id']
+        username = normalize_username(row.get('client_username'))
+        phone = normalize_phone(row.get('client_phone'))
+        products = _product_names(row.get('products'))
+        status = row.get('status') or ''
+        created = _created(row.get('created'))
+
+        self._orders[order_id] = row
+        self._keys[order_id] = (username, phone, products, status, created)
+        self._post(self._by_username, username, order_id)
+        self._post(self._by_phone, phone, order_id)
+        for product in products:
+            self._post(self._by_product, product, order_id)
+        self._post(self._by_status, status, order_id)
+        if created is not None:
+            bisect.insort(self._by_created, (created, order_id))
+
+    def _unindex(self, order_id: int) -> Optional[dict]:
+        row = self._orders.pop(order_id, None)
+        if row is None:
+            return None
+        username, phone, products, status, created = self._keys.pop(order_id)
+        self._unpost(self._by_username, username, order_id)
+        self._unpost(self._by_phone, phone, order_id)
+        for product in products:
+            self._unpost(self._by_product, product, order_id)
+        self._unpost(self._by_status, status, order_id)
+        if created is not None:
+            position = bisect.bisect_left(self._by_created, (created, order_id))
+            if position < len(self._by_created) and self._by_created[position] == (created, order_id):
+                del self._by_created[position]
+        return row
+
+    # ---------- snapshot ----------
+
+    def _replace(self, rows: Iterable[dict]) -> None:
+        self._clear()
+        for row in rows:
+            if row.get('id') is not None:
+                self._index(row)
+        self._loaded_at = time.monotonic()
+        print(f"✅ orders index loaded: {len(self._orders)} orders")
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def invalidate(self) -> None:
+        """החיפוש הבא יבנה את האינדקס מחדש"""
+        self._loaded_at = None
+
+    async def load_async(self) -> None:
+        try:
+            self._replace([row async for row in self.async_db_client.iter_rows('orders', page_size=self.page_size)])
+        except Exception as e:
+            # משאירים את ה-snapshot הקודם (אם יש)
+            print(f"⚠️ Could not load orders index: {e}")
+
+    async def ensure_loaded_async(self) -> None:
+        if self._is_fresh():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._is_fresh():
+                await self.load_async()
+
+    # ---------- write-through ----------
+
+    def upsert(self, row: dict) -> None:
+        """הזמנה חדשה / מעודכנת; שורה חלקית מתמזגת עם הקיימת"""
+        if not row or row.get('id') is None:
+            return
+        old = self._unindex(row['id']) or {}
+        self._index({**old, **row})
+
+    def remove(self, order_id: int) -> None:
+        self._unindex(order_id)
+
+    def remove_created_before(self, date: datetime.datetime) -> int:
+        """אחרי מחיקת הזמנות ישנות (created < date)"""
+        position = bisect.bisect_left(self._by_created, (date, -1))
+        order_ids = [order_id for _, order_id in self._by_created[:position]]
+        for order_id in order_ids:
+            self._unindex(order_id)
+        return len(order_ids)
+
+    # ---------- search ----------
+
+    def _rows(self, order_ids: Iterable[int]) -> List[dict]:
+        return [dict(self._orders[order_id]) for order_id in sorted(order_ids)]
+
+    async def search_client(self, identifier: str) -> List[dict]:
+        """ספרות -> טלפון, אחרת username (עם או בלי '@')"""
+        await self.ensure_loaded_async()
+        if identifier.lstrip('+').isdigit():
+            return self._rows(self._by_phone.get(normalize_phone(identifier), ()))
+        return self._rows(self._by_username.get(normalize_username(identifier), ()))
+
+    async def search_products(self, names: Iterable[str]) -> List[dict]:
+        """הזמנות שמכילות לפחות אחד מהמוצרים"""
+        await self.ensure_loaded_async()
+        order_ids: Set[int] = set()
+        for name in names:
+            order_ids |= self._by_product.get(normalize_product(name), set())
+        return self._rows(order_ids)
+
+    async def search_status(self, status: str) -> List[dict]:
+        await self.ensure_loaded_async()
+        return self._rows(self._by_status.get(status, ()))
+
+    async def search_created(self, start: datetime.datetime, end: datetime.datetime) -> List[dict]:
+        """start <= created <= end"""
+        await self.ensure_loaded_async()
+        low = bisect.bisect_left(self._by_created, (start, -1))
+        high = bisect.bisect_right(self._by_created, (end, float('inf')))
+        return self._rows(order_id for _, order_id in self._by_created[low:high])
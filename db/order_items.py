@@ -0,0 +1,87 @@
+"""
+שורות מוצר של הזמנה (orders.products כ-jsonb)
+
+כל שורה: {"product_id": int|None, "name": str, "quantity": number, "total_price": number}
+(שדות נוספים, למשל unit_price, נשמרים כמו שהם).
+
+- validate_order_items: ולידציה ונרמול פעם אחת, ב-confirm_order, לפני ה-insert
+- order_items: קריאה מהירה - jsonb חוזר מ-PostgREST כרשימה מוכנה, בלי json.loads;
+  מחרוזת JSON (שורות מלפני db/migrations/004_order_items_jsonb.sql) מפוענחת כגיבוי
+- stock_quantities: כמות לכל product_id להורדת מלאי ב-order_ready (complete_order_with_stock)
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+ORDER_ITEM_FIELDS = ('product_id', 'name', 'quantity', 'total_price')
+
+
+def order_items(value: Any) -> List[dict]:
+    """שורות המוצר של הזמנה (orders.products); ערך לא תקין -> []"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, dict)]
+
+
+def _number(value: Any, field: str, index: int):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Product #{index}: invalid {field} {value!r}")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if value < 0:
+        raise ValueError(f"Product #{index}: negative {field} {value!r}")
+    return value
+
+
+def validate_order_items(items: Any, product_id_by_name: Optional[Callable[[str], Optional[int]]] = None) -> List[dict]:
+    """
+    ולידציה ונרמול של שורות ההזמנה - זורק ValueError עם הסבר.
+    product_id_by_name משלים product_id לשורות שאין בהן (למשל מהקטלוג).
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("Order has no products")
+
+    result = []
+    for index, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Product #{index}: not a dictionary - {type(item)}")
+        name = item.get('name')
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"Product #{index}: missing name")
+
+        quantity = _number(item.get('quantity'), 'quantity', index)
+        if quantity == 0:
+            raise ValueError(f"Product #{index}: zero quantity")
+        total_price = _number(item.get('total_price', 0), 'total_price', index)
+
+        product_id = item.get('product_id')
+        if product_id is None and product_id_by_name is not None:
+            product_id = product_id_by_name(name)
+
+        result.append({**item, 'product_id': product_id, 'name': name,
+                       'quantity': quantity, 'total_price': total_price})
+    return result
+
+
+def stock_quantities(items: List[dict]) -> Tuple[Dict[int, Any], List[str]]:
+    """
+    כמות לכל product_id (שורות של אותו מוצר מאוחדות) - מהשורות כפי שנשמרו ב-confirm_order.
+    מחזיר גם את שמות השורות בלי product_id. כמות לא תקינה (שורות ישנות) -> ValueError.
+    """
+    quantities: Dict[int, Any] = {}
+    missing = []
+    for index, item in enumerate(items, start=1):
+        product_id = item.get('product_id')
+        if product_id is None:
+            missing.append(item.get('name'))
+            continue
+        quantities[product_id] = quantities.get(product_id, 0) + _number(item.get('quantity'), 'quantity', index)
+    return quantities, missing
@@ -0,0 +1,133 @@
+"""
+קטלוג מוצרים בזיכרון - אינדקס לפי id ולפי name
+
+כל טבלת products נטענת בבקשה אחת (iter_rows), ו-pickers / list_products / Shift.set_products
+מוגשים מהזיכרון. כל כתיבה לטבלה עוברת דרך apply_write / remove (write-through)
+או invalidate (למשל אחרי complete_order_with_stock שמוריד מלאי בצד השרת).
+
+version עולה בכל שינוי - מאפשר לדעת אם תצוגה שנבנתה מהקטלוג עדיין עדכנית.
+שינויים מבחוץ (dashboard, סקריפטים) נקלטים אחרי ttl שניות לכל היותר.
+
+הגישה הסינכרונית (all / get / get_by_name) בתוך event loop לא חוסמת: מחזירה את ה-snapshot
+הנוכחי ומתזמנת load_async ברקע. טעינה סינכרונית רק בלי loop רץ (סקריפטים).
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+
+class ProductCatalog:
+    """Snapshot של products: by_id / by_name + version מונוטוני"""
+
+    def __init__(self, db_client, async_db_client, ttl: float = 300.0):
+        self.db_client = db_client
+        self.async_db_client = async_db_client
+        self.ttl = ttl
+        self._by_id: Dict[int, dict] = {}
+        self._by_name: Dict[str, dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self.version = 0
+
+    # ---------- snapshot ----------
+
+    def _replace(self, rows: list) -> None:
+        self._by_id = {row['id']: row for row in rows}
+        self._by_name = {row.get('name'): row for row in rows}
+        self._loaded_at = time.monotonic()
+        self.version += 1
+        print(f"✅ products catalog loaded: {len(self._by_id)} products (version {self.version})")
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _rows(self) -> List[dict]:
+        return [dict(row) for row in self._by_id.values()]
+
+    def _get(self, product_id) -> Optional[dict]:
+        row = self._by_id.get(product_id)
+        return dict(row) if row else None
+
+    def _get_by_name(self, name: str) -> Optional[dict]:
+        row = self._by_name.get(name)
+        return dict(row) if row else None
+
+    def invalidate(self) -> None:
+        """הטעינה הבאה תהיה מה-DB"""
+        self._loaded_at = None
+        self.version += 1
+
+    def apply_write(self, row: dict) -> None:
+        """עדכון שורה אחרי insert/update מוצלח (write-through)"""
+        if not row or row.get('id') is None:
+            self.invalidate()
+            return
+        old = self._by_id.get(row['id'], {})
+        merged = {**old, **row}
+        if old.get('name') != merged.get('name'):
+            self._by_name.pop(old.get('name'), None)
+        self._by_id[row['id']] = merged
+        self._by_name[merged.get('name')] = merged
+        self.version += 1
+
+    def remove(self, product_id: int) -> None:
+        row = self._by_id.pop(product_id, None)
+        if row:
+            self._by_name.pop(row.get('name'), None)
+        self.version += 1
+
+    # ---------- sync (kb pickers, סקריפטים) ----------
+
+    def load(self) -> None:
+        try:
+            self._replace(list(self.db_client.iter_rows('products')))
+        except Exception as e:
+            # משאירים את ה-snapshot הקודם (אם יש)
+            print(f"⚠️ Could not load products catalog: {e}")
+
+    def _ensure_fresh(self) -> None:
+        if self._is_fresh():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.load()
+            return
+        # בתוך ה-loop של הבוט - טעינה ברקע (אחת בכל פעם), ה-snapshot הנוכחי מוגש מיד
+        if self._load_task is None or self._load_task.done():
+            self._load_task = loop.create_task(self.load_async())
+
+    def all(self) -> List[dict]:
+        self._ensure_fresh()
+        return self._rows()
+
+    def get(self, product_id: int) -> Optional[dict]:
+        self._ensure_fresh()
+        return self._get(product_id)
+
+    def get_by_name(self, name: str) -> Optional[dict]:
+        self._ensure_fresh()
+        return self._get_by_name(name)
+
+    # ---------- async (handlers) ----------
+
+    async def load_async(self) -> None:
+        try:
+            self._replace([row async for row in self.async_db_client.iter_rows('products')])
+        except Exception as e:
+            print(f"⚠️ Could not load products catalog: {e}")
+
+    async def all_async(self) -> List[dict]:
+        if not self._is_fresh():
+            await self.load_async()
+        return self._rows()
+
+    async def get_async(self, product_id: int) -> Optional[dict]:
+        if not self._is_fresh():
+            await self.load_async()
+        return self._get(product_id)
+
+    async def get_by_name_async(self, name: str) -> Optional[dict]:
+        if not self._is_fresh():
+            await self.load_async()
+        return self._get_by_name(name)
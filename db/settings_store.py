@@ -0,0 +1,137 @@
+"""
+Snapshot בזיכרון של טבלת bot_settings
+
+כל הטבלה נטענת בבקשה אחת, והקריאות (order_chat / admin_chat וכו') מוגשות מהזיכרון.
+set_bot_setting כותב ל-DB ומעדכן את ה-snapshot (write-through).
+
+רענון: כל refresh_interval שניות נבדק max(updated_at) בבקשה קטנה אחת (limit=1),
+והטבלה נטענת מחדש רק אם הגרסה השתנתה (למשל עדכון מ-init_settings.py או מה-dashboard).
+ב-handlers הבדיקה רצה ברקע - הקריאה עצמה אף פעם לא מחכה לרשת אחרי הטעינה הראשונה.
+גם get הסינכרוני בתוך event loop רץ לא חוסם: מחזיר מה-snapshot ומתזמן את הבדיקה ברקע.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+
+class BotSettingsStore:
+    """Snapshot של bot_settings (key -> row) עם גרסה לפי updated_at"""
+
+    def __init__(self, db_client, async_db_client, refresh_interval: float = 60.0):
+        self.db_client = db_client
+        self.async_db_client = async_db_client
+        self.refresh_interval = refresh_interval
+        self._rows: Dict[str, dict] = {}
+        self._version: str = ''
+        self._loaded = False
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    # ---------- snapshot ----------
+
+    @staticmethod
+    def _row_version(row: dict) -> str:
+        return str(row.get('updated_at') or '')
+
+    def _replace(self, rows: list) -> None:
+        self._rows = {row['key']: row for row in rows}
+        self._version = max((self._row_version(row) for row in rows), default='')
+        self._loaded = True
+        self._checked_at = time.monotonic()
+        print(f"✅ bot_settings snapshot loaded: {len(self._rows)} keys (version {self._version or 'N/A'})")
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.refresh_interval
+
+    def _value(self, key: str, default_value: Any) -> Any:
+        row = self._rows.get(key)
+        if row is None:
+            return default_value
+        return row.get('value', default_value)
+
+    def has(self, key: str) -> bool:
+        return key in self._rows
+
+    def get_row(self, key: str) -> Optional[dict]:
+        return self._rows.get(key)
+
+    def apply_write(self, row: dict) -> None:
+        """עדכון ה-snapshot אחרי כתיבה מוצלחת (write-through)"""
+        if not row or 'key' not in row:
+            return
+        merged = {**self._rows.get(row['key'], {}), **row}
+        self._rows[row['key']] = merged
+        self._version = max(self._version, self._row_version(merged))
+
+    # ---------- sync (סקריפטים, אתחול) ----------
+
+    def load(self) -> None:
+        """טעינת כל bot_settings בבקשה אחת (בעמודים אם צריך)"""
+        try:
+            self._replace(list(self.db_client.iter_rows('bot_settings')))
+        except Exception as e:
+            # משאירים את ה-snapshot הקודם; ננסה שוב בבדיקה הבאה
+            self._checked_at = time.monotonic()
+            print(f"⚠️ Could not load bot_settings: {e}")
+
+    def refresh(self) -> None:
+        """טעינה מחדש רק אם max(updated_at) השתנה"""
+        try:
+            latest = self.db_client.select('bot_settings', columns='updated_at',
+                                           order='updated_at.desc.nullslast', limit=1)
+            if latest and self._row_version(latest[0]) != self._version:
+                self.load()
+        except Exception as e:
+            print(f"⚠️ Could not refresh bot_settings: {e}")
+        finally:
+            self._checked_at = time.monotonic()
+
+    def get(self, key: str, default_value: Any = "") -> Any:
+        # אחרי טעינה שנכשלה מחכים refresh_interval לפני ניסיון נוסף
+        if self._is_stale():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # סקריפטים / אתחול - אין loop לחסום
+                if self._loaded:
+                    self.refresh()
+                else:
+                    self.load()
+            else:
+                self._schedule_refresh()
+        return self._value(key, default_value)
+
+    # ---------- async (handlers) ----------
+
+    async def load_async(self) -> None:
+        try:
+            self._replace([row async for row in self.async_db_client.iter_rows('bot_settings')])
+        except Exception as e:
+            self._checked_at = time.monotonic()
+            print(f"⚠️ Could not load bot_settings: {e}")
+
+    async def refresh_async(self) -> None:
+        try:
+            latest = await self.async_db_client.select('bot_settings', columns='updated_at',
+                                                       order='updated_at.desc.nullslast', limit=1)
+            if latest and self._row_version(latest[0]) != self._version:
+                await self.load_async()
+        except Exception as e:
+            print(f"⚠️ Could not refresh bot_settings: {e}")
+        finally:
+            self._checked_at = time.monotonic()
+            self._refresh_task = None
+
+    def _schedule_refresh(self) -> None:
+        """רענון (או טעינה, אם עוד לא נטען) ברקע, אחד בכל פעם - מחזירים מיד את הערך מה-snapshot"""
+        if self._refresh_task is None or self._refresh_task.done():
+            refresh = self.refresh_async if self._loaded else self.load_async
+            self._refresh_task = asyncio.get_running_loop().create_task(refresh())
+
+    async def get_async(self, key: str, default_value: Any = "") -> Any:
+        if not self._loaded:
+            if self._is_stale():
+                await self.load_async()
+        elif self._is_stale():
+            self._schedule_refresh()
+        return self._value(key, default_value)
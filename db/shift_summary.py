@@ -0,0 +1,103 @@
+"""
+סיכום משמרת מצטבר (shifts.summary)
+
+{"<שם מוצר>": {"total_quantity": ..., "total_price": ...}, ...}
+
+order_ready מוסיף את שורות ההזמנה (delta) למשמרת הפתוחה - ב-RPC אטומי bump_shift_summary
+(db/migrations/005_shift_summary.sql), שנקרא מתוך complete_order_with_stock (006), והזיכרון
+מתעדכן מהסיכום שחזר. סגירת משמרת קוראת את הסיכום המוכן במקום לסרוק את כל ההזמנות.
+
+summary = NULL במשמרת שנפתחה לפני שהסיכום המצטבר היה קיים - נבנה פעם אחת מההזמנות שלה
+(ב-RPC בהזמנה הראשונה שנמסרת, או ב-get_summary אם לא נמסרה אף הזמנה מאז).
+"""
+import copy
+import datetime
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from .order_items import order_items
+
+
+def parse_summary(value: Any) -> Optional[Dict[str, dict]]:
+    """dict מ-shifts.summary; None אם עדיין לא נצבר (NULL)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if not value.strip():
+            return {}
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def summary_delta(items: Iterable[dict]) -> Dict[str, dict]:
+    """תוספת לסיכום משורות המוצר של הזמנה אחת"""
+    delta: Dict[str, dict] = {}
+    for item in items:
+        name = item.get('name')
+        if not name:
+            continue
+        entry = delta.setdefault(name, {'total_quantity': 0, 'total_price': 0})
+        entry['total_quantity'] += item.get('quantity') or 0
+        entry['total_price'] += item.get('total_price') or 0
+    return delta
+
+
+def merge_summary(summary: Dict[str, dict], delta: Dict[str, dict]) -> Dict[str, dict]:
+    for name, values in delta.items():
+        entry = summary.setdefault(name, {'total_quantity': 0, 'total_price': 0})
+        entry['total_quantity'] += values['total_quantity']
+        entry['total_price'] += values['total_price']
+    return summary
+
+
+def summary_total(summary: Dict[str, dict]) -> float:
+    return sum(values.get('total_price') or 0 for values in summary.values())
+
+
+class ShiftAccumulator:
+    """הסיכום של המשמרת הפתוחה בזיכרון + שמירה בשורת המשמרת"""
+
+    def __init__(self, async_db_client):
+        self.async_db_client = async_db_client
+        self._shift_id = None
+        self._summary: Dict[str, dict] = {}
+
+    def start(self, shift_id) -> None:
+        """משמרת חדשה נפתחה (summary = '{}')"""
+        self._shift_id = shift_id
+        self._summary = {}
+
+    def reset(self) -> None:
+        self._shift_id = None
+        self._summary = {}
+
+    def apply(self, shift_id, summary) -> None:
+        """הסיכום ש-complete_order_with_stock החזיר (bump_shift_summary בתוכו) - הופך לסיכום בזיכרון"""
+        if shift_id is not None and isinstance(summary, dict):
+            self._shift_id, self._summary = shift_id, summary
+
+    async def get_summary(self, shift: dict) -> Dict[str, dict]:
+        """הסיכום הנוכחי של המשמרת (עותק) - מהזיכרון, או משורת המשמרת אחרי restart"""
+        if self._shift_id != shift['id']:
+            rows = await self.async_db_client.select('shifts', {'id': shift['id']}, columns='id,summary,opened_time')
+            row = rows[0] if rows else shift
+            summary = parse_summary(row.get('summary'))
+            if summary is None:
+                summary = await self._rebuild(row)
+            self._shift_id, self._summary = shift['id'], summary
+        return copy.deepcopy(self._summary)
+
+    async def _rebuild(self, shift: dict) -> Dict[str, dict]:
+        """משמרת בלי סיכום מצטבר - בנייה חד-פעמית מההזמנות שנמסרו מאז הפתיחה, ושמירה"""
+        opened_time = shift.get('opened_time')
+        if isinstance(opened_time, str):
+            opened_time = datetime.datetime.fromisoformat(opened_time)
+        summary: Dict[str, dict] = {}
+        async for order in self.async_db_client.iter_rows(
+                'orders', {'status': 'completed', 'delivered': {'gte': opened_time}}, columns='id,products'):
+            merge_summary(summary, summary_delta(order_items(order.get('products'))))
+        await self.async_db_client.update('shifts', {'summary': json.dumps(summary)}, {'id': shift['id']})
+        return summary
@@ -1,13 +1,139 @@
 """
 Supabase Client Wrapper
 עבודה ישירה עם Supabase באמצעות HTTP Requests
+
+SupabaseClient - סינכרוני (סקריפטים, אתחול, מקלדות סינכרוניות)
+AsyncSupabaseClient - אסינכרוני עם connection pool (handlers של הבוט)
 """
 import os
+import copy
+import asyncio
 import requests
-from typing import Optional, List, Dict, Any, Union
+import httpx
+from typing import Optional, List, Dict, Any, Union, Iterator, AsyncIterator
 from datetime import datetime
 
 
+# אופרטורים של PostgREST שנתמכים בפילטרים
+FILTER_OPERATORS = {'eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'in', 'is'}
+
+# קיצורים נוחים לאופרטורים (תאימות ל-{'>=': ..., '<=': ...} שהיה בשימוש ב-get_orders_by_filter)
+OPERATOR_ALIASES = {'==': 'eq', '!=': 'neq', '>': 'gt', '>=': 'gte', '<': 'lt', '<=': 'lte'}
+
+
+def _format_filter_value(op: str, value: Any) -> str:
+    """המרת ערך של פילטר לפורמט של PostgREST (op.value)"""
+    if op == 'is':
+        # is.null / is.true / is.false
+        if value is None:
+            return "is.null"
+        if isinstance(value, bool):
+            return f"is.{str(value).lower()}"
+        return f"is.{value}"
+    
+    if op == 'in':
+        items = []
+        for item in value:
+            item = item.isoformat() if isinstance(item, datetime) else str(item)
+            # ערכים עם פסיקים / סוגריים / מרכאות חייבים להיות בתוך מרכאות
+            if any(ch in item for ch in ',()"'):
+                item = '"' + item.replace('\\', '\\\\').replace('"', '\\"') + '"'
+            items.append(item)
+        return f"in.({','.join(items)})"
+    
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return f"{op}.{value}"
+
+
+def build_filter_params(filters: Optional[Dict] = None) -> List[tuple]:
+    """
+    בניית query parameters עבור PostgREST מתוך dict של פילטרים
+    
+    צורות נתמכות לכל עמודה:
+    - ערך רגיל:               {'status': 'completed'}            -> status=eq.completed
+    - tuple של (אופרטור, ערך): {'delivered': ('gte', since)}     -> delivered=gte.<iso>
+    - dict של כמה אופרטורים:   {'created': {'gte': a, 'lte': b}}  -> created=gte.a&created=lte.b
+    - in / is:                {'id': ('in', [1, 2])}, {'courier_id': ('is', None)}
+    
+    מחזיר רשימה של (key, value) כדי לאפשר כמה פילטרים על אותה עמודה (טווחים).
+    """
+    params = []
+    if filters:
+        for key, value in filters.items():
+            if isinstance(value, tuple) and len(value) == 2 and OPERATOR_ALIASES.get(value[0], value[0]) in FILTER_OPERATORS:
+                conditions = [value]
+            elif isinstance(value, dict):
+                conditions = list(value.items())
+            else:
+                params.append((key, f"eq.{value}" if not str(value).startswith('eq.') else value))
+                continue
+            
+            for op, op_value in conditions:
+                op = OPERATOR_ALIASES.get(op, op)
+                if op not in FILTER_OPERATORS:
+                    raise ValueError(f"Unsupported filter operator '{op}' for column '{key}'")
+                params.append((key, _format_filter_value(op, op_value)))
+    return params
+
+
+def build_select_params(filters: Optional[Dict] = None, order: Union[str, List[str], None] = None,
+                        limit: Optional[int] = None, offset: Optional[int] = None,
+                        columns: Union[str, List[str], None] = None) -> List[tuple]:
+    """
+    בניית query parameters מלאים ל-SELECT: עמודות + פילטרים + order + limit/offset
+    
+    columns: 'id,status' או ['id', 'status'] - רק העמודות האלה יחזרו (ברירת מחדל: כל העמודות)
+    order: 'delivered.desc' או ['status', 'id.desc']
+    """
+    params = []
+    if columns:
+        params.append(('select', columns if isinstance(columns, str) else ','.join(columns)))
+    params += build_filter_params(filters)
+    if order:
+        params.append(('order', order if isinstance(order, str) else ','.join(order)))
+    if limit is not None:
+        params.append(('limit', str(int(limit))))
+    if offset:
+        params.append(('offset', str(int(offset))))
+    return params
+
+
+# גודל עמוד ברירת מחדל ל-iter_rows (מתחת ל-max-rows של PostgREST ב-Supabase)
+DEFAULT_PAGE_SIZE = 1000
+
+
+def build_page_params(filters: Optional[Dict], key: str, last_key: Any, page_size: int,
+                      columns: Union[str, List[str], None] = None) -> List[tuple]:
+    """
+    query parameters לעמוד אחד של iter_rows (keyset pagination על עמודת key)
+    
+    במקום offset משתמשים ב-key > last_key, כך שכל עמוד הוא index scan קצר
+    ושורות שנוספות תוך כדי ייצוא לא גורמות לדילוג/כפילות.
+    """
+    if columns:
+        column_list = columns.split(',') if isinstance(columns, str) else list(columns)
+        if key not in column_list:
+            column_list.append(key)
+        columns = column_list
+    params = build_select_params(filters, order=f"{key}.asc", limit=page_size, columns=columns)
+    if last_key is not None:
+        params.append((key, f"gt.{last_key}"))
+    return params
+
+
+def parse_content_range_count(content_range: Optional[str]) -> int:
+    """מספר השורות מתוך Content-Range של PostgREST ('0-9/10' או '*/10') - עבור Prefer: count=exact"""
+    if not content_range or '/' not in content_range:
+        return 0
+    total = content_range.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else 0
+
+
+# Headers ל-DELETE מרובה: בלי להחזיר את השורות שנמחקו, רק את הכמות ב-Content-Range
+BULK_DELETE_HEADERS = {"Prefer": "return=minimal, count=exact"}
+
+
 class SupabaseClient:
     """Client עבור Supabase דרך HTTP Requests ישירים"""
     
@@ -26,20 +152,28 @@ class SupabaseClient:
             "Prefer": "return=representation"
         }
         
+        # Session אחד לכל התהליך - שומר חיבורי keep-alive במקום handshake לכל בקשה
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
         print(f"✅ Supabase Client initialized: {self.url}")
     
-    def select(self, table: str, filters: Optional[Dict] = None) -> List[Dict]:
-        """SELECT query - מבוסס על HTTP GET request"""
+    def select(self, table: str, filters: Optional[Dict] = None, order: Union[str, List[str], None] = None,
+               limit: Optional[int] = None, offset: Optional[int] = None,
+               columns: Union[str, List[str], None] = None) -> List[Dict]:
+        """
+        SELECT query - מבוסס על HTTP GET request
+        
+        הסינון, המיון וה-limit/offset מתבצעים בצד השרת (PostgREST) - ראה build_filter_params.
+        columns מגביל את העמודות שחוזרות (select=) - עדיף להעביר רק את מה שה-caller באמת צריך.
+        """
         try:
             url = f"{self.url}/rest/v1/{table}"
             
             # בניית query parameters
-            params = {}
-            if filters:
-                for key, value in filters.items():
-                    params[key] = f"eq.{value}" if not str(value).startswith('eq.') else value
+            params = build_select_params(filters, order, limit, offset, columns)
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
             # Handle empty or None response
@@ -56,12 +190,35 @@ class SupabaseClient:
             print(f"❌ JSON decode error: {e}")
             return []
     
+    def iter_rows(self, table: str, filters: Optional[Dict] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                  columns: Union[str, List[str], None] = None, key: str = 'id') -> Iterator[Dict]:
+        """
+        מעבר על כל השורות בטבלה בעמודים (keyset על key) - generator
+        
+        בניגוד ל-select, לא נחתך ע"י max-rows של PostgREST ולא מחזיק את כל הטבלה בזיכרון.
+        שגיאת HTTP באמצע נזרקת החוצה (ייצוא חלקי גרוע יותר מייצוא שנכשל).
+        """
+        url = f"{self.url}/rest/v1/{table}"
+        last_key = None
+        while True:
+            response = self.session.get(url, params=build_page_params(filters, key, last_key, page_size, columns))
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                print(f"❌ ITER_ROWS error ({table}): {e}")
+                raise
+            rows = response.json() if response.text else []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_key = rows[-1][key]
+    
     def insert(self, table: str, data: Dict) -> Dict:
         """INSERT query - מבוסס על HTTP POST request"""
         try:
             url = f"{self.url}/rest/v1/{table}"
             
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self.session.post(url, json=data)
             response.raise_for_status()
             
             # Handle empty or None response
@@ -101,12 +258,9 @@ class SupabaseClient:
             url = f"{self.url}/rest/v1/{table}"
             
             # בניית query parameters
-            params = {}
-            if filters:
-                for key, value in filters.items():
-                    params[key] = f"eq.{value}" if not str(value).startswith('eq.') else value
+            params = build_filter_params(filters)
             
-            response = requests.patch(url, headers=self.headers, json=data, params=params)
+            response = self.session.patch(url, json=data, params=params)
             
             # CRITICAL: Check status code before processing
             status_code = response.status_code
@@ -146,12 +300,9 @@ class SupabaseClient:
             url = f"{self.url}/rest/v1/{table}"
             
             # בניית query parameters
-            params = {}
-            if filters:
-                for key, value in filters.items():
-                    params[key] = f"eq.{value}" if not str(value).startswith('eq.') else value
+            params = build_filter_params(filters)
             
-            response = requests.delete(url, headers=self.headers, params=params)
+            response = self.session.delete(url, params=params)
             response.raise_for_status()
             return True
         
@@ -159,6 +310,64 @@ class SupabaseClient:
             print(f"❌ DELETE error: {e}")
             return False
     
+    def delete_many(self, table: str, filters: Dict, batch_size: Optional[int] = None) -> int:
+        """
+        DELETE מרובה לפי פילטר (למשל {'created': ('lt', date)}) - מחזיר כמה שורות נמחקו
+        
+        בלי batch_size: בקשת DELETE אחת עם הפילטר.
+        עם batch_size: מוחקים בקבוצות של עד batch_size שורות (id=in.(...)) כדי לא לנעול
+        את הטבלה לאורך כל המחיקה.
+        שגיאת HTTP נזרקת החוצה - מחיקה חלקית צריכה להיות גלויה.
+        """
+        if not filters:
+            raise ValueError("delete_many requires filters")
+        
+        url = f"{self.url}/rest/v1/{table}"
+        deleted = 0
+        try:
+            if not batch_size:
+                response = self.session.delete(url, params=build_filter_params(filters), headers=BULK_DELETE_HEADERS)
+                response.raise_for_status()
+                return parse_content_range_count(response.headers.get('Content-Range'))
+            
+            while True:
+                ids = [row['id'] for row in self.select(table, filters, order='id', limit=batch_size, columns='id')]
+                if not ids:
+                    return deleted
+                params = build_filter_params({**filters, 'id': ('in', ids)})
+                response = self.session.delete(url, params=params, headers=BULK_DELETE_HEADERS)
+                response.raise_for_status()
+                deleted += parse_content_range_count(response.headers.get('Content-Range'))
+                print(f"🗑️ {table}: deleted {deleted} rows so far")
+                if len(ids) < batch_size:
+                    return deleted
+        
+        except requests.exceptions.HTTPError as e:
+            print(f"❌ DELETE error ({table}, after {deleted} rows): {e}")
+            raise
+    
+    def rpc(self, function: str, params: Optional[Dict] = None) -> Any:
+        """
+        קריאה ל-stored procedure דרך PostgREST (POST /rpc/<function>)
+        
+        הפונקציה רצה בטרנזקציה אחת בצד השרת. שגיאת HTTP נזרקת החוצה (כמו ב-insert).
+        """
+        try:
+            url = f"{self.url}/rest/v1/rpc/{function}"
+            
+            response = self.session.post(url, json=params or {})
+            response.raise_for_status()
+            
+            if not response.text:
+                return None
+            
+            return response.json()
+        
+        except requests.exceptions.HTTPError as e:
+            print(f"❌ RPC error ({function}): {e}")
+            print(f"   Response: {response.text}")
+            raise
+    
     def execute_sql(self, query: str) -> Any:
         """Execute raw SQL query"""
         try:
@@ -173,7 +382,283 @@ class SupabaseClient:
             raise
 
 
+class AsyncSupabaseClient:
+    """
+    Client אסינכרוני עבור Supabase - אותו API כמו SupabaseClient, אבל awaitable.
+    
+    כל הבקשות עוברות דרך httpx.AsyncClient אחד עם connection pool של HTTP/1.1 keep-alive,
+    כך שבקשה איטית ל-PostgREST לא חוסמת את ה-event loop של הבוט (concurrent_updates=True).
+    
+    מגבלות ה-pool ניתנות להגדרה ב-ENV:
+    - SUPABASE_MAX_CONNECTIONS (ברירת מחדל 20)
+    - SUPABASE_MAX_KEEPALIVE (ברירת מחדל 10)
+    - SUPABASE_KEEPALIVE_EXPIRY בשניות (ברירת מחדל 30)
+    - SUPABASE_TIMEOUT בשניות (ברירת מחדל 10)
+    
+    select הוא single-flight: קריאות זהות שרצות במקביל (אותה טבלה, פילטרים, order ו-projection)
+    חולקות בקשת HTTP אחת, וכל קורא מקבל עותק משלו של השורות.
+    select_stats סופר לכל טבלה כמה קריאות היו וכמה מהן צורפו לבקשה קיימת.
+    """
+    
+    def __init__(self, max_connections: int = None, max_keepalive: int = None,
+                 keepalive_expiry: float = None, timeout: float = None):
+        self.url = os.getenv("SUPABASE_URL")
+        self.key = os.getenv("SUPABASE_ANON_KEY")
+        
+        if not self.url or not self.key:
+            raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in .env")
+        
+        self.headers = {
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=representation"
+        }
+        
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=max_keepalive or int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=keepalive_expiry or float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30")),
+        )
+        self.timeout = httpx.Timeout(timeout or float(os.getenv("SUPABASE_TIMEOUT", "10")))
+        
+        # ה-pool נוצר בעצלות בתוך ה-event loop שמשתמש בו
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+        
+        # single-flight: (table, params) -> (Task של הבקשה שבדרך, [מספר הקוראים שהצטרפו])
+        self._inflight: Dict[tuple, tuple] = {}
+        self.select_stats: Dict[str, Dict[str, int]] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """מחזיר את ה-pool הפעיל, ויוצר חדש אם ה-event loop התחלף (סקריפטים עם asyncio.run)"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.url}/rest/v1",
+                headers=self.headers,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=False,
+            )
+            self._loop = loop
+        return self._client
+    
+    async def aclose(self) -> None:
+        """סגירת ה-connection pool (נקרא ב-shutdown של הבוט)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+    
+    async def select(self, table: str, filters: Optional[Dict] = None, order: Union[str, List[str], None] = None,
+                     limit: Optional[int] = None, offset: Optional[int] = None,
+                     columns: Union[str, List[str], None] = None) -> List[Dict]:
+        """SELECT query - HTTP GET אסינכרוני (אותם פילטרים/order/limit/columns כמו SupabaseClient.select)"""
+        try:
+            params = build_select_params(filters, order, limit, offset, columns)
+        except ValueError as e:
+            print(f"❌ SELECT error: {e}")
+            return []
+        
+        stats = self.select_stats.setdefault(table, {'calls': 0, 'coalesced': 0})
+        stats['calls'] += 1
+        
+        key = (table, tuple(params))
+        loop = asyncio.get_running_loop()
+        entry = self._inflight.get(key)
+        joined = entry is not None and not entry[0].done() and entry[0].get_loop() is loop
+        if joined:
+            task, joiners = entry
+            joiners[0] += 1
+            stats['coalesced'] += 1
+        else:
+            task, joiners = loop.create_task(self._select(table, params)), [0]
+            self._inflight[key] = (task, joiners)
+            task.add_done_callback(lambda done, key=key: self._forget_inflight(key, done))
+        
+        # shield - ביטול של קורא אחד לא מבטל את הבקשה לשאר הממתינים
+        rows = await asyncio.shield(task)
+        # קורא יחיד מקבל את התוצאה עצמה (בלי העתקה); כשהבקשה שותפה - כל קורא מקבל עותק עמוק
+        # (גם jsonb מקונן כמו products), כך ששינוי אצל אחד לא מגיע לאחרים
+        return copy.deepcopy(rows) if joiners[0] else rows
+    
+    def _forget_inflight(self, key: tuple, task: asyncio.Task) -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # מסמן שהשגיאה נקראה גם אם כל הממתינים בוטלו
+    
+    def get_select_stats(self) -> Dict[str, Dict[str, int]]:
+        """עותק של מוני ה-single-flight לכל טבלה"""
+        return {table: dict(stats) for table, stats in self.select_stats.items()}
+    
+    async def _select(self, table: str, params: List[tuple]) -> List[Dict]:
+        """בקשת ה-GET עצמה (נקראת פעם אחת לכל קבוצת קריאות זהות)"""
+        try:
+            response = await self._get_client().get(f"/{table}", params=params)
+            response.raise_for_status()
+            
+            # Handle empty or None response
+            if not response.text:
+                return []
+            
+            return response.json()
+        
+        except httpx.HTTPStatusError as e:
+            print(f"❌ SELECT error: {e}")
+            return []
+        except ValueError as e:
+            # Handle JSON decode errors
+            print(f"❌ JSON decode error: {e}")
+            return []
+    
+    async def iter_rows(self, table: str, filters: Optional[Dict] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                        columns: Union[str, List[str], None] = None, key: str = 'id') -> AsyncIterator[Dict]:
+        """
+        מעבר על כל השורות בטבלה בעמודים (keyset על key) - async generator
+        
+        async for row in async_db_client.iter_rows('orders', {'status': 'completed'}):
+            ...
+        
+        שגיאת HTTP באמצע נזרקת החוצה (ייצוא חלקי גרוע יותר מייצוא שנכשל).
+        """
+        last_key = None
+        while True:
+            params = build_page_params(filters, key, last_key, page_size, columns)
+            response = await self._get_client().get(f"/{table}", params=params)
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                print(f"❌ ITER_ROWS error ({table}): {e}")
+                raise
+            rows = response.json() if response.text else []
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            last_key = rows[-1][key]
+    
+    async def insert(self, table: str, data: Dict) -> Dict:
+        """INSERT query - HTTP POST אסינכרוני"""
+        try:
+            response = await self._get_client().post(f"/{table}", json=data)
+            response.raise_for_status()
+            
+            # Handle empty or None response
+            if not response.text:
+                return {}
+            
+            result = response.json()
+            return result[0] if isinstance(result, list) else result
+        
+        except httpx.HTTPStatusError as e:
+            print(f"❌ INSERT error: {e}")
+            print(f"   Response: {e.response.text}")
+            raise
+        except ValueError as e:
+            # Handle JSON decode errors
+            print(f"❌ JSON decode error: {e}")
+            return {}
+    
+    async def update(self, table: str, data: Dict, filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        UPDATE query - HTTP PATCH אסינכרוני
+        
+        אותה התנהגות כמו SupabaseClient.update: רשימה ריקה = אף שורה לא עודכנה / שגיאה.
+        """
+        try:
+            response = await self._get_client().patch(f"/{table}", json=data, params=build_filter_params(filters))
+            
+            # 204 No Content = successful but NO ROWS MATCHED (error condition!)
+            if response.status_code == 204:
+                print(f"⚠️ UPDATE: No rows matched for table {table} with filters {filters}")
+                return []
+            
+            response.raise_for_status()
+            
+            if not response.text:
+                print(f"⚠️ UPDATE: Empty response for table {table} with filters {filters}")
+                return []
+            
+            result = response.json()
+            return result if isinstance(result, list) else [result]
+        
+        except httpx.HTTPStatusError as e:
+            print(f"❌ UPDATE error: {e}")
+            print(f"   Filters: {filters}")
+            print(f"   Status: {e.response.status_code}")
+            return []
+        except ValueError as e:
+            # Handle JSON decode errors
+            print(f"❌ JSON decode error: {e}")
+            return []
+    
+    async def delete_many(self, table: str, filters: Dict, batch_size: Optional[int] = None) -> int:
+        """DELETE מרובה לפי פילטר - אסינכרוני (ראה SupabaseClient.delete_many), מחזיר כמה שורות נמחקו"""
+        if not filters:
+            raise ValueError("delete_many requires filters")
+        
+        client = self._get_client()
+        deleted = 0
+        try:
+            if not batch_size:
+                response = await client.delete(f"/{table}", params=build_filter_params(filters), headers=BULK_DELETE_HEADERS)
+                response.raise_for_status()
+                return parse_content_range_count(response.headers.get('Content-Range'))
+            
+            while True:
+                rows = await self.select(table, filters, order='id', limit=batch_size, columns='id')
+                ids = [row['id'] for row in rows]
+                if not ids:
+                    return deleted
+                params = build_filter_params({**filters, 'id': ('in', ids)})
+                response = await client.delete(f"/{table}", params=params, headers=BULK_DELETE_HEADERS)
+                response.raise_for_status()
+                deleted += parse_content_range_count(response.headers.get('Content-Range'))
+                print(f"🗑️ {table}: deleted {deleted} rows so far")
+                if len(ids) < batch_size:
+                    return deleted
+        
+        except httpx.HTTPStatusError as e:
+            print(f"❌ DELETE error ({table}, after {deleted} rows): {e}")
+            raise
+    
+    async def rpc(self, function: str, params: Optional[Dict] = None) -> Any:
+        """קריאה ל-stored procedure (POST /rpc/<function>) - אסינכרוני, שגיאת HTTP נזרקת החוצה"""
+        try:
+            response = await self._get_client().post(f"/rpc/{function}", json=params or {})
+            response.raise_for_status()
+            
+            if not response.text:
+                return None
+            
+            return response.json()
+        
+        except httpx.HTTPStatusError as e:
+            print(f"❌ RPC error ({function}): {e}")
+            print(f"   Response: {e.response.text}")
+            raise
+    
+    async def delete(self, table: str, filters: Optional[Dict] = None) -> bool:
+        """DELETE query - HTTP DELETE אסינכרוני"""
+        try:
+            response = await self._get_client().delete(f"/{table}", params=build_filter_params(filters))
+            response.raise_for_status()
+            return True
+        
+        except httpx.HTTPStatusError as e:
+            print(f"❌ DELETE error: {e}")
+            return False
+
+
 def get_supabase_client() -> SupabaseClient:
     """קבל Supabase client instance"""
     return SupabaseClient()
 
+
+def get_async_supabase_client() -> AsyncSupabaseClient:
+    """קבל AsyncSupabaseClient instance (connection pool משותף)"""
+    return AsyncSupabaseClient()
+
@@ -5,29 +5,29 @@ from telegram.constants import ParseMode
 from telegram.error import BadRequest, Forbidden
 from config.config import *
 from config.kb import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from db.db import *
 from funcs.utils import *
 
 @is_admin
 async def del_roles(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     data = update.callback_query.data
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     if data == 'del_o':
-        operators_data = db_client.select('users', {'role': 'operator'})
+        operators_data = await async_db_client.select('users', {'role': 'operator'}, columns='user_id,username,firstname')
         dikb = [[InlineKeyboardButton(f"@{u.get('username')}|{u.get('firstname')}", callback_data=f"del_{u.get('user_id')}") for u in operators_data]]
     elif data == 'del_c':
         # CRITICAL FIX: Use 'courier' (Role.RUNNER.value) not 'runner'!
-        operators_data = db_client.select('users', {'role': 'courier'})
+        operators_data = await async_db_client.select('users', {'role': 'courier'}, columns='user_id,username,firstname')
         dikb = [[InlineKeyboardButton(f"@{u.get('username')}|{u.get('firstname')}", callback_data=f"del_{u.get('user_id')}") for u in operators_data]]
     elif data == 'del_s':
-        operators_data = db_client.select('users', {'role': 'stockman'})
+        operators_data = await async_db_client.select('users', {'role': 'stockman'}, columns='user_id,username,firstname')
         dikb = [[InlineKeyboardButton(f"@{u.get('username')}|{u.get('firstname')}", callback_data=f"del_{u.get('user_id')}") for u in operators_data]]
 
     replkbmkp = InlineKeyboardMarkup(inline_keyboard=dikb)
@@ -36,18 +36,19 @@ async def del_roles(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def delete_staff_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     user_id = int(update.callback_query.data.replace('del_', ''))
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client, invalidate_user_cache
     
-    users = db_client.select('users', {'user_id': user_id})
+    users = await async_db_client.select('users', {'user_id': user_id})
     
     if users:
         user = users[0]
         role = user['role']
 
-        db_client.update('users', {'role': 'guest'}, {'user_id': user_id})
+        await async_db_client.update('users', {'role': 'guest'}, {'user_id': user_id})
+        invalidate_user_cache(user_id)
         await update.effective_message.edit_text(t('staff_removed', lang).format(user['firstname'], user['username'], role), reply_markup=get_admin_action_kb(lang), parse_mode=ParseMode.HTML)
\ No newline at end of file
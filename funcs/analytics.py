@@ -0,0 +1,151 @@
+"""
+Analytics לטווחים ארוכים (30 / 90 / 365 ימים) - pandas / NumPy
+
+ההזמנות והמשמרות נטענות פעם אחת ל-DataFrame עמודתי:
+- orders: delivered כ-datetime64, total ו-quantity מחושבים מהשורות
+- lines: שורה לכל מוצר בהזמנה (explode), name כ-category
+- shifts: closed_time כ-datetime64 ועמודות הכספים כמספרים
+
+כל הדוחות (מוצר, לקוח, יום בשבוע, מחיר, רווח) הם groupby וקטוריים על ה-frames,
+בלי לולאות Python על הזמנות. ReportEngine עובר לכאן כשהחלון >= ANALYTICS_MIN_DAYS.
+"""
+import datetime
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db.order_items import order_items
+
+
+ORDER_COLUMNS = ['id', 'client_name', 'client_username', 'client_phone', 'delivered', 'products']
+SHIFT_COLUMNS = ['closed_time', 'brutto', 'netto', 'operator_paid', 'runner_paid', 'petrol_paid']
+CLIENT_COLUMNS = ['client_name', 'client_username', 'client_phone']
+MONEY_COLUMNS = SHIFT_COLUMNS[1:]
+
+# מאיזה גודל חלון ReportEngine משתמש ב-pandas במקום ב-daily_stats + לולאה על ההזמנות
+ANALYTICS_MIN_DAYS = int(os.getenv("ANALYTICS_MIN_DAYS", "30"))
+
+
+def _py(value):
+    """numpy scalar -> int/float של Python (int כשאין חלק עשרוני)"""
+    value = value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# ---------- frames ----------
+
+def orders_frame(rows: List[dict]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(orders, lines) מתוך שורות orders של PostgREST"""
+    orders = pd.DataFrame.from_records(rows, columns=ORDER_COLUMNS)
+    orders['delivered'] = pd.to_datetime(orders['delivered'], errors='coerce', format='ISO8601')
+    orders = orders.dropna(subset=['delivered']).reset_index(drop=True)
+    orders[CLIENT_COLUMNS] = orders[CLIENT_COLUMNS].fillna('')
+
+    # שורות המוצר (jsonb) של כל הזמנה, ואז explode לשורת מוצר
+    exploded = orders[['id']].assign(product=orders['products'].map(order_items)).explode('product')
+    exploded = exploded.dropna(subset=['product']).reset_index(drop=True)
+    details = pd.DataFrame(exploded['product'].tolist(), index=exploded.index)
+    lines = exploded[['id']].join(details.reindex(columns=['name', 'quantity', 'total_price']))
+    lines = lines.dropna(subset=['name'])
+    lines['quantity'] = pd.to_numeric(lines['quantity'], errors='coerce').fillna(0)
+    lines['total_price'] = pd.to_numeric(lines['total_price'], errors='coerce').fillna(0)
+    lines['name'] = lines['name'].astype(str).astype('category')
+
+    totals = lines.groupby('id', sort=False)[['total_price', 'quantity']].sum()
+    orders['total'] = orders['id'].map(totals['total_price']).fillna(0)
+    orders['quantity'] = orders['id'].map(totals['quantity']).fillna(0)
+    return orders.drop(columns=['products']), lines
+
+
+def shifts_frame(rows: List[dict]) -> pd.DataFrame:
+    shifts = pd.DataFrame.from_records(rows, columns=SHIFT_COLUMNS)
+    shifts['closed_time'] = pd.to_datetime(shifts['closed_time'], errors='coerce', format='ISO8601')
+    shifts[MONEY_COLUMNS] = shifts[MONEY_COLUMNS].apply(pd.to_numeric, errors='coerce').fillna(0)
+    return shifts
+
+
+async def load_orders_frame(since: datetime.datetime, until: Optional[datetime.datetime] = None):
+    """הזמנות שהושלמו בטווח -> (orders, lines); עמודים דרך iter_rows"""
+    from db.db import async_db_client, Status
+
+    delivered = {'gte': since}
+    if until:
+        delivered['lte'] = until
+    rows = [row async for row in async_db_client.iter_rows(
+        'orders', {'status': Status.completed.value, 'delivered': delivered}, columns=','.join(ORDER_COLUMNS))]
+    return orders_frame(rows)
+
+
+async def load_shifts_frame(since: datetime.datetime, until: Optional[datetime.datetime] = None) -> pd.DataFrame:
+    """משמרות שנסגרו בטווח"""
+    from db.db import async_db_client, ShiftStatus
+
+    closed_time = {'gte': since}
+    if until:
+        closed_time['lte'] = until
+    rows = [row async for row in async_db_client.iter_rows(
+        'shifts', {'status': ShiftStatus.closed.value, 'closed_time': closed_time}, columns='id,' + ','.join(SHIFT_COLUMNS))]
+    return shifts_frame(rows)
+
+
+# ---------- reports ----------
+
+def product_report(lines: pd.DataFrame) -> Dict[str, float]:
+    """שם מוצר -> כמות, מהגבוה לנמוך"""
+    quantities = lines.groupby('name', observed=True)['quantity'].sum().sort_values(ascending=False)
+    return {str(name): _py(quantity) for name, quantity in quantities.items()}
+
+
+def client_report(orders: pd.DataFrame) -> List[Tuple[str, str, str, int]]:
+    """(name, username, phone, orders), מהלקוח עם הכי הרבה הזמנות"""
+    counts = orders.groupby(CLIENT_COLUMNS, sort=False).size().sort_values(ascending=False, kind='stable')
+    return [(name, username, phone, int(count)) for (name, username, phone), count in counts.items()]
+
+
+def weekday_report(orders: pd.DataFrame) -> List[Tuple[str, int]]:
+    """('Monday', orders), מהיום העמוס ביותר"""
+    counts = orders['delivered'].dt.day_name().value_counts()
+    return [(day, int(count)) for day, count in counts.items()]
+
+
+def price_report(orders: pd.DataFrame, top_n: int = 15) -> pd.DataFrame:
+    """top_n ההזמנות עם הסכום הגבוה ביותר"""
+    return orders.nlargest(top_n, 'total')
+
+
+def profit_report(shifts: pd.DataFrame, orders: pd.DataFrame, lines: pd.DataFrame) -> dict:
+    """סיכום כספי לטווח: סכומי המשמרות, מספר הזמנות ומוצרים שנמכרו (כמות + סכום)"""
+    money = shifts[MONEY_COLUMNS].sum()
+    products = (lines.groupby('name', observed=True)[['quantity', 'total_price']].sum()
+                .sort_values('total_price', ascending=False))
+    days = shifts['closed_time'].dt.normalize().nunique()
+    return {
+        'shifts': len(shifts),
+        'days': int(days),
+        'orders': len(orders),
+        **{column: _py(money[column]) for column in MONEY_COLUMNS},
+        'products': {str(name): {'quantity': _py(row['quantity']), 'total_price': _py(row['total_price'])}
+                     for name, row in products.iterrows()},
+    }
+
+
+def build_report_set(since: datetime.datetime, orders: pd.DataFrame, lines: pd.DataFrame, top_n: int = 15):
+    """אותו ReportSet כמו funcs/report_engine.build_report_set, מחושב מה-frames"""
+    from funcs.report_engine import ReportOrder, ReportSet
+
+    top_orders = [
+        ReportOrder(_py(row.id), row.client_name, row.client_username, row.client_phone,
+                    row.delivered.to_pydatetime(), _py(row.total), _py(row.quantity))
+        for row in price_report(orders, top_n).itertuples(index=False)
+    ]
+    return ReportSet(
+        since=since,
+        products=product_report(lines),
+        clients=client_report(orders),
+        top_orders=top_orders,
+        weekdays=weekday_report(orders),
+    )
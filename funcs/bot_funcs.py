@@ -3,10 +3,9 @@ from telegram import InlineKeyboardMarkup, InlineKeyboardButton, Update, ReplyKe
 from telegram.ext import ContextTypes, Job, ExtBot
 from telegram.constants import ParseMode
 from telegram.error import BadRequest, Forbidden
-from pyrogram import Client
 from config.config import *
 from config.kb import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from db.db import *
 from funcs.utils import *
 
@@ -24,7 +23,7 @@ async def change_language(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     reply_markup = InlineKeyboardMarkup(keyboard)
     
     # Get current language for the message
-    lang = get_user_lang(user.id)
+    lang = await get_user_lang_async(user.id)
     
     if update.message:
         await send_message_with_cleanup(update, context, t("choose_language", lang), reply_markup=reply_markup)
@@ -47,11 +46,11 @@ async def set_language(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     await clean_previous_message(update, context)
     
     # Update user language in DB - Supabase only
-    from db.db import db_client
+    from db.db import async_db_client, get_user_by_id_async, invalidate_user_cache
     
-    results = db_client.select('users', {'user_id': user.id})
-    if results:
-        db_client.update('users', {'lang': lang_code}, {'user_id': user.id})
+    if await get_user_by_id_async(user.id):
+        await async_db_client.update('users', {'lang': lang_code}, {'user_id': user.id})
+        invalidate_user_cache(user.id)
     
     # Send confirmation in new language
     await send_message_with_cleanup(update, context, t("language_changed", lang_code))
@@ -75,7 +74,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     logger.info(f"🚀 start() called by user {user.id} ({user.username})")
 
-    lang = get_user_lang(user.id)
+    lang = await get_user_lang_async(user.id)
     logger.info(f"🌍 User language: {lang}")
 
     # TEMPORARILY DISABLED: מחיקת הודעת /start גורמת ללופ
@@ -102,46 +101,70 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 @is_admin
 async def dump_choose_format(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     await send_message_with_cleanup(update, context, t('choose_format', lang), reply_markup=get_db_format_kb(lang))
 
 
 @is_admin
 async def dump_database(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     format_file = update.callback_query.data
 
-    if format_file == "xlsx":
-        # Replace Excel export with text export
-        from funcs.utils import export_orders_as_text
-        await export_orders_as_text(update, context, lang)
-    else:
-        # JSON remains as is
+    # JSON / NDJSON.gz / XLSX - streamed to a spooled temp file (db/dump.py)
+    try:
+        file, filename = await dump_db(format_file)
         try:
-            file = dump_db(format_file)
-            await update.effective_message.reply_document(document=file, filename=file.name)
-        except Exception as e:
-            await update.effective_message.reply_document(repr(e))
+            await update.effective_message.reply_document(document=file, filename=filename)
+        finally:
+            file.close()
+    except Exception as e:
+        await update.effective_message.reply_text(f"⚠️ {t('error', lang)}: {e!r}")
 
 @is_admin
 async def quick_reports(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
         add_to_navigation_history(context, 'quick_reports_menu')
     
-    await send_message_with_cleanup(update, context, t('choose_report_param', lang), reply_markup=get_quick_reports_kb(lang))
+    window_days = context.user_data.get('report_window_days', 7)
+    await send_message_with_cleanup(update, context, t('choose_report_param', lang), reply_markup=get_quick_reports_kb(lang, window_days))
+
+
+@is_admin
+async def set_report_window(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Choose the quick reports window (7 / 30 / 90 / 365 days)."""
+    from funcs.report_engine import REPORT_WINDOWS
+    window_days = int(update.callback_query.data.replace("report_window_", ""))
+    if window_days in REPORT_WINDOWS:
+        context.user_data['report_window_days'] = window_days
+    await quick_reports(update, context, from_back_button=True)
+
+
+async def get_report_set(context: ContextTypes.DEFAULT_TYPE):
+    """Shared report set (funcs/report_engine.py) for the admin's chosen window - loaded once per REPORTS_CACHE_TTL"""
+    from funcs.report_engine import get_report_engine
+    window_days = context.user_data.get('report_window_days', 7)
+    return window_days, await get_report_engine(window_days).get()
+
+
+def report_title(key: str, window_days: int, lang: str) -> str:
+    """Report title, with the period when it is not the default week"""
+    title = t(key, lang)
+    if window_days != 7:
+        title += f" ({t('last_n_days', lang).format(window_days)})"
+    return title
 
 
 @is_admin
 async def show_daily_profit_options(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     """Show daily profit report options."""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
@@ -150,6 +173,7 @@ async def show_daily_profit_options(update: Update, context: ContextTypes.DEFAUL
     keyboard = [
         [InlineKeyboardButton(t("btn_today", lang), callback_data="profit_today")],
         [InlineKeyboardButton(t("btn_yesterday", lang), callback_data="profit_yesterday")],
+        [InlineKeyboardButton(t("btn_last_n_days", lang).format(days), callback_data=f"profit_{days}") for days in (30, 90, 365)],
         [InlineKeyboardButton(t("btn_back", lang), callback_data="back"), InlineKeyboardButton(t("btn_home", lang), callback_data="home")]
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
@@ -162,14 +186,20 @@ async def show_daily_profit_options(update: Update, context: ContextTypes.DEFAUL
 async def daily_profit_report(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show daily profit report."""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Determine period based on button clicked
-    date_option = update.callback_query.data.replace("profit_", "")  # 'today' or 'yesterday'
+    date_option = update.callback_query.data.replace("profit_", "")  # 'today', 'yesterday' or number of days
     
     try:
-        report = await form_daily_profit_report(date_option, lang)
-        await send_message_with_cleanup(update, context, report, parse_mode=ParseMode.HTML)
+        if date_option.isdigit():
+            report = await form_period_profit_report(int(date_option), lang)
+            await send_message_with_cleanup(update, context, report, parse_mode=ParseMode.HTML)
+        else:
+            # today / yesterday - precomputed, "_refresh" recomputes
+            force = date_option.endswith("_refresh")
+            name = "profit_" + date_option.replace("_refresh", "")
+            await send_precomputed_report(update, context, name, lang, force)
     except Exception as e:
         await send_message_with_cleanup(update, context, t("error", lang).format(repr(e)), parse_mode=ParseMode.HTML)
 
@@ -177,44 +207,13 @@ async def daily_profit_report(update: Update, context: ContextTypes.DEFAULT_TYPE
 @is_admin
 async def report_by_product(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
-    # Using Supabase only
-    from db.db import db_client
-    seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
-    
-    all_orders = db_client.select('orders', {'status': 'completed'})
-    results = {}
-    
-    for order in all_orders:
-        if order.get('delivered'):
-            try:
-                delivered_time = datetime.datetime.fromisoformat(order['delivered'])
-                if delivered_time >= seven_days_ago:
-                    # CRITICAL: Safe JSON parsing with error handling
-                    products_json = order.get('products', '[]')
-                    if not products_json or not isinstance(products_json, str):
-                        continue
-                    try:
-                        products = json.loads(products_json)
-                        if not isinstance(products, list):
-                            continue
-                        for product in products:
-                            if isinstance(product, dict):
-                                product_key = json.dumps([product], ensure_ascii=False)
-                                if product_key not in results:
-                                    results[product_key] = 0
-                                results[product_key] += 1
-                    except (json.JSONDecodeError, TypeError):
-                        continue  # Skip invalid products JSON
-            except (ValueError, TypeError, AttributeError):
-                continue  # Skip invalid delivered timestamp
-    
-    # Convert to list format
-    results_list = [(k, v) for k, v in results.items()]
+    window_days, report_set = await get_report_set(context)
+    results = report_set.products
 
     # Check if we have any data
-    if not results_list:
+    if not results:
         await send_message_with_cleanup(update, context, text=t("no_data_for_report", lang))
         # Return to main menu after 2 seconds
         import asyncio
@@ -222,16 +221,12 @@ async def report_by_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await start(update, context)
         return
 
-    report = t("product_report_title", lang) + "\n\n"
+    report = report_title("product_report_title", window_days, lang) + "\n\n"
     total_count = 0
 
-    for product_data, count in results_list:
-        products = json.loads(product_data)  # JSON deserialization
-        for product in products:
-            product_name = product['name']
-            product_quantity = product['quantity']
-            report += f"{product_name} – {product_quantity * count} {t('units', lang)}.\n"  # Multiply by number of orders
-            total_count += product_quantity * count  # Count total quantity
+    for product_name, product_quantity in results.items():
+        report += f"{product_name} – {product_quantity} {t('units', lang)}.\n"
+        total_count += product_quantity  # Count total quantity
 
     report += f"\n{t('total', lang)}: {total_count} {t('units', lang)}"
 
@@ -241,28 +236,10 @@ async def report_by_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
 @is_admin
 async def report_by_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
-    # Using Supabase only
-    from db.db import db_client
-    seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
-    
-    all_orders = db_client.select('orders', {'status': 'completed'})
-    client_orders = {}
-    
-    for order in all_orders:
-        if order.get('delivered'):
-            try:
-                delivered_time = datetime.datetime.fromisoformat(order['delivered'])
-                if delivered_time >= seven_days_ago:
-                    key = (order.get('client_name', ''), order.get('client_username', ''), order.get('client_phone', ''))
-                    if key not in client_orders:
-                        client_orders[key] = 0
-                    client_orders[key] += 1
-            except (ValueError, TypeError, AttributeError):
-                continue  # Skip invalid delivered timestamp
-    
-    results = [(name, username, phone, count) for (name, username, phone), count in client_orders.items()]
+    window_days, report_set = await get_report_set(context)
+    results = report_set.clients
 
     # Check if we have any data
     if not results:
@@ -273,7 +250,7 @@ async def report_by_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         await start(update, context)
         return
 
-    report = t("client_report_title", lang) + "\n\n"
+    report = report_title("client_report_title", window_days, lang) + "\n\n"
     total_orders = 0
 
     for index, (client_name, client_username, client_phone, count) in enumerate(results, start=1):
@@ -288,76 +265,27 @@ async def report_by_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 @is_admin
 async def report_by_price(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
-    # Using Supabase only
-    from db.db import db_client
-    seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
-    
-    # Get all orders delivered in the last 7 days
-    all_orders = db_client.select('orders', {'status': 'completed'})
-    results = []
-    for order in all_orders:
-        if order.get('delivered'):
-            delivered_time = datetime.datetime.fromisoformat(order['delivered'])
-            if delivered_time >= seven_days_ago:
-                # Convert to object-like structure
-                obj = type('Order', (), order)()
-                # Ensure delivered is a datetime object
-                obj.delivered = delivered_time
-                results.append(obj)
-
-    order_prices = []
-
-    # Calculate total price for each order
-    for order in results:
-        try:
-            # CRITICAL: Safe JSON parsing with error handling
-            products_json = getattr(order, 'products', '[]')
-            if not products_json or not isinstance(products_json, str):
-                continue
-            try:
-                products = json.loads(products_json)
-                if not isinstance(products, list):
-                    continue
-                total_price = sum(product.get('total_price', 0) or 0 for product in products if isinstance(product, dict))
-                order_prices.append((order.id, order.client_name, order.client_username, order.client_phone, order.delivered, total_price))
-            except (json.JSONDecodeError, TypeError):
-                continue  # Skip invalid products JSON
-        except (AttributeError, TypeError):
-            continue  # Skip orders with missing attributes
-
-    # Sort orders by total price and take top 15
-    sorted_orders = sorted(order_prices, key=lambda x: x[2], reverse=True)[:15]
-
-    report = t("top_15_orders_by_price", lang) + "\n\n"
+    # Top 15 orders by total, parsed once per window
+    window_days, report_set = await get_report_set(context)
+    sorted_orders = report_set.top_orders
+
+    report = report_title("top_15_orders_by_price", window_days, lang) + "\n\n"
     
-    for index, (order_id, client_name, client_username, client_phone, delivered, total) in enumerate(sorted_orders, start=1):
-        report += f"{index}. {t('order', lang)} #{order_id} {client_name} {client_username} +{client_phone} {delivered.strftime('%d.%m.%Y, %H:%M:%S')} - {total} ₪.\n"
+    for index, order in enumerate(sorted_orders, start=1):
+        report += f"{index}. {t('order', lang)} #{order.id} {order.client_name} {order.client_username} +{order.client_phone} {order.delivered.strftime('%d.%m.%Y, %H:%M:%S')} - {order.total} ₪.\n"
 
     await send_message_with_cleanup(update, context, text=report)
 
 @is_admin
 async def report_by_days(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
-    # Using Supabase only
-    from db.db import db_client
-    seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
-
-    # Get all orders delivered in the last 7 days
-    all_orders = db_client.select('orders', {'status': 'completed'})
-    results = []
-    for order in all_orders:
-        if order.get('delivered'):
-            delivered_time = datetime.datetime.fromisoformat(order['delivered'])
-            if delivered_time >= seven_days_ago:
-                obj = type('Order', (), order)()
-                obj.delivered = delivered_time
-                results.append(obj)
-
-    weekday_count = {}
+    # Weekdays sorted by number of orders
+    window_days, report_set = await get_report_set(context)
+    sorted_weekdays = report_set.weekdays
 
     weekdays_translation = {
         'Monday': 'Понедельник',
@@ -370,18 +298,6 @@ async def report_by_days(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     }
 
 
-    # Count orders by day of week
-    for order in results:
-        if order.delivered:
-            weekday = order.delivered.strftime('%A')  # Get day of week
-            if weekday in weekday_count:
-                weekday_count[weekday] += 1
-            else:
-                weekday_count[weekday] = 1
-
-    # Sort weekdays by number of orders
-    sorted_weekdays = sorted(weekday_count.items(), key=lambda x: x[1], reverse=True)
-
     # Check if we have any data
     if not sorted_weekdays:
         await send_message_with_cleanup(update, context, text=t("no_data_for_report", lang))
@@ -391,7 +307,7 @@ async def report_by_days(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await start(update, context)
         return
 
-    report = t("orders_by_days_title", lang) + "\n\n"
+    report = report_title("orders_by_days_title", window_days, lang) + "\n\n"
     
     for index, (weekday, count) in enumerate(sorted_weekdays, start=1):
         report += f"{index}. {weekdays_translation[weekday]} - {count} {t('orders', lang)}.\n"
@@ -401,7 +317,7 @@ async def report_by_days(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 @is_admin
 async def show_admin_action_kb(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
@@ -413,16 +329,14 @@ async def show_admin_action_kb(update: Update, context: ContextTypes.DEFAULT_TYP
 async def beginning(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle shift start/status check"""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Using Supabase only
-    from db.db import get_opened_shift
+    from db.db import get_opened_shift_async
     
-    shift_data = get_opened_shift()
+    shift_data = await get_opened_shift_async()
     if shift_data:
-        # Convert dict to object
-        shift = type('Shift', (), shift_data)()
-        shift.opened_time = datetime.datetime.fromisoformat(shift_data['opened_time'])
+        shift = Shift.from_row(shift_data)
     else:
         shift = None
 
@@ -436,7 +350,7 @@ async def beginning(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             parse_mode=ParseMode.HTML
         )
     else:
-        products = Shift.set_products()
+        products = await Shift.set_products_async()
         prod_txt = " | ".join([f"{product['name']} {product['stock']}" for product in products])
         # send_message_with_cleanup already handles cleanup
         await send_message_with_cleanup(update, context, t('available_stock', lang).format(prod_txt), 
@@ -447,7 +361,7 @@ async def beginning(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 @is_operator
 async def msg_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     reply_markup = await get_all_active_orders_to_msg_kb()
 
@@ -460,7 +374,7 @@ async def msg_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 @is_admin
 async def manage_roles(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
@@ -471,7 +385,7 @@ async def manage_roles(update: Update, context: ContextTypes.DEFAULT_TYPE, from_
 @is_admin
 async def show_security_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
@@ -482,7 +396,7 @@ async def show_security_menu(update: Update, context: ContextTypes.DEFAULT_TYPE,
 
 async def all_orders(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
@@ -502,32 +416,23 @@ async def filter_orders_by_date(update: Update, context: ContextTypes.DEFAULT_TY
     
     # Make sure end_date is greater than start_date
     if start_date > end_date:
-        await send_message_with_cleanup(update, context, t("date_error", get_user_lang(update.effective_user.id)))
+        await send_message_with_cleanup(update, context, t("date_error", await get_user_lang_async(update.effective_user.id)))
         return
 
-    # Using Supabase only
-    from db.db import get_all_orders
-    import datetime
+    # Orders search index (db/order_index.py) - sorted by created
+    from db.db import order_index
     
-    # Filter orders by date
-    all_orders = get_all_orders()
-    orders = []
-    for order_dict in all_orders:
-        if order_dict.get('created'):
-            created_time = datetime.datetime.fromisoformat(order_dict['created'])
-            if start_date <= created_time <= end_date:
-                obj = type('Order', (), order_dict)()
-                orders.append(obj)
+    orders = await order_index.search_created(start_date, end_date)
 
     if not orders:
-        lang = get_user_lang(update.effective_user.id)
+        lang = await get_user_lang_async(update.effective_user.id)
         not_found = t("no_orders_found_dates", lang)
         await send_message_with_cleanup(update, context, f"{not_found}: {start_date} - {end_date}")
         return
 
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     msg = t("total_found", lang).format(len(orders))
-    context.user_data["orders_filtered"] = [order.to_dict() for order in orders]
+    context.user_data["orders_filtered"] = orders
 
     await send_message_with_cleanup(update, context, msg, parse_mode=ParseMode.HTML)
     await update.effective_message.delete()
@@ -538,41 +443,20 @@ async def filter_orders_by_product(update: Update, context: ContextTypes.DEFAULT
     product_names = update.effective_message.text.split('$')[1:]
     print(product_names)
 
-    # Using Supabase only
-    from db.db import get_all_orders
-    
-    # Example query to check products field content
-    orders = []
+    # Orders search index (db/order_index.py) - products JSON is parsed once, when an order is indexed
+    from db.db import order_index
     
-    all_orders = get_all_orders()
-    for order_dict in all_orders:
-        # CRITICAL: Safe JSON parsing with error handling
-        products_json = order_dict.get('products', '[]')
-        if not products_json or not isinstance(products_json, str):
-            continue
-        try:
-            products = json.loads(products_json)
-            if not isinstance(products, list):
-                continue
-            products_names_db = [p.get('name') for p in products if isinstance(p, dict) and p.get('name')]
-            found = bool(set(products_names_db).intersection(product_names))
-            if found:
-                obj = type('Order', (), order_dict)()
-                obj.get_products = lambda p=products: p  # Fix closure issue
-                obj.to_dict = lambda d=order_dict: d  # Fix closure issue
-                orders.append(obj)
-        except (json.JSONDecodeError, TypeError):
-            continue  # Skip invalid products JSON
+    orders = await order_index.search_products(product_names)
 
     if not orders:
-        lang = get_user_lang(update.effective_user.id)
+        lang = await get_user_lang_async(update.effective_user.id)
         not_found = t("no_orders_found_products", lang)
         await send_message_with_cleanup(update, context, f"{not_found}: {product_names}")
         return
 
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     msg = t("total_found", lang).format(len(orders))
-    context.user_data["orders_filtered"] = [order.to_dict() for order in orders]
+    context.user_data["orders_filtered"] = orders
 
     await send_message_with_cleanup(update, context, msg, parse_mode=ParseMode.HTML)
     await update.effective_message.delete()
@@ -581,7 +465,7 @@ async def filter_orders_by_product(update: Update, context: ContextTypes.DEFAULT
 async def fetch_orders_excel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     "Export orders as text instead of Excel"
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Use new function for text export
     from funcs.utils import export_orders_as_text
@@ -591,31 +475,20 @@ async def filter_orders_by_client(update: Update, context: ContextTypes.DEFAULT_
     "order@username | order@phone"
     identifier = update.effective_message.text.replace("order@", "")
 
-    # Using Supabase only
-    from db.db import get_all_orders
+    # Orders search index (db/order_index.py) - phone or username
+    from db.db import order_index
     
-    all_orders = get_all_orders()
-    orders = []
-    for order_dict in all_orders:
-        if identifier.isdigit():
-            if order_dict.get('client_phone') == identifier:
-                obj = type('Order', (), order_dict)()
-                orders.append(obj)
-        else:
-            search_identifier = "@" + identifier
-            if order_dict.get('client_username') == search_identifier:
-                obj = type('Order', (), order_dict)()
-                orders.append(obj)
+    orders = await order_index.search_client(identifier)
 
     if not orders:
-        lang = get_user_lang(update.effective_user.id)
+        lang = await get_user_lang_async(update.effective_user.id)
         not_found = t("no_orders_found_param", lang)
         await send_message_with_cleanup(update, context, f"{not_found}: {identifier}")
         return
 
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     msg = t("total_found", lang).format(len(orders))
-    context.user_data["orders_filtered"] = [order.to_dict() for order in orders]
+    context.user_data["orders_filtered"] = orders
 
     await send_message_with_cleanup(update, context, msg, parse_mode=ParseMode.HTML)
     await update.effective_message.delete()
@@ -623,7 +496,7 @@ async def filter_orders_by_client(update: Update, context: ContextTypes.DEFAULT_
 
 async def filter_orders_by_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     status_value = update.callback_query.data
 
@@ -631,15 +504,10 @@ async def filter_orders_by_status(update: Update, context: ContextTypes.DEFAULT_
         if status.value == status_value:
             break
 
-    # Using Supabase only
-    from db.db import get_all_orders
+    # Orders search index (db/order_index.py)
+    from db.db import order_index
     
-    all_orders = get_all_orders()
-    orders = []
-    for order_dict in all_orders:
-        if order_dict.get('status') == status.value:
-            obj = type('Order', (), order_dict)()
-            orders.append(obj)
+    orders = await order_index.search_status(status.value)
 
     if not orders:
         not_found = t("no_orders_found_status", lang)
@@ -647,7 +515,7 @@ async def filter_orders_by_status(update: Update, context: ContextTypes.DEFAULT_
         return
 
     msg = t("total_found", lang).format(len(orders))
-    context.user_data["orders_filtered"] = [order.to_dict() for order in orders]
+    context.user_data["orders_filtered"] = orders
 
     await send_message_with_cleanup(update, context, msg, parse_mode=ParseMode.HTML)
 
@@ -655,12 +523,12 @@ async def filter_orders_by_status(update: Update, context: ContextTypes.DEFAULT_
 @is_admin
 async def manage_links_tip(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     # Get current groups from database
-    from db.db import get_bot_setting
-    admin_chat = get_bot_setting('admin_chat') or links.ADMIN_CHAT
-    order_chat = get_bot_setting('order_chat') or links.ORDER_CHAT
+    from db.db import get_bot_setting_async
+    admin_chat = await get_bot_setting_async('admin_chat') or links.ADMIN_CHAT
+    order_chat = await get_bot_setting_async('order_chat') or links.ORDER_CHAT
     
     admin_group_link = ('@' + admin_chat) if '@' not in admin_chat else admin_chat
     order_group_link = ('@' + order_chat) if '@' not in order_chat else order_chat
@@ -678,23 +546,20 @@ async def erase_orders_before_date(update: Update, context: ContextTypes.DEFAULT
         # Convert strings to datetime objects
         date = datetime.datetime.strptime(start_date_str, '%d.%m.%Y')
 
-        # Using Supabase only
-        from db.db import get_all_orders, db_client
+        # Using Supabase only - one filtered DELETE (created=lt.<date>), optionally in batches;
+        # the erased orders are taken out of the daily_stats rollup too
+        from db.db import erase_orders_before_async
+        from funcs.report_engine import invalidate_reports
         
-        all_orders = get_all_orders()
-        orders_count = 0
-        for order in all_orders:
-            if order.get('created'):
-                created_time = datetime.datetime.fromisoformat(order['created'])
-                if created_time < date:
-                    db_client.delete('orders', {'id': order['id']})
-                    orders_count += 1
+        batch_size = int(os.getenv("ORDERS_DELETE_BATCH_SIZE", "0")) or None
+        orders_count = await erase_orders_before_async(date, batch_size=batch_size)
+        invalidate_reports()
     except Exception as e:
-        await send_message_with_cleanup(update, context, f"{t('error', get_user_lang(update.effective_user.id))}: {repr(e)}")
+        await send_message_with_cleanup(update, context, f"{t('error', await get_user_lang_async(update.effective_user.id))}: {repr(e)}")
         await update.effective_message.delete()
         return
 
-    await send_message_with_cleanup(update, context, t("orders_deleted_success", get_user_lang(update.effective_user.id)).format(count=orders_count))
+    await send_message_with_cleanup(update, context, t("orders_deleted_success", await get_user_lang_async(update.effective_user.id)).format(count=orders_count))
     await update.effective_message.delete()
 
 
@@ -717,7 +582,7 @@ P.S.: Эта команда всегда доступна в чате бота,
 async def filter_orders_by_param(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     "Filter params: fdate|fproduct|fclient|fstatus"
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Import the keyboard function
     from config.kb import get_filter_instruction_kb
@@ -749,26 +614,48 @@ async def filter_orders_by_param(update: Update, context: ContextTypes.DEFAULT_T
     elif update.callback_query.data == "fstatus":
         await edit_message_with_cleanup(update, context, t("choose_status", lang), reply_markup=get_filter_orders_by_status_kb(lang))
 
+# callback_data of the week report button (and its handler pattern in bot.py)
+WEEK_REPORT_CALLBACK = "week_report"
+
+
+async def send_precomputed_report(update: Update, context: ContextTypes.DEFAULT_TYPE, name: str, lang: str,
+                                  force: bool = False, callback_prefix: str = None) -> None:
+    """
+    Send a precomputed report (funcs/report_store.py) with its "computed at" stamp and a refresh button.
+    The button sends "<callback_prefix>_refresh" - the prefix must match the report's handler pattern
+    (defaults to the store name, e.g. "profit_today").
+    """
+    from funcs.report_store import precomputed_reports
+
+    report, computed_at = await precomputed_reports.get(name, lang, force=force)
+    text = report + "\n\n" + t("computed_at", lang).format(computed_at.strftime("%d.%m.%Y %H:%M"))
+    reply_markup = InlineKeyboardMarkup([
+        [InlineKeyboardButton(t("btn_refresh", lang), callback_data=f"{callback_prefix or name}_refresh")]
+    ])
+    await send_message_with_cleanup(update, context, text, parse_mode=ParseMode.HTML, reply_markup=reply_markup)
+
+
 async def show_week_report(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    lang = get_user_lang(update.effective_user.id)
-    week_report = await form_week_report(lang)
+    await update.callback_query.answer()
+    lang = await get_user_lang_async(update.effective_user.id)
+    force = update.callback_query.data == f"{WEEK_REPORT_CALLBACK}_refresh"
+    await send_precomputed_report(update, context, "week", lang, force, callback_prefix=WEEK_REPORT_CALLBACK)
 
-    if update.callback_query:
-        await update.callback_query.answer()
-        await send_message_with_cleanup(update, context, week_report, parse_mode=ParseMode.HTML)
-    else:
-        # Using Supabase only
-        from db.db import db_client
-        
-        admins = db_client.select('users', {'role': 'admin'})
-        
-        for admin in admins:
-            try:
-                admin_lang = get_user_lang(admin['user_id'])
-                week_report_admin = await form_week_report(admin_lang)
-                await context.bot.send_message(admin['user_id'], week_report_admin, parse_mode=ParseMode.HTML)
-            except Exception as e:
-                print(repr(e))
+
+async def send_week_report_to_admins(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Scheduled weekly report (job_queue) - the precomputed report for every admin."""
+    from db.db import async_db_client
+    from funcs.report_store import precomputed_reports
+
+    admins = await async_db_client.select('users', {'role': 'admin'}, columns='user_id,lang')
+
+    for admin in admins:
+        try:
+            admin_lang = await get_user_lang_async(admin['user_id'])
+            week_report_admin, _ = await precomputed_reports.get("week", admin_lang)
+            await context.bot.send_message(admin['user_id'], week_report_admin, parse_mode=ParseMode.HTML)
+        except Exception as e:
+            print(repr(e))
 
 
 @is_operator
@@ -776,7 +663,7 @@ async def confirm_stock_shift(update: Update, context: ContextTypes.DEFAULT_TYPE
     try:
         print(f"🔧 confirm_stock_shift called")
         await update.callback_query.answer()
-        lang = get_user_lang(update.effective_user.id)
+        lang = await get_user_lang_async(update.effective_user.id)
         print(f"🔧 Language: {lang}")
         
         # מחיקת הודעות קודמות
@@ -784,12 +671,12 @@ async def confirm_stock_shift(update: Update, context: ContextTypes.DEFAULT_TYPE
         print(f"🔧 Messages cleaned")
         
         # Using Supabase only
-        from db.db import get_opened_shift
+        from db.db import get_opened_shift_async
         
         print(f"🔧 Getting opened shift...")
-        shift_data = get_opened_shift()
+        shift_data = await get_opened_shift_async()
         print(f"🔧 Shift data: {shift_data}")
-        shift = type('Shift', (), shift_data)() if shift_data and isinstance(shift_data, dict) else None
+        shift = Shift.from_row(shift_data) if shift_data and isinstance(shift_data, dict) else None
         print(f"🔧 Shift object: {shift}")
         
         if shift:
@@ -811,14 +698,14 @@ async def confirm_stock_shift(update: Update, context: ContextTypes.DEFAULT_TYPE
 @is_operator
 async def show_templates(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     order_id = int(update.callback_query.data.replace('msg_', ''))
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
-    orders = db_client.select('orders', {'id': order_id})
-    order = type('Order', (), orders[0])() if orders else None
+    orders = await async_db_client.select('orders', {'id': order_id})
+    order = Order.from_row(orders[0]) if orders else None
 
     mrkp = await form_operator_templates_kb(order, lang)
 
@@ -831,7 +718,7 @@ async def show_templates(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 @is_admin
 async def show_session_action(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     sess_id = update.callback_query.data.replace('sess_act_', '')
 
@@ -841,36 +728,40 @@ async def show_session_action(update: Update, context: ContextTypes.DEFAULT_TYPE
 @is_admin
 async def make_tg_session_as_worker(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     sess_id = int(update.callback_query.data.replace('worker_', ''))
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
-    sessions = db_client.select('tgsessions', {'id': sess_id})
+    sessions = await async_db_client.select('tgsessions', {'id': sess_id})
     if sessions:
-        db_client.update('tgsessions', {'is_worker': True}, {'id': sess_id})
+        await async_db_client.update('tgsessions', {'is_worker': True}, {'id': sess_id})
+        from funcs.worker_client import worker_pool
+        worker_pool.invalidate()
         session_data = sessions[0]
         await send_message_with_cleanup(update, context, t('session_now_worker', lang).format(session_data['name'], session_data['username']))
-        await update.effective_message.edit_reply_markup(reply_markup=create_tg_sessions_kb())
+        await update.effective_message.edit_reply_markup(reply_markup=await create_tg_sessions_kb_async(lang))
     else:
         await send_message_with_cleanup(update, context, t('session_not_found', lang))
 
 @is_admin
 async def delete_tg_session(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     sess_id = int(update.callback_query.data.replace('del_sess_', ''))
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
-    sessions = db_client.select('tgsessions', {'id': sess_id})
+    sessions = await async_db_client.select('tgsessions', {'id': sess_id})
     if sessions:
-        db_client.delete('tgsessions', {'id': sess_id})
+        await async_db_client.delete('tgsessions', {'id': sess_id})
+        from funcs.worker_client import worker_pool
+        worker_pool.invalidate()
         session_data = sessions[0]
         await send_message_with_cleanup(update, context, t('session_deleted', lang).format(session_data['name'], session_data['username']))
-        await update.effective_message.edit_reply_markup(reply_markup=create_tg_sessions_kb())
+        await update.effective_message.edit_reply_markup(reply_markup=await create_tg_sessions_kb_async(lang))
     else:
         await send_message_with_cleanup(update, context, t('session_not_found', lang))
 
@@ -879,7 +770,7 @@ async def delete_tg_session(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def back_session_kb(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
 
-    reply_markup = create_tg_sessions_kb()
+    reply_markup = await create_tg_sessions_kb_async()
 
     await update.effective_message.edit_reply_markup(reply_markup)
 
@@ -887,15 +778,42 @@ async def back_session_kb(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 @is_admin
 async def show_tg_sessions(update: Update, context: ContextTypes.DEFAULT_TYPE, from_back_button: bool = False) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
         add_to_navigation_history(context, 'tg_sessions_menu')
     
-    reply_markup = create_tg_sessions_kb(lang)
-
-    await send_message_with_cleanup(update, context, t("tg_sessions_info", lang), reply_markup=reply_markup)
+    reply_markup = await create_tg_sessions_kb_async(lang)
+
+    text = t("tg_sessions_info", lang)
+    pool_status = form_worker_pool_status(lang)
+    if pool_status:
+        text += f"\n\n{pool_status}"
+    await send_message_with_cleanup(update, context, text, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
+
+def form_worker_pool_status(lang: str) -> str:
+    """מצב חשבונות ה-worker (funcs/worker_client.py): מחובר / FloodWait / שגיאה, נשלחו, בתור"""
+    import html
+    from funcs.worker_client import worker_pool
+
+    lines = []
+    for account in worker_pool.status():
+        details = ''
+        if account['flood_wait']:
+            icon, details = '⏳', t('worker_pool_flood_wait', lang).format(account['flood_wait'])
+        elif account['connected']:
+            icon = '🟢'
+        elif account['last_error']:
+            icon, details = '🔴', html.escape(account['last_error'][:80])
+        else:
+            icon, details = '⚪️', t('worker_pool_idle', lang)
+        line = t('worker_pool_account', lang).format(icon, html.escape(account['label']), account['sent'], account['load'])
+        lines.append(f"{line}\n    <i>{details}</i>" if details else line)
+    if not lines:
+        return ''
+    return t('worker_pool_status', lang) + '\n' + '\n'.join(lines)
 
 
 @is_courier
@@ -905,22 +823,21 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     
     CRITICAL SAFETY FEATURES:
     1. Double-check status before update (race condition prevention)
-    2. Validate all products before any updates
-    3. Track all stock updates for rollback on failure
-    4. Verify order update success before finalizing
-    5. Rollback stock changes if order update fails
-    6. Comprehensive error logging
+    2. Stock quantities from the product_id stored in each order line (validated once in confirm_order)
+    3. Stock check, stock decrement, order status change and the daily_stats / shift
+       summary rollups run in ONE database transaction (complete_order_with_stock RPC) -
+       atomic under concurrent couriers
+    4. Comprehensive error logging
     """
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     import logging
     
     logger = logging.getLogger(__name__)
     order_id = None
-    stock_updates = []  # Track all stock updates for potential rollback
     
     try:
         # Parse order_id with validation
@@ -937,7 +854,7 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             return
         
         # Fetch order with race condition protection (re-check after validation)
-        orders = db_client.select('orders', {'id': order_id})
+        orders = await async_db_client.select('orders', {'id': order_id})
         if not orders:
             logger.warning(f"⚠️ order_ready: Order {order_id} not found")
             await send_message_with_cleanup(update, context, t('order_not_found', lang))
@@ -964,42 +881,10 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             )
             return
         
-        # CRITICAL CHECK 2: Validate products JSON exists and is valid
-        products_json = order.get('products')
-        if not products_json or not isinstance(products_json, str) or not products_json.strip():
-            logger.error(f"❌ order_ready: Order {order_id} has no products JSON")
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Order #{order_id} has no products!"
-            )
-            return
-        
-        # Parse products with comprehensive error handling
-        try:
-            chosen_products = json.loads(products_json)
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ order_ready: Invalid JSON for order {order_id}: {repr(e)}")
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Invalid products data for order #{order_id}"
-            )
-            return
-        except TypeError as e:
-            logger.error(f"❌ order_ready: TypeError parsing products for order {order_id}: {repr(e)}")
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Products data type error for order #{order_id}"
-            )
-            return
-        
-        # Validate products structure
-        if not isinstance(chosen_products, list):
-            logger.error(f"❌ order_ready: Products is not a list for order {order_id}: {type(chosen_products)}")
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Invalid products format for order #{order_id}"
-            )
-            return
+        # CRITICAL CHECK 2: Order items (jsonb, validated once in confirm_order - db/order_items.py)
+        from db.order_items import order_items, stock_quantities
+        from db.db import get_product_by_name_async, invalidate_product_catalog
+        chosen_products = order_items(order.get('products'))
         
         if len(chosen_products) == 0:
             logger.error(f"❌ order_ready: Empty products list for order {order_id}")
@@ -1009,68 +894,18 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             )
             return
         
-        # CRITICAL CHECK 3: Validate ALL products before ANY updates
-        # This ensures atomicity - if any product is invalid, nothing is updated
-        stock_update_errors = []
+        # CRITICAL CHECK 3: Stock quantities by the product_id stored in each line (renames don't matter);
+        # legacy lines without product_id are resolved by name from the in-memory catalog
+        for item in chosen_products:
+            if item.get('product_id') is None:
+                product = await get_product_by_name_async(item.get('name'))
+                item['product_id'] = product.get('id') if product else None
         
-        # CRITICAL: Aggregate duplicate products (same product name, sum quantities)
-        # This prevents double/triple stock deduction for same product
-        product_aggregates = {}  # {product_name: total_quantity}
-        for idx, chosen_product in enumerate(chosen_products):
-            # Validate product structure first
-            if not isinstance(chosen_product, dict):
-                stock_update_errors.append(f"Product #{idx+1}: Not a dictionary - {type(chosen_product)}")
-                continue
-            
-            product_name = chosen_product.get('name')
-            quantity = chosen_product.get('quantity')
-            
-            # Validate product_name
-            if not product_name:
-                stock_update_errors.append(f"Product #{idx+1}: Missing product name")
-                continue
-            
-            if not isinstance(product_name, str) or not product_name.strip():
-                stock_update_errors.append(f"Product #{idx+1}: Invalid name (empty or not string)")
-                continue
-            
-            product_name = product_name.strip()
-            
-            # Validate quantity
-            if quantity is None:
-                stock_update_errors.append(f"Product '{product_name}': Missing quantity")
-                continue
-            
-            # Handle float quantities (round down to int)
-            if isinstance(quantity, float):
-                quantity = int(quantity)
-                if quantity <= 0:
-                    stock_update_errors.append(f"Product '{product_name}': Invalid quantity (float converted to {quantity})")
-                    continue
-            elif isinstance(quantity, str):
-                try:
-                    quantity = int(float(quantity))  # Handle "5.0" strings
-                    if quantity <= 0:
-                        stock_update_errors.append(f"Product '{product_name}': Invalid quantity (string converted to {quantity})")
-                        continue
-                except (ValueError, TypeError):
-                    stock_update_errors.append(f"Product '{product_name}': Cannot convert quantity '{quantity}' to integer")
-                    continue
-            else:
-                try:
-                    quantity = int(quantity)
-                    if quantity <= 0:
-                        stock_update_errors.append(f"Product '{product_name}': Invalid quantity ({quantity})")
-                        continue
-                except (ValueError, TypeError):
-                    stock_update_errors.append(f"Product '{product_name}': Invalid quantity type ({type(quantity)})")
-                    continue
-            
-            # Aggregate quantities for same product
-            if product_name in product_aggregates:
-                product_aggregates[product_name] += quantity
-            else:
-                product_aggregates[product_name] = quantity
+        try:
+            quantities, missing = stock_quantities(chosen_products)
+            stock_update_errors = [f"Product '{name}': Not found in database" for name in missing]
+        except ValueError as e:
+            stock_update_errors = [str(e)]
         
         # If any validation failed, abort completely
         if stock_update_errors:
@@ -1078,293 +913,83 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             logger.error(f"❌ order_ready: Validation failed for order {order_id}: {stock_update_errors}")
             await send_message_with_cleanup(update, context, error_msg)
             return
+        product_names = {item['product_id']: item.get('name') for item in chosen_products}
         
-        # Now process aggregated products (one entry per unique product name)
-        validated_products = []  # Store validated products for update
+        # CRITICAL CHECK 4: Stock check + decrement + order status in ONE server-side transaction
+        # (db/migrations/002_complete_order_rpc.sql) - rows are locked, nothing to roll back on failure
+        courier_name = f"{update.effective_user.first_name} {update.effective_user.last_name if update.effective_user.last_name else ''}".strip()
+        courier_username = f"@{update.effective_user.username}" if update.effective_user.username else ""
         
-        for product_name, total_quantity in product_aggregates.items():
-            # Get product from database
-            products = db_client.select('products', {'name': product_name})
-            if not products:
-                stock_update_errors.append(f"Product '{product_name}': Not found in database")
-                continue
-            
-            product = products[0]
-            product_id = product.get('id')
-            
-            if not product_id:
-                stock_update_errors.append(f"Product '{product_name}': Missing ID in database")
-                continue
-            
-            current_stock = product.get('stock', 0)
-            
-            # Handle None stock (default to 0)
-            if current_stock is None:
-                current_stock = 0
-                logger.warning(f"⚠️ order_ready: Product '{product_name}' has None stock, defaulting to 0")
-            
-            # Ensure current_stock is integer
-            try:
-                current_stock = int(current_stock)
-            except (ValueError, TypeError):
-                logger.error(f"❌ order_ready: Product '{product_name}' has invalid stock type: {type(current_stock)}")
-                stock_update_errors.append(f"Product '{product_name}': Invalid stock type in database")
-                continue
-            
-            # Prevent negative stock (using aggregated total_quantity)
-            new_stock = current_stock - total_quantity
-            if new_stock < 0:
-                stock_update_errors.append(
-                    f"Product '{product_name}': Insufficient stock ({current_stock} available, {total_quantity} required)"
-                )
-                continue
-            
-            # All validations passed for this product - store for update
-            validated_products.append({
-                'product_id': product_id,
-                'product_name': product_name,
-                'old_stock': current_stock,
-                'new_stock': new_stock,
-                'quantity': total_quantity  # Use aggregated quantity
-            })
+        # Use consistent datetime format (ISO format for Supabase compatibility)
+        delivered_timestamp = datetime.datetime.now().isoformat()
         
-        # If any validation failed, abort completely
-        if stock_update_errors:
-            error_msg = f"⚠️ {t('error', lang)}: Cannot complete order #{order_id}:\n" + "\n".join(stock_update_errors)
-            logger.error(f"❌ order_ready: Validation failed for order {order_id}: {stock_update_errors}")
-            await send_message_with_cleanup(update, context, error_msg)
-            return
+        items = {str(product_id): quantity for product_id, quantity in quantities.items()}
+        logger.info(f"✅ order_ready: Completing order {order_id} with stock update for {len(items)} products")
         
-        # CRITICAL CHECK 4: Re-check order status before updating (race condition protection)
-        orders = db_client.select('orders', {'id': order_id})
-        if not orders:
-            logger.error(f"❌ order_ready: Order {order_id} disappeared during processing")
-            await send_message_with_cleanup(update, context, t('order_not_found', lang))
-            return
+        # daily_stats + open shift summary are bumped inside the same RPC
+        # (db/migrations/006_complete_order_rollups.sql) - no extra round trips before the reply
+        from db.db import order_rollup_params_async, shift_accumulator
+        rollups = await order_rollup_params_async({**order, 'delivered': delivered_timestamp})
         
-        order = orders[0]
-        if order.get('status') == 'completed' or order.get('delivered'):
-            logger.warning(f"⚠️ order_ready: Order {order_id} was completed by another process (race condition)")
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Order #{order_id} was already completed!"
-            )
-            return
+        result = await async_db_client.rpc('complete_order_with_stock', {
+            'p_order_id': order_id,
+            'p_items': items,
+            'p_courier_id': update.effective_user.id,
+            'p_courier_name': courier_name,
+            'p_courier_username': courier_username,
+            'p_delivered': delivered_timestamp,
+            **rollups,
+        }) or {}
+        # Stock was changed (or checked) server-side - the catalog must reload
+        invalidate_product_catalog()
         
-        # All validations passed - update stock for all products
-        logger.info(f"✅ order_ready: Updating stock for {len(validated_products)} products")
-        for product_update in validated_products:
-            # CRITICAL: Re-fetch product to verify current stock before update (race condition protection)
-            products_before_update = db_client.select('products', {'id': product_update['product_id']})
-            if not products_before_update:
-                logger.error(f"❌ order_ready: Product {product_update['product_name']} disappeared before update")
-                # Rollback previous stock updates
-                for rollback in stock_updates:
-                    try:
-                        rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                        if rollback_result:
-                            logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']}")
-                        else:
-                            logger.error(f"❌ order_ready: Rollback verification failed for {rollback['product_name']}")
-                    except Exception as rollback_error:
-                        logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']}: {repr(rollback_error)}")
-                
+        if not result.get('ok'):
+            error = result.get('error')
+            details = result.get('details') or []
+            logger.warning(f"⚠️ order_ready: Order {order_id} not completed - {error} {details}")
+            
+            if error == 'order_not_found':
+                await send_message_with_cleanup(update, context, t('order_not_found', lang))
+            elif error == 'already_completed':
+                # Another courier completed it first (race condition)
                 await send_message_with_cleanup(
                     update, context, 
-                    f"⚠️ {t('error', lang)}: Product '{product_update['product_name']}' disappeared. All changes rolled back."
+                    f"⚠️ {t('error', lang)}: Order #{order_id} was already completed!"
                 )
-                return
-            
-            current_stock_before = products_before_update[0].get('stock', 0)
-            if current_stock_before is None:
-                current_stock_before = 0
-            
-            # CRITICAL: Verify stock hasn't changed since validation (race condition check)
-            if int(current_stock_before) != product_update['old_stock']:
-                logger.warning(f"⚠️ order_ready: Stock changed for '{product_update['product_name']}' - was {product_update['old_stock']}, now {current_stock_before}")
-                # Re-calculate new stock based on current value
-                new_stock_recalculated = int(current_stock_before) - product_update['quantity']
-                if new_stock_recalculated < 0:
-                    logger.error(f"❌ order_ready: Insufficient stock after race condition check for '{product_update['product_name']}'")
-                    # Rollback previous stock updates
-                    for rollback in stock_updates:
-                        try:
-                            rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                            if rollback_result:
-                                logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']}")
-                            else:
-                                logger.error(f"❌ order_ready: Rollback verification failed for {rollback['product_name']}")
-                        except Exception as rollback_error:
-                            logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']}: {repr(rollback_error)}")
-                    
-                    await send_message_with_cleanup(
-                        update, context, 
-                        f"⚠️ {t('error', lang)}: Insufficient stock for '{product_update['product_name']}' (race condition detected). All changes rolled back."
-                    )
-                    return
-                
-                # Update with recalculated value
-                product_update['old_stock'] = int(current_stock_before)
-                product_update['new_stock'] = new_stock_recalculated
-            
-            # Perform stock update
-            result = db_client.update('products', 
-                {'stock': product_update['new_stock']}, 
-                {'id': product_update['product_id']}
-            )
-            
-            # CRITICAL: Verify stock update succeeded
-            if not result:
-                logger.error(f"❌ order_ready: Stock update failed for product {product_update['product_name']}")
-                # Rollback previous stock updates
-                for rollback in stock_updates:
-                    try:
-                        rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                        if rollback_result:
-                            logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']}")
-                        else:
-                            logger.error(f"❌ order_ready: Rollback verification failed for {rollback['product_name']}")
-                    except Exception as rollback_error:
-                        logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']}: {repr(rollback_error)}")
-                
+            elif error == 'insufficient_stock':
+                lines = [
+                    f"Product '{product_names.get(d.get('product_id'), d.get('product_id'))}': "
+                    f"Insufficient stock ({d.get('stock')} available, {d.get('required')} required)"
+                    for d in details
+                ]
                 await send_message_with_cleanup(
-                    update, context, 
-                    f"⚠️ {t('error', lang)}: Failed to update stock for '{product_update['product_name']}'. All changes rolled back."
+                    update, context,
+                    f"⚠️ {t('error', lang)}: Cannot complete order #{order_id}:\n" + "\n".join(lines)
+                )
+            elif error == 'product_not_found':
+                lines = [f"Product '{product_names.get(product_id, product_id)}': Not found in database" for product_id in details]
+                await send_message_with_cleanup(
+                    update, context,
+                    f"⚠️ {t('error', lang)}: Cannot complete order #{order_id}:\n" + "\n".join(lines)
                 )
-                return
-            
-            # CRITICAL: Verify stock was actually updated correctly (post-update verification)
-            products_after_update = db_client.select('products', {'id': product_update['product_id']})
-            if products_after_update:
-                actual_stock_after = products_after_update[0].get('stock', 0)
-                if actual_stock_after is None:
-                    actual_stock_after = 0
-                
-                if int(actual_stock_after) != product_update['new_stock']:
-                    logger.error(f"❌ order_ready: Stock verification failed for '{product_update['product_name']}' - expected {product_update['new_stock']}, got {actual_stock_after}")
-                    # Rollback ALL updates (including this failed one)
-                    for rollback in stock_updates:
-                        try:
-                            rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                            if rollback_result:
-                                logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']}")
-                            else:
-                                logger.error(f"❌ order_ready: Rollback verification failed for {rollback['product_name']}")
-                        except Exception as rollback_error:
-                            logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']}: {repr(rollback_error)}")
-                    
-                    # Rollback this update too
-                    try:
-                        db_client.update('products', {'stock': product_update['old_stock']}, {'id': product_update['product_id']})
-                    except:
-                        pass
-                    
-                    await send_message_with_cleanup(
-                        update, context, 
-                        f"⚠️ {t('error', lang)}: Stock verification failed for '{product_update['product_name']}'. All changes rolled back."
-                    )
-                    return
             else:
-                logger.error(f"❌ order_ready: Product {product_update['product_name']} disappeared after update")
-                # Rollback
-                for rollback in stock_updates:
-                    try:
-                        rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                        if rollback_result:
-                            logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']}")
-                    except Exception as rollback_error:
-                        logger.error(f"❌ order_ready: Rollback failed: {repr(rollback_error)}")
-                
                 await send_message_with_cleanup(
                     update, context, 
-                    f"⚠️ {t('error', lang)}: Product '{product_update['product_name']}' disappeared after update. All changes rolled back."
+                    f"⚠️ {t('error', lang)}: Failed to update order #{order_id}. No changes were made."
                 )
-                return
-            
-            # Track successful update for potential rollback
-            stock_updates.append(product_update)
-            logger.info(f"✅ order_ready: Stock updated for '{product_update['product_name']}': {product_update['old_stock']} -> {product_update['new_stock']}")
-        
-        # CRITICAL CHECK 5: Update order status and verify success
-        courier_name = f"{update.effective_user.first_name} {update.effective_user.last_name if update.effective_user.last_name else ''}".strip()
-        courier_username = f"@{update.effective_user.username}" if update.effective_user.username else ""
-        
-        # Use consistent datetime format (ISO format for Supabase compatibility)
-        delivered_timestamp = datetime.datetime.now().isoformat()
-        
-        order_update_result = db_client.update('orders', {
-            'courier_id': update.effective_user.id,
-            'courier_name': courier_name,
-            'courier_username': courier_username,
-            'status': 'completed',  # Simple string for database consistency
-            'delivered': delivered_timestamp
-        }, {'id': order_id})
-        
-        # CRITICAL: Verify order update succeeded
-        if not order_update_result:
-            logger.error(f"❌ order_ready: Order update failed for order {order_id} - ROLLING BACK STOCK!")
-            # Rollback ALL stock updates
-            for rollback in stock_updates:
-                try:
-                    rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                    if rollback_result:
-                        # Verify rollback succeeded
-                        verify_products = db_client.select('products', {'id': rollback['product_id']})
-                        if verify_products and int(verify_products[0].get('stock', 0) or 0) == rollback['old_stock']:
-                            logger.info(f"🔄 order_ready: Verified rollback for {rollback['product_name']}")
-                        else:
-                            logger.error(f"❌ order_ready: Rollback verification failed for {rollback['product_name']}")
-                    else:
-                        logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']} - update returned empty")
-                except Exception as rollback_error:
-                    logger.error(f"❌ order_ready: Rollback exception for {rollback['product_name']}: {repr(rollback_error)}")
-            
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Failed to update order #{order_id}. All stock changes have been rolled back."
-            )
-            return
-        
-        # CRITICAL: Verify order was actually updated
-        orders_after_update = db_client.select('orders', {'id': order_id})
-        if not orders_after_update:
-            logger.error(f"❌ order_ready: Order {order_id} disappeared after update - ROLLING BACK STOCK!")
-            # Rollback stock
-            for rollback in stock_updates:
-                try:
-                    db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                except:
-                    pass
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Order disappeared after update. All changes rolled back."
-            )
-            return
-        
-        order_after = orders_after_update[0]
-        if order_after.get('status') != 'completed' or not order_after.get('delivered'):
-            logger.error(f"❌ order_ready: Order {order_id} status not updated correctly - status={order_after.get('status')}, delivered={order_after.get('delivered')}")
-            # Rollback stock
-            for rollback in stock_updates:
-                try:
-                    db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                except:
-                    pass
-            await send_message_with_cleanup(
-                update, context, 
-                f"⚠️ {t('error', lang)}: Order status update verification failed. All changes rolled back."
-            )
             return
         
         logger.info(f"✅ order_ready: Successfully completed order {order_id}")
         
-        # Refresh order from database to get updated data
-        orders = db_client.select('orders', {'id': order_id})
-        if orders:
-            order_dict = orders[0]
-        else:
-            logger.warning(f"⚠️ order_ready: Could not refresh order {order_id} after update")
-            order_dict = {}  # Fallback
+        # The RPC returns the updated order row - no extra select needed
+        order_dict = result.get('order') or {}
+        
+        # Running product summary of the open shift, as returned by the RPC (read when the shift is closed)
+        from db.db import order_index
+        from funcs.report_engine import invalidate_reports
+        shift_accumulator.apply(rollups['p_shift_id'], result.get('shift_summary'))
+        invalidate_reports()
+        order_index.upsert(order_dict)
         
         # Convert to object for form_confirm_order_courier - MUST have get_products() method!
         from funcs.utils import create_order_obj
@@ -1381,8 +1006,8 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             # Order is already completed, so just log the error
         
         # Send notification to admin group
-        from db.db import get_bot_setting
-        admin_chat = get_bot_setting('admin_chat') or links.ADMIN_CHAT
+        from db.db import get_bot_setting_async
+        admin_chat = await get_bot_setting_async('admin_chat') or links.ADMIN_CHAT
         if admin_chat:
             try:
                 # Send BILINGUAL message to admin group (RU + HE)
@@ -1396,18 +1021,6 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             
     except ValueError as e:
         logger.error(f"❌ order_ready: ValueError for order {order_id}: {repr(e)}")
-        # Rollback stock if any updates were made
-        if stock_updates:
-            for rollback in stock_updates:
-                try:
-                    rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                    if rollback_result:
-                        logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']} after ValueError")
-                    else:
-                        logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']} after ValueError - update returned empty")
-                except Exception as rollback_error:
-                    logger.error(f"❌ order_ready: Rollback exception: {repr(rollback_error)}")
-        
         await send_message_with_cleanup(
             update, context, 
             f"⚠️ {t('error', lang)}: Invalid data format: {repr(e)}"
@@ -1417,45 +1030,29 @@ async def order_ready(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         import traceback
         traceback.print_exc()
         
-        # Rollback stock if any updates were made
-        if stock_updates:
-            for rollback in stock_updates:
-                try:
-                    rollback_result = db_client.update('products', {'stock': rollback['old_stock']}, {'id': rollback['product_id']})
-                    if rollback_result:
-                        logger.info(f"🔄 order_ready: Rolled back stock for {rollback['product_name']} after exception")
-                    else:
-                        logger.error(f"❌ order_ready: Rollback failed for {rollback['product_name']} after exception - update returned empty")
-                except Exception as rollback_error:
-                    logger.error(f"❌ order_ready: Rollback exception: {repr(rollback_error)}")
-        
+        # The RPC is a single transaction - if it failed, nothing was changed
         await send_message_with_cleanup(
             update, context, 
-            f"⚠️ {t('error', lang)}: Unexpected error occurred. All changes have been rolled back."
+            f"⚠️ {t('error', lang)}: Unexpected error occurred. No changes were made."
         )
 
 
 async def notif_client(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     client_username = update.callback_query.data.replace('notif_', '')
 
-    # Using Supabase only
-    from db.db import db_client
-    
-    sessions = db_client.select('tgsessions', {'is_worker': True})
-    if not sessions:
-        await send_message_with_cleanup(update, context, t('no_worker_session', lang))
-        return
-    
-    tgsession_data = sessions[0]
-    tgsession = type('TgSession', (), tgsession_data)()
+    # Pool of connected worker accounts (funcs/worker_client.py) - no connect/handshake per message
+    from funcs.worker_client import worker_pool, NoWorkerSession, WorkersThrottled
 
     try:
-        client = Client(name='default', api_id=tgsession.api_id, api_hash=tgsession.api_hash, session_string=tgsession.string)
-
-        async with client:
-            await client.send_message(client_username, t('notif_client_order_active', lang))
+        await worker_pool.send_message(client_username, t('notif_client_order_active', lang))
+    except NoWorkerSession:
+        await send_message_with_cleanup(update, context, t('no_worker_session', lang))
+        return
+    except WorkersThrottled as e:
+        await send_message_with_cleanup(update, context, t('workers_throttled', lang).format(int(e.seconds)))
+        return
     except Exception as e:
         await send_message_with_cleanup(update, context, t('send_message_error', lang).format(repr(e)))
         return
@@ -1472,7 +1069,7 @@ async def show_rest_from_last_day(update: Update, context: ContextTypes.DEFAULT_
     • Возможность ручного редактирования остатков
     """
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     # Add to navigation history ONLY if not coming from back button
     if not from_back_button:
@@ -1499,7 +1096,7 @@ async def show_menu_edit_crude_stock(update: Update, context: ContextTypes.DEFAU
     user_id = update.effective_user.id
     logger.info(f"📦 show_menu_edit_crude_stock() called by user {user_id}, from_back_button: {from_back_button}")
 
-    lang = get_user_lang(user_id)
+    lang = await get_user_lang_async(user_id)
     logger.info(f"🌍 Stock management language: {lang}")
 
     # Clean previous message
@@ -1682,7 +1279,7 @@ async def handle_navigation(update: Update, context: ContextTypes.DEFAULT_TYPE)
     callback_data = update.callback_query.data
     logger.info(f"🧭 handle_navigation() called by user {user_id} with callback: {callback_data}")
 
-    lang = get_user_lang(user_id)
+    lang = await get_user_lang_async(user_id)
     logger.info(f"🌍 Navigation language: {lang}")
 
     try:
@@ -1773,14 +1370,14 @@ async def handle_navigation(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def show_staff_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Display list of employees in the system"""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     # Get all users
-    users_data = db_client.select('users')
-    users = [type('User', (), user)() for user in users_data]
+    users_data = await async_db_client.select('users')
+    users = [User.from_row(user) for user in users_data]
     
     # Group employees by role
     staff_by_role = {
@@ -0,0 +1,279 @@
+"""
+תזמון הודעות יוצאות של הבוט לפי מגבלות טלגרם (ExtBot rate limiter)
+
+כל קריאה של context.bot / message.reply_text / edit_text עוברת כאן (Application.builder().rate_limiter):
+- token bucket גלובלי (~30 הודעות בשנייה) ולכל צ'אט: פרטי ~1 בשנייה (burst קטן), קבוצה ~20 בדקה
+- מעל המגבלה ההודעה מחכה בתור במקום להיזרק; נתיב עדיפות לשליחים:
+  context.bot.send_message(..., rate_limit_args=COURIER_LANE)
+- RetryAfter: הצ'אט (או הכל, בלי chat_id) מושהה retry_after שניות, וההודעה חוזרת לראש התור שלה
+- עריכות של אותה הודעה שעדיין מחכות בתור מתאחדות - נשלחת רק הגרסה האחרונה
+- answerCallbackQuery, delete וקריאות קריאה (get*) לא מוגבלות
+"""
+import asyncio
+import bisect
+import datetime
+import itertools
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+
+PRIORITY_COURIER = 0
+PRIORITY_NORMAL = 1
+
+# rate_limit_args להודעות לשליחים / לקבוצת השליחים
+COURIER_LANE = {'priority': PRIORITY_COURIER}
+
+LIMITED_PREFIXES = ('send', 'edit', 'copy', 'forward')
+UNLIMITED_ENDPOINTS = {'sendChatAction'}
+COALESCED_EDITS = {'editMessageText', 'editMessageCaption', 'editMessageReplyMarkup', 'editMessageMedia'}
+
+# כמה buckets של צ'אטים לשמור לפני ניקוי צ'אטים שלא שלחו להם לאחרונה
+MAX_CHAT_BUCKETS = 1000
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    value = error.retry_after
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+def chat_key(chat_id) -> Optional[str]:
+    """admin_chat / order_chat מההגדרות מגיעים כמחרוזת - אותו bucket כמו ל-int"""
+    return None if chat_id is None else str(chat_id).strip()
+
+
+def is_group_chat(chat_id: str) -> bool:
+    """id שלילי (קבוצה / ערוץ) או @username של ערוץ"""
+    return chat_id.startswith(('-', '@'))
+
+
+class TokenBucket:
+    """rate הודעות לכל per שניות, עד burst ברצף"""
+
+    __slots__ = ('capacity', 'fill_rate', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate: float, per: float, burst: Optional[float] = None):
+        self.capacity = float(burst or rate)
+        self.fill_rate = rate / per
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """שניות עד שאפשר לשלוח (0 = עכשיו)"""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.fill_rate
+        return max(wait, self.paused_until - now)
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def pause(self, now: float, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, now + seconds)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.paused_until <= now
+
+
+class _Request:
+    """בקשה בתור; עריכה מאוחדת מחליפה כאן את ה-callback ואת ה-args"""
+
+    __slots__ = ('callback', 'args', 'kwargs', 'result')
+
+    def __init__(self, callback, args, kwargs):
+        self.callback, self.args, self.kwargs = callback, args, kwargs
+        self.result: Optional[asyncio.Future] = None
+
+
+class OutboundScheduler(BaseRateLimiter[Dict[str, Any]]):
+    """תור עדיפויות אחד + token buckets; task אחד מחלק אישורי שליחה"""
+
+    def __init__(self, global_per_second: float = 30, private_per_second: float = 1, private_burst: float = 3,
+                 group_per_minute: float = 20, max_retries: int = 5):
+        self.global_per_second = global_per_second
+        self.private_per_second = private_per_second
+        self.private_burst = private_burst
+        self.group_per_minute = group_per_minute
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_per_second, 1)
+        self._chats: Dict[Any, TokenBucket] = {}
+        # (priority, seq, chat_id, future) ממוין
+        self._waiting: List[Tuple[int, int, Any, asyncio.Future]] = []
+        self._pending_edits: Dict[tuple, _Request] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.stats = {'sent': 0, 'delayed': 0, 'retried': 0, 'coalesced': 0}
+
+    # ---------- BaseRateLimiter ----------
+
+    async def initialize(self) -> None:
+        self._ensure_dispatcher()
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for _, _, _, future in self._waiting:
+            future.cancel()
+        self._waiting.clear()
+        print(f"✅ outbound scheduler stopped: {self.stats}")
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if endpoint in UNLIMITED_ENDPOINTS or not endpoint.startswith(LIMITED_PREFIXES):
+            return await callback(*args, **kwargs)
+
+        chat_id = chat_key(data.get('chat_id'))
+        priority = PRIORITY_NORMAL
+        if isinstance(rate_limit_args, dict):
+            priority = rate_limit_args.get('priority', PRIORITY_NORMAL)
+
+        edit_key = None
+        if endpoint in COALESCED_EDITS and data.get('message_id') is not None:
+            edit_key = (endpoint, chat_id, data['message_id'])
+            pending = self._pending_edits.get(edit_key)
+            if pending is not None:
+                # אותה הודעה כבר מחכה לעריכה - שולחים רק את התוכן האחרון
+                pending.callback, pending.args, pending.kwargs = callback, args, kwargs
+                self.stats['coalesced'] += 1
+                return await asyncio.shield(pending.result)
+
+        request = _Request(callback, args, kwargs)
+        if edit_key is None:
+            return await self._run(request, chat_id, priority)
+
+        request.result = asyncio.get_running_loop().create_future()
+        self._pending_edits[edit_key] = request
+        try:
+            result = await self._run(request, chat_id, priority, edit_key)
+        except asyncio.CancelledError:
+            request.result.cancel()
+            raise
+        except Exception as e:
+            # גם מי שאיחד את העריכה שלו לבקשה הזו מקבל את השגיאה
+            request.result.set_exception(e)
+            request.result.exception()
+            raise
+        finally:
+            if self._pending_edits.get(edit_key) is request:
+                del self._pending_edits[edit_key]
+        request.result.set_result(result)
+        return result
+
+    # ---------- תור ----------
+
+    async def _run(self, request: _Request, chat_id, priority: int, edit_key: tuple = None):
+        seq = next(self._seq)
+        for attempt in itertools.count():
+            await self._acquire(chat_id, priority, seq)
+            # מרגע שיצאה לדרך - עריכה חדשה לאותה הודעה נכנסת לתור מחדש
+            if edit_key is not None and self._pending_edits.get(edit_key) is request:
+                del self._pending_edits[edit_key]
+            try:
+                result = await request.callback(*request.args, **request.kwargs)
+            except RetryAfter as e:
+                seconds = retry_after_seconds(e)
+                self._pause(chat_id, seconds)
+                if attempt >= self.max_retries:
+                    raise
+                self.stats['retried'] += 1
+                print(f"⚠️ RetryAfter {seconds}s for chat {chat_id} - message re-queued")
+                continue
+            self.stats['sent'] += 1
+            return result
+
+    def _bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_CHAT_BUCKETS:
+                now = time.monotonic()
+                self._chats = {key: value for key, value in self._chats.items() if not value.is_idle(now)}
+            if is_group_chat(chat_id):
+                bucket = TokenBucket(self.group_per_minute, 60)
+            else:
+                bucket = TokenBucket(self.private_per_second, 1, burst=self.private_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _pause(self, chat_id, seconds: float) -> None:
+        bucket = self._global if chat_id is None else self._bucket(chat_id)
+        bucket.pause(time.monotonic(), seconds)
+        self._wakeup_dispatcher()
+
+    async def _acquire(self, chat_id, priority: int, seq: int) -> None:
+        """מחכה לתורו - מבחינת הבאקט הגלובלי, הבאקט של הצ'אט והעדיפות"""
+        self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        bisect.insort(self._waiting, (priority, seq, chat_id, future), key=lambda entry: entry[:2])
+        self._wakeup_dispatcher()
+        started = time.monotonic()
+        await future
+        if time.monotonic() - started > 0.05:
+            self.stats['delayed'] += 1
+
+    def _grant(self, now: float) -> Optional[float]:
+        """אישור לכל מי שאפשר לפי הסדר; מחזיר שניות עד האישור הבא האפשרי (None = תור ריק)"""
+        next_delay = None
+        blocked = set()
+        index = 0
+        while index < len(self._waiting):
+            _, _, chat_id, future = self._waiting[index]
+            if future.done():
+                del self._waiting[index]
+                continue
+            global_delay = self._global.delay(now)
+            if global_delay:
+                return global_delay if next_delay is None else min(next_delay, global_delay)
+            if chat_id in blocked:
+                index += 1
+                continue
+            chat_delay = self._bucket(chat_id).delay(now) if chat_id is not None else 0.0
+            if chat_delay:
+                # הודעות אחרות לאותו צ'אט נשארות מאחוריה - הסדר בצ'אט נשמר
+                blocked.add(chat_id)
+                next_delay = chat_delay if next_delay is None else min(next_delay, chat_delay)
+                index += 1
+                continue
+            self._global.consume()
+            if chat_id is not None:
+                self._bucket(chat_id).consume()
+            del self._waiting[index]
+            future.set_result(None)
+        return next_delay
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            delay = self._grant(time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _ensure_dispatcher(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    def _wakeup_dispatcher(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+outbound_scheduler = OutboundScheduler(
+    global_per_second=float(os.getenv("OUTBOUND_GLOBAL_PER_SECOND", "30")),
+    private_per_second=float(os.getenv("OUTBOUND_PRIVATE_PER_SECOND", "1")),
+    group_per_minute=float(os.getenv("OUTBOUND_GROUP_PER_MINUTE", "20")),
+)
@@ -0,0 +1,144 @@
+"""
+דירוג top-N על הזמנות שהושלמו - heap חסום במקום מיון של כל ההזמנות
+
+ההזמנות נקראות בעמודים (iter_rows) ומפוענחות אחת-אחת ל-ReportOrder; רק N הטובות
+נשמרות ב-min-heap, כך שהזיכרון הוא O(N) גם על היסטוריה ארוכה.
+
+מפתחות דירוג (RANK_KEYS):
+    total       סכום ההזמנה
+    quantity    מספר היחידות בהזמנה
+דירוג לקוחות (rank_clients) לפי סכום כל ההזמנות שלהם בחלון (lifetime value) -
+סכום לכל לקוח נשמר (O(לקוחות)), ו-top-N נבחרים ב-heap.
+"""
+import datetime
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from funcs.report_engine import ReportOrder
+
+
+T = TypeVar('T')
+
+RANK_KEYS: Dict[str, Callable[[ReportOrder], float]] = {
+    'total': lambda order: order.total,
+    'quantity': lambda order: order.quantity,
+}
+
+ORDER_RANK_COLUMNS = 'id,client_name,client_username,client_phone,delivered,products'
+
+
+class TopN(Generic[T]):
+    """N הפריטים עם הציון הגבוה ביותר; בשוויון - מי שנוסף ראשון (כמו sorted(reverse=True)[:n])"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._heap: List[Tuple[Any, int, T]] = []
+        self._seq = itertools.count()
+
+    def push(self, score: Any, item: T) -> None:
+        if self.n <= 0:
+            return
+        entry = (score, -next(self._seq), item)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def items(self) -> List[T]:
+        """מהציון הגבוה לנמוך"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+@dataclass(frozen=True)
+class ClientRank:
+    """לקוח ושווי ההזמנות שלו בחלון"""
+    client_name: str
+    client_username: str
+    client_phone: str
+    orders: int
+    total: float
+
+
+def _rank_key(key: str) -> Callable[[ReportOrder], float]:
+    if key not in RANK_KEYS:
+        raise ValueError(f"Unknown ranking key: {key}")
+    return RANK_KEYS[key]
+
+
+def top_orders(rows: Iterable[dict], n: int = 15, key: str = 'total') -> List[ReportOrder]:
+    """top-N מתוך שורות orders (רשימה או generator) - שורות לא תקינות מדולגות"""
+    score = _rank_key(key)
+    top: TopN[ReportOrder] = TopN(n)
+    for row in rows:
+        order = ReportOrder.from_row(row)
+        if order is not None:
+            top.push(score(order), order)
+    return top.items()
+
+
+def _add_client_order(totals: Dict[Tuple[str, str, str], List[float]], order: ReportOrder) -> None:
+    client = (order.client_name or '', order.client_username or '', order.client_phone or '')
+    stats = totals.setdefault(client, [0, 0])
+    stats[0] += 1
+    stats[1] += order.total
+
+
+def _best_clients(totals: Dict[Tuple[str, str, str], List[float]], n: int) -> List[ClientRank]:
+    best = heapq.nlargest(n, totals.items(), key=lambda item: item[1][1])
+    return [ClientRank(*client, orders, total) for client, (orders, total) in best]
+
+
+def top_clients(orders: Iterable[ReportOrder], n: int = 15) -> List[ClientRank]:
+    """top-N לקוחות לפי סכום ההזמנות"""
+    totals: Dict[Tuple[str, str, str], List[float]] = {}
+    for order in orders:
+        _add_client_order(totals, order)
+    return _best_clients(totals, n)
+
+
+def _completed_filters(since: Optional[datetime.datetime], until: Optional[datetime.datetime]) -> dict:
+    from db.db import Status
+
+    filters: Dict[str, Any] = {'status': Status.completed.value}
+    delivered = {}
+    if since:
+        delivered['gte'] = since
+    if until:
+        delivered['lte'] = until
+    if delivered:
+        filters['delivered'] = delivered
+    return filters
+
+
+async def _iter_orders(since, until, page_size):
+    from db.db import async_db_client
+
+    async for row in async_db_client.iter_rows('orders', _completed_filters(since, until),
+                                               page_size=page_size, columns=ORDER_RANK_COLUMNS):
+        order = ReportOrder.from_row(row)
+        if order is not None:
+            yield order
+
+
+async def rank_orders(since: Optional[datetime.datetime] = None, until: Optional[datetime.datetime] = None,
+                      n: int = 15, key: str = 'total', page_size: int = 1000) -> List[ReportOrder]:
+    """top-N הזמנות שהושלמו בטווח (since / until אופציונליים), עמוד אחרי עמוד"""
+    score = _rank_key(key)
+    top: TopN[ReportOrder] = TopN(n)
+    async for order in _iter_orders(since, until, page_size):
+        top.push(score(order), order)
+    return top.items()
+
+
+async def rank_clients(since: Optional[datetime.datetime] = None, until: Optional[datetime.datetime] = None,
+                       n: int = 15, page_size: int = 1000) -> List[ClientRank]:
+    """top-N לקוחות לפי סכום ההזמנות שהושלמו בטווח"""
+    totals: Dict[Tuple[str, str, str], List[float]] = {}
+    async for order in _iter_orders(since, until, page_size):
+        _add_client_order(totals, order)
+    return _best_clients(totals, n)
@@ -0,0 +1,154 @@
+"""
+מנוע הדוחות המהירים (report_by_product / client / price / days)
+
+חלון הזמן (7 ימים) נטען פעם אחת: שורות daily_stats לסכומים + ההזמנות שהושלמו, בעמודים,
+מפוענחות ל-ReportOrder (delivered כ-datetime, total מחושב) ונשמרות רק ה-top-N ב-heap חסום
+(funcs/ranking.py). כל ארבעת הדוחות מחושבים במעבר אחד ונשמרים ל-REPORTS_CACHE_TTL שניות -
+מנהל שעובר בין הדוחות משלם על הטעינה פעם אחת.
+order_ready קורא ל-invalidate_reports אחרי השלמת הזמנה.
+
+חלונות ארוכים (>= ANALYTICS_MIN_DAYS, למשל 30 / 90 / 365) מחושבים ב-funcs/analytics.py (pandas).
+"""
+import asyncio
+import datetime
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db.order_items import order_items
+
+
+@dataclass(frozen=True)
+class ReportOrder:
+    """הזמנה שהושלמה, מפוענחת פעם אחת עבור הדוחות"""
+    id: int
+    client_name: str
+    client_username: str
+    client_phone: str
+    delivered: datetime.datetime
+    total: float
+    quantity: float = 0
+
+    @classmethod
+    def from_row(cls, row: dict) -> Optional["ReportOrder"]:
+        try:
+            delivered = datetime.datetime.fromisoformat(row['delivered'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        products = order_items(row.get('products'))
+        if not products:
+            # products לא תקין (או ריק) - ההזמנה לא נספרת
+            return None
+        total = sum(product.get('total_price', 0) or 0 for product in products)
+        quantity = sum(product.get('quantity', 0) or 0 for product in products)
+        return cls(row.get('id'), row.get('client_name'), row.get('client_username'),
+                   row.get('client_phone'), delivered, total, quantity)
+
+
+@dataclass
+class ReportSet:
+    """כל הדוחות המהירים לחלון אחד"""
+    since: datetime.datetime
+    products: Dict[str, float] = field(default_factory=dict)              # שם מוצר -> כמות
+    clients: List[Tuple[str, str, str, int]] = field(default_factory=list)  # (name, username, phone, orders)
+    top_orders: List[ReportOrder] = field(default_factory=list)           # לפי total, מהגבוה
+    weekdays: List[Tuple[str, int]] = field(default_factory=list)         # ('Monday', orders), מהגבוה
+
+
+def build_report_set(since: datetime.datetime, orders: Iterable[dict], product_rows: List[dict],
+                     client_rows: List[dict], total_rows: List[dict], top_n: int = 15,
+                     top_orders: Optional[List[ReportOrder]] = None) -> ReportSet:
+    """
+    חישוב כל הדוחות מהנתונים הגולמיים של החלון - כל מקור עובר פעם אחת.
+    top_orders שכבר דורגו (rank_orders) מחליפים את הדירוג של orders.
+    """
+    from db.daily_stats import number, sum_by_key, parse_client_key
+    from funcs.ranking import top_orders as rank_top_orders
+
+    if top_orders is None:
+        top_orders = rank_top_orders(orders, top_n)
+
+    weekday_count: Dict[str, int] = {}
+    for row in total_rows:
+        if row.get('orders'):
+            weekday = datetime.date.fromisoformat(row['day']).strftime('%A')
+            weekday_count[weekday] = weekday_count.get(weekday, 0) + number(row['orders'])
+
+    return ReportSet(
+        since=since,
+        products=sum_by_key(product_rows, 'quantity'),
+        clients=[(*parse_client_key(key), count) for key, count in sum_by_key(client_rows, 'orders').items() if count],
+        top_orders=top_orders,
+        weekdays=sorted(weekday_count.items(), key=lambda item: item[1], reverse=True),
+    )
+
+
+class ReportEngine:
+    """טעינה אחת של החלון לכל ttl שניות; קריאות במקביל מחכות לאותה טעינה"""
+
+    def __init__(self, ttl: float = 60.0, window_days: int = 7, top_n: int = 15):
+        self.ttl = ttl
+        self.window_days = window_days
+        self.top_n = top_n
+        self._report_set: Optional[ReportSet] = None
+        self._loaded_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def invalidate(self) -> None:
+        self._report_set = None
+
+    def _is_fresh(self) -> bool:
+        return self._report_set is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def _load(self, since: datetime.datetime) -> ReportSet:
+        from db.db import get_daily_stats_async
+        from funcs import analytics
+        from funcs.ranking import rank_orders
+
+        if self.window_days >= analytics.ANALYTICS_MIN_DAYS:
+            # חלון ארוך - groupby וקטוריים על frames במקום לולאה על ההזמנות
+            orders, lines = await analytics.load_orders_frame(since)
+            return analytics.build_report_set(since, orders, lines, self.top_n)
+
+        # top-N בעמודים ל-heap חסום; שאר הדוחות מ-daily_stats
+        top_orders, product_rows, client_rows, total_rows = await asyncio.gather(
+            rank_orders(since, n=self.top_n),
+            get_daily_stats_async('product', since, columns='key,quantity'),
+            get_daily_stats_async('client', since, columns='key,orders'),
+            get_daily_stats_async('total', since, columns='day,orders'),
+        )
+        return build_report_set(since, (), product_rows, client_rows, total_rows, self.top_n, top_orders)
+
+    async def get(self) -> ReportSet:
+        if self._is_fresh():
+            return self._report_set
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._is_fresh():
+                since = datetime.datetime.now() - datetime.timedelta(days=self.window_days)
+                self._report_set = await self._load(since)
+                self._loaded_at = time.monotonic()
+        return self._report_set
+
+
+REPORT_WINDOWS = (7, 30, 90, 365)
+_engines: Dict[int, ReportEngine] = {}
+
+
+def get_report_engine(window_days: int = 7) -> ReportEngine:
+    """ReportEngine לכל גודל חלון (ימים) - כל אחד עם ה-cache שלו"""
+    if window_days not in _engines:
+        _engines[window_days] = ReportEngine(ttl=float(os.getenv("REPORTS_CACHE_TTL", "60")), window_days=window_days,
+                                             top_n=int(os.getenv("REPORTS_TOP_N", "15")))
+    return _engines[window_days]
+
+
+def invalidate_reports() -> None:
+    for engine in _engines.values():
+        engine.invalidate()
+
+
+report_engine = get_report_engine(7)
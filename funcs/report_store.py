@@ -0,0 +1,90 @@
+"""
+דוחות מחושבים מראש - דוח שבועי ודוח רווח יומי (היום / אתמול) לכל שפה
+
+ה-HTML מרונדר ברקע (job_queue או לולאת asyncio כש-job-queue לא מותקן), כל
+REPORTS_PRECOMPUTE_INTERVAL שניות ובכל סגירת משמרת. לחיצה על הכפתור מחזירה
+את ה-HTML השמור מיד, עם חותמת "עודכן ב-" וכפתור רענון שמחשב מחדש.
+"""
+import asyncio
+import datetime
+import os
+from typing import Dict, Optional, Tuple
+
+
+REPORT_LANGS = ('ru', 'he')
+REPORT_NAMES = ('week', 'profit_today', 'profit_yesterday')
+
+
+async def render_report(name: str, lang: str) -> str:
+    from funcs.utils import form_week_report, form_daily_profit_report
+
+    if name == 'week':
+        return await form_week_report(lang)
+    return await form_daily_profit_report(name.replace('profit_', ''), lang)
+
+
+class PrecomputedReports:
+    """(name, lang) -> (html, computed_at)"""
+
+    def __init__(self, interval: float = 600.0):
+        self.interval = interval
+        self._reports: Dict[Tuple[str, str], Tuple[str, datetime.datetime]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _is_current(self, name: str, computed_at: datetime.datetime) -> bool:
+        # "היום" / "אתמול" מתחלפים בחצות
+        return name == 'week' or computed_at.date() == datetime.datetime.now().date()
+
+    async def _compute(self, name: str, lang: str) -> Tuple[str, datetime.datetime]:
+        entry = (await render_report(name, lang), datetime.datetime.now())
+        self._reports[(name, lang)] = entry
+        return entry
+
+    async def refresh(self) -> None:
+        """חישוב כל הדוחות לכל השפות"""
+        results = await asyncio.gather(
+            *[self._compute(name, lang) for name in REPORT_NAMES for lang in REPORT_LANGS],
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            print(f"⚠️ Precomputed reports: {len(errors)} failed ({errors[0]!r})")
+        else:
+            print(f"✅ Precomputed reports refreshed ({len(results)})")
+
+    def refresh_in_background(self) -> None:
+        """אחרי סגירת משמרת - בלי לעכב את ה-handler"""
+        asyncio.get_running_loop().create_task(self.refresh())
+
+    async def get(self, name: str, lang: str, force: bool = False) -> Tuple[str, datetime.datetime]:
+        entry = self._reports.get((name, lang))
+        if force or entry is None or not self._is_current(name, entry[1]):
+            entry = await self._compute(name, lang)
+        return entry
+
+    # ---------- תזמון ----------
+
+    async def refresh_job(self, context=None) -> None:
+        """callback ל-job_queue.run_repeating"""
+        await self.refresh()
+
+    async def _loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self, application) -> None:
+        """job_queue אם מותקן (python-telegram-bot[job-queue]), אחרת task של asyncio"""
+        if application.job_queue:
+            application.job_queue.run_repeating(self.refresh_job, interval=self.interval, first=1)
+        elif self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+precomputed_reports = PrecomputedReports(interval=float(os.getenv("REPORTS_PRECOMPUTE_INTERVAL", "600")))
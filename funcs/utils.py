@@ -4,48 +4,25 @@ from telegram.constants import ParseMode
 from telegram.error import BadRequest, Forbidden
 from db.db import Status, Order, Shift, ShiftStatus, Product
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 import datetime
 import pandas as pd
 from io import BytesIO
 import json
 
 
-def create_order_obj(order_dict: dict):
+def create_order_obj(order_dict: dict) -> Order:
     """
-    Create Order object with get_products() method for compatibility with form_confirm_order functions.
-    
-    This utility ensures all Order objects used with form_confirm_order_courier, 
-    form_confirm_order_courier_info, and form_confirm_order have the required get_products() method.
+    Create an Order record for form_confirm_order, form_confirm_order_courier
+    and form_confirm_order_courier_info.
     
     Args:
         order_dict: Dictionary containing order data from database
         
     Returns:
-        Order object with get_products() method
+        Order (db/db.py) - products parsed once, get_products() returns them
     """
-    class OrderObj:
-        def __init__(self, data):
-            for k, v in data.items():
-                if k == 'status':
-                    # Create Status-like object for compatibility
-                    setattr(self, k, type('Status', (), {'value': v})())
-                else:
-                    setattr(self, k, v)
-        
-        def get_products(self):
-            """Get products from order's products field (JSON string)"""
-            if not hasattr(self, 'products'):
-                return []
-            if isinstance(self.products, str):
-                try:
-                    parsed = json.loads(self.products)
-                    return parsed if isinstance(parsed, list) else []
-                except (json.JSONDecodeError, TypeError):
-                    return []
-            return self.products if isinstance(self.products, list) else []
-    
-    return OrderObj(order_dict)
+    return Order.from_row(order_dict)
 
 
 async def cleanup_old_messages(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -332,7 +309,7 @@ async def send_shift_start_msg(update: Update, context: ContextTypes.DEFAULT_TYP
     🔴 12 | ⚫️ 8 | 🛍️ 10 | 🍿 6
     """
     print(f"🔧 send_shift_start_msg called")
-    from db.db import db_client, get_opened_shift
+    from db.db import async_db_client, set_current_shift, shift_accumulator
     import json
     
     shift = Shift()
@@ -346,11 +323,13 @@ async def send_shift_start_msg(update: Update, context: ContextTypes.DEFAULT_TYP
         'operator_id': shift.operator_id,
         'operator_username': shift.operator_username,
         'status': shift.status.value,
-        'products_start': json.dumps(Shift.set_products()),
-        'opened_time': datetime.datetime.now().isoformat()
+        'products_start': json.dumps(await Shift.set_products_async()),
+        'opened_time': datetime.datetime.now().isoformat(),
+        # Running product summary - bumped by order_ready on every delivered order
+        'summary': '{}'
     }
     print(f"🔧 Inserting shift to Supabase...")
-    saved_shift = db_client.insert('shifts', shift_data)
+    saved_shift = await async_db_client.insert('shifts', shift_data)
     print(f"🔧 Insert response: {saved_shift}")
     
     # Handle response
@@ -360,6 +339,8 @@ async def send_shift_start_msg(update: Update, context: ContextTypes.DEFAULT_TYP
         return
     
     print(f"🔧 Shift created with ID: {saved_shift['id']}")
+    set_current_shift(saved_shift)
+    shift_accumulator.start(saved_shift['id'])
     shift.id = saved_shift['id']
     shift.opened_time = datetime.datetime.fromisoformat(saved_shift['opened_time'])
     
@@ -380,8 +361,8 @@ async def send_shift_start_msg(update: Update, context: ContextTypes.DEFAULT_TYP
     """
     
     try:
-        from db.db import get_bot_setting
-        admin_chat = get_bot_setting('admin_chat') or links.ADMIN_CHAT
+        from db.db import get_bot_setting_async
+        admin_chat = await get_bot_setting_async('admin_chat') or links.ADMIN_CHAT
         if admin_chat:
             await context.bot.send_message(admin_chat, msg, parse_mode=ParseMode.HTML,)
     except Exception as e:
@@ -524,89 +505,26 @@ async def form_week_report(lang: str = 'ru'):
     Средние показатели:  
     Брутто: 3,907₪ в день | Нетто: 3,250₪ в день
     """
-    # Using Supabase only
-    from db.db import db_client
+    # Using Supabase only - pre-aggregated daily_stats rows (shift totals + shift products per day)
+    from db.db import get_daily_stats_async
+    from db.daily_stats import number, sum_by_key
     
     now = datetime.datetime.now()
     seven_days_ago = now - datetime.timedelta(days=7)
     
-    # Helper function to parse datetime from Supabase format
-    def parse_datetime(dt_str):
-        """Parse datetime from Supabase format (handles both ISO and PostgreSQL timestamp formats)"""
-        if not dt_str:
-            return None
-        if isinstance(dt_str, datetime.datetime):
-            return dt_str
-        try:
-            # Try ISO format first (with T)
-            if 'T' in str(dt_str):
-                return datetime.datetime.fromisoformat(str(dt_str).replace('Z', '+00:00'))
-            # Try PostgreSQL format (space instead of T)
-            return datetime.datetime.strptime(str(dt_str), '%Y-%m-%d %H:%M:%S.%f')
-        except ValueError:
-            # Fallback: try without microseconds
-            try:
-                return datetime.datetime.strptime(str(dt_str), '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                return None
-    
-    # Fetch all shifts and filter in Python (Supabase doesn't support >= directly)
-    all_shifts = db_client.select('shifts', {'status': 'closed'})
-    shifts = []
-    for shift in all_shifts:
-        if shift.get('closed_time'):
-            closed_time = parse_datetime(shift['closed_time'])
-            if closed_time and closed_time >= seven_days_ago:
-                shifts.append(shift)
-    # Convert dicts to objects for compatibility
-    shift_objects = []
-    for s in shifts:
-        obj = type('Shift', (), {})()
-        obj.brutto = s.get('brutto', 0) or 0
-        obj.netto = s.get('netto', 0) or 0
-        obj.operator_paid = s.get('operator_paid', 0) or 0
-        obj.runner_paid = s.get('runner_paid', 0) or 0
-        obj.petrol_paid = s.get('petrol_paid', 0) or 0
-        # Fix closure issue - create method that captures s
-        def make_get_summary(shift_dict):
-            def get_summary():
-                summary = shift_dict.get('summary')
-                # Handle None, empty string, or invalid JSON
-                if summary is None or not isinstance(summary, str) or not summary.strip():
-                    return {}
-                try:
-                    return json.loads(summary)
-                except (json.JSONDecodeError, TypeError):
-                    return {}
-            return get_summary
-        obj.get_summary = make_get_summary(s)
-        shift_objects.append(obj)
-    shifts = shift_objects
-
-    brutto = sum([shift.brutto for shift in shifts]) or 0
+    totals = await get_daily_stats_async('total', seven_days_ago,
+                                         columns='brutto,netto,operator_paid,runner_paid,petrol_paid')
+    shift_products = await get_daily_stats_async('shift_product', seven_days_ago, columns='key,quantity')
+
+    brutto = sum(number(row.get('brutto')) for row in totals)
     avg_brutto = brutto // 7 if brutto else 0
-    netto = sum([shift.netto for shift in shifts]) or 0
+    netto = sum(number(row.get('netto')) for row in totals)
     avg_netto = netto // 7 if netto else 0
 
-    expenses = sum([(shift.operator_paid + shift.runner_paid + shift.petrol_paid) for shift in shifts]) or 0
-
-    summaries = [shift.get_summary() for shift in shifts]
-
-    result = {}
-
-    for entry in summaries:
-        for key, value in entry.items():
-            print(f"Processing {key}: {value}")  # Print key and value
-            # Handle None values safely
-            total_quantity = value.get('total_quantity') or 0
-            total_price = value.get('total_price') or 0
-            
-            if key not in result:
-                result[key] = {'quantity': total_quantity, 'price': total_price}  # Initialize dictionary
-            else:
-                result[key]['quantity'] += total_quantity  # Add quantity
+    expenses = sum(number(row.get('operator_paid')) + number(row.get('runner_paid')) + number(row.get('petrol_paid'))
+                   for row in totals)
 
-    result = [f"{k} {v['quantity']}" for k,v in result.items()]
+    result = [f"{k} {quantity}" for k, quantity in sum_by_key(shift_products, 'quantity').items()]
     summary_text = " | ".join(result) if result else t("no_data_for_period", lang)
 
     rtl = '\u200F' if lang == 'he' else ''
@@ -671,8 +589,9 @@ async def form_daily_profit_report(date_option: str, lang: str = 'ru') -> str:
     Returns:
         דוח מפורמט ב-HTML
     """
-    # Using Supabase only
-    from db.db import db_client
+    # Using Supabase only - pre-aggregated daily_stats rows for the chosen day
+    from db.db import get_daily_stats_async
+    from db.daily_stats import number
     
     try:
         # קביעת טווח התאריכים
@@ -680,59 +599,37 @@ async def form_daily_profit_report(date_option: str, lang: str = 'ru') -> str:
         
         if date_option == 'today':
             start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999)
             period_text = t("today", lang)
         else:  # yesterday
             yesterday = now - datetime.timedelta(days=1)
             start_of_day = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999)
             period_text = t("yesterday", lang)
         
-        # שליפת משמרות שנסגרו ביום הנבחר
-        all_shifts = db_client.select('shifts', {'status': 'closed'})
-        shifts = []
-        for shift_data in all_shifts:
-            if shift_data.get('closed_time'):
-                closed_time = datetime.datetime.fromisoformat(shift_data['closed_time'])
-                if start_of_day <= closed_time <= end_of_day:
-                    obj = type('Shift', (), shift_data)()
-                    shifts.append(obj)
+        # שורת total של היום (משמרות שנסגרו + הזמנות שנמסרו) ושורות המוצרים מסיכומי המשמרות
+        totals = await get_daily_stats_async('total', start_of_day, start_of_day)
+        day_stats = totals[0] if totals else {}
         
-        if not shifts:
+        if not day_stats.get('shifts'):
             return t("no_data_for_period", lang)
         
         # חישובים
-        total_brutto = sum(shift.brutto or 0 for shift in shifts)
-        total_operator_paid = sum(shift.operator_paid or 0 for shift in shifts)
-        total_runner_paid = sum(shift.runner_paid or 0 for shift in shifts)
-        total_petrol_paid = sum(shift.petrol_paid or 0 for shift in shifts)
+        total_brutto = number(day_stats.get('brutto'))
+        total_operator_paid = number(day_stats.get('operator_paid'))
+        total_runner_paid = number(day_stats.get('runner_paid'))
+        total_petrol_paid = number(day_stats.get('petrol_paid'))
         total_expenses = total_operator_paid + total_runner_paid + total_petrol_paid
-        total_netto = sum(shift.netto or 0 for shift in shifts)
+        total_netto = number(day_stats.get('netto'))
         
         # ספירת הזמנות
-        all_orders = db_client.select('orders', {'status': 'completed'})
-        orders = []
-        for order_data in all_orders:
-            if order_data.get('delivered'):
-                delivered_time = datetime.datetime.fromisoformat(order_data['delivered'])
-                if start_of_day <= delivered_time <= end_of_day:
-                    obj = type('Order', (), order_data)()
-                    orders.append(obj)
-        total_orders = len(orders)
+        total_orders = number(day_stats.get('orders'))
         
         # איסוף מוצרים שנמכרו
         product_summary = {}
-        for shift in shifts:
-            if shift.summary:
-                summary_data = json.loads(shift.summary)
-                for product_name, data in summary_data.items():
-                    if product_name not in product_summary:
-                        product_summary[product_name] = {
-                            'quantity': 0,
-                            'total_price': 0
-                        }
-                    product_summary[product_name]['quantity'] += data.get('total_quantity', 0)
-                    product_summary[product_name]['total_price'] += data.get('total_price', 0)
+        for row in await get_daily_stats_async('shift_product', start_of_day, start_of_day,
+                                               columns='key,quantity,revenue'):
+            data = product_summary.setdefault(row['key'], {'quantity': 0, 'total_price': 0})
+            data['quantity'] += number(row.get('quantity'))
+            data['total_price'] += number(row.get('revenue'))
         
         # בניית הדוח
         report = t("daily_report_title", lang).format(period_text)
@@ -760,6 +657,57 @@ async def form_daily_profit_report(date_option: str, lang: str = 'ru') -> str:
         print(f"Error in form_daily_profit_report: {e}")
         return t("no_data_for_period", lang)
 
+
+async def form_period_profit_report(days: int, lang: str = 'ru') -> str:
+    """
+    דוח רווח לטווח ארוך (30 / 90 / 365 ימים) - מחושב ב-pandas (funcs/analytics.py)
+    
+    אותו מבנה כמו form_daily_profit_report, עם ממוצע ליום פעילות
+    """
+    import asyncio
+    from funcs import analytics
+    
+    try:
+        now = datetime.datetime.now()
+        since = (now - datetime.timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        (orders, lines), shifts = await asyncio.gather(
+            analytics.load_orders_frame(since),
+            analytics.load_shifts_frame(since),
+        )
+        if shifts.empty:
+            return t("no_data_for_period", lang)
+        
+        profit = analytics.profit_report(shifts, orders, lines)
+        total_expenses = profit['operator_paid'] + profit['runner_paid'] + profit['petrol_paid']
+        
+        report = t("daily_report_title", lang).format(t("last_n_days", lang).format(days))
+        report += f"\n{since.strftime('%d.%m.%Y')} - {now.strftime('%d.%m.%Y')}\n\n"
+        
+        report += t("total_brutto", lang).format(profit['brutto']) + "\n"
+        report += t("total_expenses", lang).format(total_expenses) + "\n"
+        report += t("expenses_breakdown", lang).format(
+            profit['operator_paid'],
+            profit['runner_paid'],
+            profit['petrol_paid']
+        ) + "\n"
+        report += t("total_netto", lang).format(profit['netto']) + "\n"
+        if profit['days']:
+            report += f"<i>{t('brutto', lang)}: {profit['brutto'] // profit['days']}₪ {t('per_day', lang)} | {t('netto', lang)}: {profit['netto'] // profit['days']}₪ {t('per_day', lang)}</i>\n"
+        
+        report += t("total_orders", lang).format(profit['orders']) + "\n"
+        
+        if profit['products']:
+            report += t("products_sold", lang) + "\n"
+            qty_text = t("units", lang)
+            for product_name, data in profit['products'].items():
+                report += f"  • {product_name} - {data['quantity']} {qty_text} - {data['total_price']}₪\n"
+        
+        return report
+    except Exception as e:
+        print(f"Error in form_period_profit_report: {e}")
+        return t("no_data_for_period", lang)
+
 # מערכת היסטוריית ניווט
 def add_to_navigation_history(context, menu_name, data=None, max_history=5):
     """הוספת תפריט להיסטוריית הניווט (מקסימום 5 מסכים)"""
@@ -913,7 +861,9 @@ async def send_shift_end_report_to_admins(shift, lang: str = 'ru') -> None:
     closed_time = shift.closed_time if hasattr(shift, 'closed_time') else shift.get('closed_time')
     
     # חישוב נתונים
-    total_orders = len(json.loads(summary)) if summary else 0
+    if isinstance(summary, str):
+        summary = json.loads(summary) if summary.strip() else {}
+    total_orders = len(summary) if summary else 0
     total_brutto = brutto or 0
     total_expenses = (operator_paid or 0) + (runner_paid or 0) + (petrol_paid or 0)
     net_profit = netto or 0
@@ -943,8 +893,8 @@ async def send_shift_end_report_to_admins(shift, lang: str = 'ru') -> None:
     # שליחה לקבוצת מנהלים
     try:
         from telegram import Bot
-        from db.db import get_bot_setting
-        admin_chat = get_bot_setting('admin_chat') or links.ADMIN_CHAT
+        from db.db import get_bot_setting_async
+        admin_chat = await get_bot_setting_async('admin_chat') or links.ADMIN_CHAT
         print(f"🔧 Admin chat ID: {admin_chat}")
         if admin_chat:
             bot = Bot(token=links.BOT_TOKEN)
@@ -963,59 +913,54 @@ async def send_shift_end_report_to_admins(shift, lang: str = 'ru') -> None:
 
 # ייצוא הזמנות כטקסט
 async def export_orders_as_text(update: Update, context: ContextTypes.DEFAULT_TYPE, lang: str = 'ru') -> None:
-    """ייצוא הזמנות כטקסט במקום Excel"""
-    # Using Supabase only
-    from db.db import get_all_orders
-    
-    # קבלת כל ההזמנות
-    all_orders = get_all_orders()
+    """
+    ייצוא הזמנות כטקסט במקום Excel
     
-    if not all_orders:
-        await update.effective_message.reply_text(t("no_orders_found", lang))
-        return
+    ההזמנות נקראות בעמודים (iter_rows) ונשלחות בהודעות של עד 4000 תווים תוך כדי קריאה,
+    כך שהזיכרון לא גדל עם כמות ההזמנות וכל הזמנה נשארת שלמה בתוך הודעה אחת.
+    """
+    # Using Supabase only
+    from db.db import async_db_client
+    from db.order_items import order_items
     
-    # בניית טקסט
     rtl = '\u200F' if lang == 'he' else ''
     export_text = f"{rtl}<b>{t('orders_export_title', lang)}</b>\n\n"
+    orders_count = 0
     
-    for order_data in all_orders:
-        # CRITICAL: Safe JSON parsing with error handling
-        products_json = order_data.get('products', '[]')
-        products = []
-        if products_json and isinstance(products_json, str):
-            try:
-                parsed = json.loads(products_json)
-                if isinstance(parsed, list):
-                    products = parsed
-            except (json.JSONDecodeError, TypeError):
-                products = []  # Fallback to empty list
+    async for order_data in async_db_client.iter_rows('orders'):
+        orders_count += 1
         
-        products_text = ", ".join([f"{p.get('name', 'Unknown')} x{p.get('quantity', 0)}" for p in products if isinstance(p, dict)])
+        products = order_items(order_data.get('products'))
+        products_text = ", ".join([f"{p.get('name', 'Unknown')} x{p.get('quantity', 0)}" for p in products])
         
-        export_text += f"<b>{t('order_id', lang)}:</b> {order_data['id']}\n"
-        export_text += f"<b>{t('client_name', lang)}:</b> {order_data['client_name']}\n"
-        export_text += f"<b>{t('client_phone', lang)}:</b> {order_data['client_phone']}\n"
-        export_text += f"<b>{t('address', lang)}:</b> {order_data['address']}\n"
-        export_text += f"<b>{t('products', lang)}:</b> {products_text}\n"
-        export_text += f"<b>{t('status', lang)}:</b> {order_data['status'] if order_data.get('status') else 'N/A'}\n"
+        order_text = f"<b>{t('order_id', lang)}:</b> {order_data['id']}\n"
+        order_text += f"<b>{t('client_name', lang)}:</b> {order_data['client_name']}\n"
+        order_text += f"<b>{t('client_phone', lang)}:</b> {order_data['client_phone']}\n"
+        order_text += f"<b>{t('address', lang)}:</b> {order_data['address']}\n"
+        order_text += f"<b>{t('products', lang)}:</b> {products_text}\n"
+        order_text += f"<b>{t('status', lang)}:</b> {order_data['status'] if order_data.get('status') else 'N/A'}\n"
         
         if order_data.get('created'):
             created_time = datetime.datetime.fromisoformat(order_data['created'])
-            export_text += f"<b>{t('created', lang)}:</b> {created_time.strftime('%d.%m.%Y %H:%M')}\n"
+            order_text += f"<b>{t('created', lang)}:</b> {created_time.strftime('%d.%m.%Y %H:%M')}\n"
         
         if order_data.get('delivered'):
             delivered_time = datetime.datetime.fromisoformat(order_data['delivered'])
-            export_text += f"<b>{t('delivered', lang)}:</b> {delivered_time.strftime('%d.%m.%Y %H:%M')}\n"
+            order_text += f"<b>{t('delivered', lang)}:</b> {delivered_time.strftime('%d.%m.%Y %H:%M')}\n"
+        
+        order_text += "\n" + "─" * 50 + "\n\n"
         
-        export_text += "\n" + "─" * 50 + "\n\n"
+        # שליחת ההודעה הנוכחית לפני שהיא עוברת את מגבלת האורך
+        if export_text and len(export_text) + len(order_text) > 4000:
+            await update.effective_message.reply_text(export_text, parse_mode=ParseMode.HTML)
+            export_text = ""
+        export_text += order_text
+    
+    if not orders_count:
+        await update.effective_message.reply_text(t("no_orders_found", lang))
+        return
     
-    # חלוקה להודעות אם הטקסט ארוך מדי
-    if len(export_text) > 4000:
-        # חלוקה לחלקים
-        parts = [export_text[i:i+4000] for i in range(0, len(export_text), 4000)]
-        for part in parts:
-            await update.effective_message.reply_text(part, parse_mode=ParseMode.HTML)
-    else:
+    if export_text:
         await update.effective_message.reply_text(export_text, parse_mode=ParseMode.HTML)
 
 # מערכת אישור וביטול
@@ -1046,7 +991,7 @@ async def handle_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE
     """טיפול באישור/ביטול"""
     print(f"🔧 handle_confirmation called with data: {update.callback_query.data}")
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     print(f"🔧 Language: {lang}")
     
     if update.callback_query.data.startswith("confirm_"):
@@ -0,0 +1,64 @@
+"""
+הרצת הבוט: webhook (כש-WEBHOOK_URL מוגדר) או run_polling
+
+ב-webhook טלגרם דוחף כל update מיד ל-WEBHOOK_URL/WEBHOOK_PATH (שרת ה-webhook של PTB,
+python-telegram-bot[webhooks]) - בלי long-poll, ובלי Conflict כששני מופעים רצים ביחד
+ב-rolling deploy (getUpdates מותר רק לצרכן אחד).
+
+- הבקשות נבדקות מול X-Telegram-Bot-Api-Secret-Token (WEBHOOK_SECRET, או נגזר מ-BOT_TOKEN)
+- WEBHOOK_RECORD_FILE: כל update נכנס נשמר כשורת JSON - webhook_selftest.py שולח אותם שוב לשרת מקומי
+- חזרה ל-polling (בלי WEBHOOK_URL): run_polling מוחק את ה-webhook בעלייה
+"""
+import hashlib
+import json
+import logging
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes, TypeHandler
+
+from config.config import (
+    BOT_TOKEN, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_LISTEN, WEBHOOK_PORT,
+    WEBHOOK_MAX_CONNECTIONS, WEBHOOK_RECORD_FILE,
+)
+
+
+def webhook_secret() -> str:
+    """ה-secret token של ה-webhook (A-Z a-z 0-9 _ -, עד 256 תווים)"""
+    return WEBHOOK_SECRET or hashlib.sha256(f"webhook:{BOT_TOKEN}".encode()).hexdigest()
+
+
+def webhook_local_url() -> str:
+    """הכתובת המקומית של שרת ה-webhook (ל-webhook_selftest.py)"""
+    host = '127.0.0.1' if WEBHOOK_LISTEN in ('0.0.0.0', '::', '') else WEBHOOK_LISTEN
+    return f"http://{host}:{WEBHOOK_PORT}/{WEBHOOK_PATH}"
+
+
+async def record_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """שמירת ה-update כמו שהגיע (JSONL) - group -1, לא עוצר את ה-handlers"""
+    try:
+        with open(WEBHOOK_RECORD_FILE, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(update.to_dict(), ensure_ascii=False) + '\n')
+    except OSError as e:
+        logging.warning(f"⚠️ Could not record update {update.update_id}: {e}")
+
+
+def run_bot(application: Application) -> None:
+    """webhook אם WEBHOOK_URL מוגדר, אחרת polling"""
+    if not WEBHOOK_URL:
+        logging.info("Bot mode: polling")
+        application.run_polling()
+        return
+
+    if WEBHOOK_RECORD_FILE:
+        application.add_handler(TypeHandler(Update, record_update), group=-1)
+        logging.info("Recording incoming updates to %s", WEBHOOK_RECORD_FILE)
+
+    logging.info("Bot mode: webhook %s/%s (listening on %s:%s)", WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_LISTEN, WEBHOOK_PORT)
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=WEBHOOK_PATH,
+        webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+        secret_token=webhook_secret(),
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+    )
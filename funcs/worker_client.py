@@ -0,0 +1,350 @@
+"""
+חשבונות ה-worker (tgsessions.is_worker) כ-pool של Pyrogram Clients שנשארים מחוברים
+
+במקום Client חדש + connect/handshake לכל הודעה (notif_client, send_template):
+- כל session של worker נפתח פעם אחת בעליית הבוט (או בשליחה הראשונה)
+- לכל חשבון תור משלו - השליחות של חשבון אחד רצות אחת אחרי השנייה על אותו חיבור,
+  וחשבונות שונים שולחים במקביל
+- הודעה ללקוח נשלחת מהחשבון ששלח לו בפעם הקודמת (pin), אחרת מהחשבון הכי פנוי
+- FloodWait נשמר לכל חשבון (עד מתי) - ההודעה עוברת לחשבון אחר, וחשבון חסום לא נבחר עד שהזמן עובר
+- בדיקת תקינות (get_me) כל WORKER_HEALTH_INTERVAL שניות; חיבור שנפל נפתח מחדש
+- שינוי ב-tgsessions (worker חדש / מחיקה) -> invalidate(), רשימת החשבונות נטענת מחדש
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class NoWorkerSession(Exception):
+    """אין שורה ב-tgsessions עם is_worker"""
+
+
+class WorkersThrottled(Exception):
+    """כל חשבונות ה-worker ב-FloodWait ארוך מ-max_flood_sleep"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"All worker accounts are flood-limited for {int(seconds)}s")
+        self.seconds = seconds
+
+
+class WorkerStopped(Exception):
+    """החשבון נסגר (נמחק / ה-session הוחלף / כיבוי) לפני שההודעה נשלחה או בזמן השליחה"""
+
+    def __init__(self, label: str, started: bool):
+        state = 'while sending' if started else 'before sending'
+        super().__init__(f"Worker session {label} stopped {state}")
+        # started=False - ההודעה לא יצאה, בטוח לשלוח מחשבון אחר
+        self.started = started
+
+
+async def load_worker_sessions() -> List[dict]:
+    from db.db import async_db_client
+
+    return await async_db_client.select('tgsessions', {'is_worker': True}, order='id')
+
+
+def create_pyrogram_client(session: dict):
+    from pyrogram import Client
+    from db.db import TgSession
+
+    return Client(
+        name=f"worker_{session['id']}",
+        api_id=session.get('api_id') or TgSession.get_api_id(),
+        api_hash=session.get('api_hash') or TgSession.get_api_hash(),
+        session_string=session['string'],
+        in_memory=True,
+        no_updates=True,
+    )
+
+
+def flood_wait_seconds(error: Exception) -> Optional[float]:
+    """כמה שניות לחכות אם זו שגיאת FloodWait של Pyrogram, אחרת None"""
+    from pyrogram.errors import FloodWait
+
+    if isinstance(error, FloodWait):
+        return float(error.value or 0)
+    return None
+
+
+def chat_key(chat_id) -> str:
+    """מפתח ה-pin של לקוח: username בלי '@' באותיות קטנות / id"""
+    return str(chat_id).strip().lstrip('@').lower()
+
+
+# שגיאות חיבור שאחריהן מתחברים מחדש ומנסים שוב פעם אחת
+RECONNECT_ERRORS = (ConnectionError, OSError, asyncio.TimeoutError)
+
+
+class WorkerAccount:
+    """Client אחד מחובר לחשבון worker + תור שליחה משלו"""
+
+    def __init__(self, session: dict, client_factory: Callable[[dict], Any] = create_pyrogram_client):
+        self.session = session
+        self.id = session['id']
+        self._client_factory = client_factory
+        self._client = None
+        self._stale = False
+        self._lock: Optional[asyncio.Lock] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._current: Optional[asyncio.Future] = None
+        self._busy = False
+        self.flood_until = 0.0  # time.monotonic()
+        self.sent = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        username = self.session.get('username')
+        return f"@{username}" if username else f"#{self.id}"
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None and bool(getattr(self._client, 'is_connected', False))
+
+    @property
+    def load(self) -> int:
+        """הודעות בתור + ההודעה שנשלחת עכשיו"""
+        return (self._queue.qsize() if self._queue is not None else 0) + int(self._busy)
+
+    def flood_wait_remaining(self) -> float:
+        return max(0.0, self.flood_until - time.monotonic())
+
+    # ---------- חיבור ----------
+
+    async def _connect(self):
+        # התור וה-health check מתחברים רק דרך ה-lock - לעולם לא שני חיבורים במקביל
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._stale:
+                self._stale = False
+                await self._disconnect()
+            if self.is_connected:
+                return self._client
+            client = self._client_factory(self.session)
+            await client.start()
+            self._client = client
+            print(f"✅ worker session {self.label} connected")
+            return client
+
+    async def _disconnect(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                await client.stop()
+            except Exception as e:
+                print(f"⚠️ Could not stop worker session {self.label}: {e}")
+
+    # ---------- תור שליחה ----------
+
+    async def _send(self, chat_id, text: str):
+        # נבחר למרות FloodWait (כל החשבונות חסומים) - מחכים כאן, התור של החשבון ממילא חסום
+        await asyncio.sleep(self.flood_wait_remaining())
+        client = await self._connect()
+        try:
+            return await client.send_message(chat_id, text)
+        except RECONNECT_ERRORS as e:
+            print(f"⚠️ worker session {self.label} dropped ({e!r}), reconnecting")
+            self._stale = True
+            client = await self._connect()
+            return await client.send_message(chat_id, text)
+
+    def _record_error(self, error: Exception) -> Optional[float]:
+        seconds = flood_wait_seconds(error)
+        if seconds is not None:
+            self.flood_until = time.monotonic() + seconds
+            print(f"⚠️ worker session {self.label}: FloodWait {int(seconds)}s")
+        self.last_error = repr(error)
+        return seconds
+
+    async def _send_loop(self) -> None:
+        while True:
+            chat_id, text, future = await self._queue.get()
+            self._busy, self._current = True, future
+            try:
+                if not future.cancelled():
+                    result = await self._send(chat_id, text)
+                    self.sent += 1
+                    self.last_error = None
+                    future.set_result(result)
+            except Exception as e:
+                self._record_error(e)
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._busy, self._current = False, None
+                self._queue.task_done()
+
+    def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.get_running_loop().create_task(self._send_loop())
+
+    async def send_message(self, chat_id, text: str):
+        """שליחה בתור של החשבון; זורק את השגיאה של Pyrogram"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((chat_id, text, future))
+        return await future
+
+    async def check_health(self) -> None:
+        try:
+            client = await self._connect()
+            await client.get_me()
+        except Exception as e:
+            if self._record_error(e) is None:
+                print(f"⚠️ worker session {self.label} health check failed ({e!r}), reconnecting")
+                self._stale = True
+
+    async def stop(self) -> None:
+        """סגירת החשבון; כל מי שמחכה להודעה בתור (וגם לזו שנשלחת עכשיו) מקבל WorkerStopped"""
+        current, queue = self._current, self._queue
+        if self._sender is not None:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+        self._sender = self._queue = self._current = None
+        self._busy = False
+        if current is not None and not current.done():
+            current.set_exception(WorkerStopped(self.label, started=True))
+        while queue is not None and not queue.empty():
+            _, _, future = queue.get_nowait()
+            if not future.done():
+                future.set_exception(WorkerStopped(self.label, started=False))
+        await self._disconnect()
+
+    def status(self) -> dict:
+        return {
+            'id': self.id,
+            'label': self.label,
+            'connected': self.is_connected,
+            'load': self.load,
+            'sent': self.sent,
+            'flood_wait': int(self.flood_wait_remaining()),
+            'last_error': self.last_error,
+        }
+
+
+class WorkerPool:
+    """כל חשבונות ה-worker; בחירת חשבון לכל הודעה"""
+
+    def __init__(self, health_interval: float = 60.0, max_flood_sleep: float = 30.0,
+                 load_sessions: Callable[[], Awaitable[List[dict]]] = load_worker_sessions,
+                 client_factory: Callable[[dict], Any] = create_pyrogram_client):
+        self.health_interval = health_interval
+        self.max_flood_sleep = max_flood_sleep
+        self._load_sessions = load_sessions
+        self._client_factory = client_factory
+        self._accounts: Dict[int, WorkerAccount] = {}
+        self._pins: Dict[str, int] = {}
+        self._stale = True
+        self._lock: Optional[asyncio.Lock] = None
+        self._health: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def invalidate(self) -> None:
+        """ה-workers ב-tgsessions השתנו - הרשימה נטענת מחדש בשליחה הבאה"""
+        self._stale = True
+
+    async def _refresh(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._stale:
+                return
+            sessions = {session['id']: session for session in await self._load_sessions()}
+            for account_id, account in list(self._accounts.items()):
+                session = sessions.get(account_id)
+                if session is None or session.get('string') != account.session.get('string'):
+                    del self._accounts[account_id]
+                    await account.stop()
+            for account_id, session in sessions.items():
+                if account_id not in self._accounts:
+                    self._accounts[account_id] = WorkerAccount(session, self._client_factory)
+            self._pins = {key: account_id for key, account_id in self._pins.items() if account_id in self._accounts}
+            self._stale = False
+
+    def _choose(self, key: str, exclude: set) -> WorkerAccount:
+        candidates = [account for account_id, account in self._accounts.items() if account_id not in exclude]
+        if not candidates:
+            raise NoWorkerSession()
+        available = [account for account in candidates if not account.flood_wait_remaining()]
+        pinned = self._accounts.get(self._pins.get(key))
+        if pinned in available:
+            return pinned
+        if available:
+            return min(available, key=lambda account: (account.load, account.sent))
+        # כולם ב-FloodWait - זה שמשתחרר ראשון
+        return min(candidates, key=lambda account: account.flood_wait_remaining())
+
+    async def send_message(self, chat_id, text: str):
+        """
+        שליחה מחשבון worker. FloodWait -> ניסיון בחשבון הבא; החשבון נסגר לפני שההודעה
+        יצאה מהתור -> פעם אחת מחדש אחרי טעינת ה-workers.
+        זורק NoWorkerSession / WorkersThrottled / WorkerStopped / את השגיאה של Pyrogram.
+        """
+        await self._refresh()
+        key = chat_key(chat_id)
+        tried = set()
+        rerouted = False
+        while True:
+            account = self._choose(key, tried)
+            wait = account.flood_wait_remaining()
+            if wait > self.max_flood_sleep:
+                raise WorkersThrottled(wait)
+            try:
+                result = await account.send_message(chat_id, text)
+            except WorkerStopped as e:
+                if e.started or rerouted:
+                    raise
+                rerouted = True
+                await self._refresh()
+                continue
+            except Exception as e:
+                tried.add(account.id)
+                if flood_wait_seconds(e) is None or len(tried) >= len(self._accounts):
+                    raise
+                continue
+            self._pins[key] = account.id
+            return result
+
+    def status(self) -> List[dict]:
+        """מצב החשבונות לתפריט tg sessions"""
+        return [account.status() for account in self._accounts.values()]
+
+    # ---------- health check ----------
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                # קולט גם workers שנוספו / נמחקו מחוץ לבוט
+                self._stale = True
+                await self._refresh()
+                await asyncio.gather(*(account.check_health() for account in list(self._accounts.values())))
+            except Exception as e:
+                print(f"⚠️ worker pool health check failed: {e!r}")
+            await asyncio.sleep(self.health_interval)
+
+    def start(self) -> None:
+        """בעליית הבוט: חיבור כל החשבונות + בדיקות תקינות ברקע"""
+        if self._health is None:
+            self._health = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health is not None:
+            self._health.cancel()
+            await asyncio.gather(self._health, return_exceptions=True)
+            self._health = None
+        accounts, self._accounts = list(self._accounts.values()), {}
+        await asyncio.gather(*(account.stop() for account in accounts))
+        self._stale = True
+
+
+worker_pool = WorkerPool(
+    health_interval=float(os.getenv("WORKER_HEALTH_INTERVAL", "60")),
+    max_flood_sleep=float(os.getenv("WORKER_MAX_FLOOD_SLEEP", "30")),
+)
@@ -4,7 +4,7 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -15,7 +15,7 @@ class AddStaffStates:
 
 async def add_staff_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     choices = {
         "add_o": (Role.OPERATOR, t("role_operator", lang)),
@@ -40,27 +40,30 @@ async def add_staff(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     text = update.effective_message.text
     
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client, invalidate_user_cache
     
     if text.isdigit():
         user_id = int(update.effective_message.text)
-        users = db_client.select('users', {'user_id': user_id})
+        users = await async_db_client.select('users', {'user_id': user_id})
         
         if users:
             user = users[0]
             role_value = context.user_data["add_staff_data"]["role_tup"][0].value
-            db_client.update('users', {'role': role_value}, {'user_id': user_id})
+            await async_db_client.update('users', {'role': role_value}, {'user_id': user_id})
+            invalidate_user_cache(user_id)
             await start_msg.edit_text(t("staff_added", lang).format(user['firstname'], user['username'], context.user_data["add_staff_data"]["role_tup"][1]), parse_mode=ParseMode.HTML)
         else:
             await start_msg.edit_text(t("user_not_found_id", lang).format(text), parse_mode=ParseMode.HTML)
     else:
         username = update.effective_message.text.replace('@', '')
-        users = db_client.select('users', {'username': username})
+        users = await async_db_client.select('users', {'username': username})
         
         if users:
             user = users[0]
             role_value = context.user_data["add_staff_data"]["role_tup"][0].value
-            db_client.update('users', {'role': role_value}, {'username': username})
+            await async_db_client.update('users', {'role': role_value}, {'username': username})
+            for staff_user in users:
+                invalidate_user_cache(staff_user['user_id'])
             await start_msg.edit_text(t("staff_added", lang).format(user['firstname'], user['username'], context.user_data["add_staff_data"]["role_tup"][1]), parse_mode=ParseMode.HTML)
         else:
             await start_msg.edit_text(t("user_not_found_username", lang).format(text), parse_mode=ParseMode.HTML)
@@ -4,7 +4,7 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -16,7 +16,7 @@ class EditGroupLinkStates:
 async def start_edit_group_link(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """START function of collecting data for new order."""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     group_type = 'admin' if 'admin' in update.callback_query.data else 'courier'
     tip = 'группы админов' if group_type == 'admin' else 'группы курьеров'
@@ -4,9 +4,10 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
+from funcs.outbound_scheduler import COURIER_LANE
 import asyncio
 
 class DelayMinStates:
@@ -20,18 +21,18 @@ async def choose_minutes_courier(update: Update, context: ContextTypes.DEFAULT_T
     Выбрать минуты нажатием по кнопке для курьера для выбора задержки.
     """
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     import logging
     logger = logging.getLogger(__name__)
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     # CRITICAL: Validate user role
-    users = db_client.select('users', {'user_id': update.effective_user.id})
+    user = await get_user_by_id_async(update.effective_user.id)
     # CRITICAL FIX: Use 'courier' (Role.RUNNER.value) not 'runner'!
     # Role.RUNNER = "courier" in db/db.py
-    if not users or users[0].get('role') not in ['courier', 'admin']:
+    if not user or user.get('role') not in ['courier', 'admin']:
         logger.warning(f"⚠️ choose_minutes_courier (delay): User {update.effective_user.id} does not have courier role")
         await update.effective_message.reply_text(t('need_courier_role', lang))
         return ConversationHandler.END
@@ -57,7 +58,7 @@ async def choose_minutes_courier(update: Update, context: ContextTypes.DEFAULT_T
         return ConversationHandler.END
     
     # CRITICAL: Verify order exists before proceeding
-    orders = db_client.select('orders', {'id': order_id})
+    orders = await async_db_client.select('orders', {'id': order_id})
     if not orders:
         logger.error(f"❌ choose_minutes_courier (delay): Order {order_id} not found in database")
         await update.effective_message.reply_text(
@@ -192,12 +193,12 @@ async def delay_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         return ConversationHandler.END
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     import logging
     logger = logging.getLogger(__name__)
     
     # Update order with error handling
-    update_result = db_client.update('orders', {
+    update_result = await async_db_client.update('orders', {
         'courier_id': update.effective_user.id,
         'courier_name': f"{update.effective_user.first_name} {update.effective_user.last_name if update.effective_user.last_name else ''}".strip(),
         'courier_username': f"@{update.effective_user.username}" if update.effective_user.username else "",
@@ -215,7 +216,7 @@ async def delay_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         return ConversationHandler.END
 
     # CRITICAL: Verify order was actually updated
-    orders = db_client.select('orders', {'id': order_id})
+    orders = await async_db_client.select('orders', {'id': order_id})
     if not orders:
         logger.error(f"❌ delay_minutes_courier_end: Order {order_id} not found after update")
         await update.effective_message.reply_text(
@@ -224,6 +225,7 @@ async def delay_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         return ConversationHandler.END
     
     order_dict = orders[0]
+    order_index.upsert(order_dict)
     
     # CRITICAL: Verify order status, delay_minutes, and delay_reason were updated
     if (order_dict.get('status') != 'delay' or 
@@ -253,8 +255,8 @@ async def delay_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
 
         status_text = t("order_status", lang)
         changed_text = t("changed_to", lang)
-        from db.db import get_bot_setting
-        admin_chat = get_bot_setting('admin_chat') or links.ADMIN_CHAT
+        from db.db import get_bot_setting_async
+        admin_chat = await get_bot_setting_async('admin_chat') or links.ADMIN_CHAT
         if admin_chat:
             # Send BILINGUAL status update (RU + HE)
             status_ru = t("order_status", 'ru')
@@ -365,10 +367,10 @@ async def write_delay_minutes_courier_end(update: Update, context: ContextTypes.
         return ConversationHandler.END
 
     # Using Supabase only
-    from db.db import db_client, get_opened_shift
+    from db.db import async_db_client, get_opened_shift_async
     
     # Update order with error handling
-    update_result = db_client.update('orders', {
+    update_result = await async_db_client.update('orders', {
         'courier_id': update.effective_user.id,
         'courier_name': f"{update.effective_user.first_name} {update.effective_user.last_name if update.effective_user.last_name else ''}".strip(),
         'courier_username': f"@{update.effective_user.username}" if update.effective_user.username else "",
@@ -386,7 +388,7 @@ async def write_delay_minutes_courier_end(update: Update, context: ContextTypes.
         return ConversationHandler.END
 
     # CRITICAL: Verify order was actually updated
-    orders = db_client.select('orders', {'id': order_id})
+    orders = await async_db_client.select('orders', {'id': order_id})
     if not orders:
         logger.error(f"❌ write_delay_minutes_courier_end: Order {order_id} not found after update")
         await update.effective_message.reply_text(
@@ -395,6 +397,7 @@ async def write_delay_minutes_courier_end(update: Update, context: ContextTypes.
         return ConversationHandler.END
     
     order_dict = orders[0]
+    order_index.upsert(order_dict)
     
     # CRITICAL: Verify order status, delay_minutes, and delay_reason were updated
     if (order_dict.get('status') != 'delay' or 
@@ -429,12 +432,12 @@ async def write_delay_minutes_courier_end(update: Update, context: ContextTypes.
                 except:
                     pass
 
-        shift = get_opened_shift()
+        shift = await get_opened_shift_async()
 
         if shift:
             try:
-                operator_lang = get_user_lang(shift['operator_id'])
-                await context.bot.send_message(shift['operator_id'], (await form_notif_delay_short(order, operator_lang)), parse_mode=ParseMode.HTML)
+                operator_lang = await get_user_lang_async(shift['operator_id'])
+                await context.bot.send_message(shift['operator_id'], (await form_notif_delay_short(order, operator_lang)), parse_mode=ParseMode.HTML, rate_limit_args=COURIER_LANE)
             except Exception as e:
                 print(repr(e))
     except Exception as e:
@@ -4,9 +4,10 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
+from funcs.outbound_scheduler import COURIER_LANE
 import asyncio
 
 class WriteMinStates:
@@ -18,18 +19,18 @@ async def choose_minutes_courier(update: Update, context: ContextTypes.DEFAULT_T
     Выбрать минуты нажатием по кнопке для курьера до выполнения заказа.
     """
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     import logging
     logger = logging.getLogger(__name__)
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     # CRITICAL: Validate user role
-    users = db_client.select('users', {'user_id': update.effective_user.id})
+    user = await get_user_by_id_async(update.effective_user.id)
     # CRITICAL FIX: Use 'courier' (Role.RUNNER.value) not 'runner'!
     # Role.RUNNER = "courier" in db/db.py
-    if not users or users[0].get('role') not in ['courier', 'admin']:
+    if not user or user.get('role') not in ['courier', 'admin']:
         logger.warning(f"⚠️ choose_minutes_courier (write): User {update.effective_user.id} does not have courier role")
         await update.effective_message.reply_text(t('need_courier_role', lang))
         return ConversationHandler.END
@@ -55,7 +56,7 @@ async def choose_minutes_courier(update: Update, context: ContextTypes.DEFAULT_T
         return ConversationHandler.END
     
     # CRITICAL: Verify order exists before proceeding
-    orders = db_client.select('orders', {'id': order_id})
+    orders = await async_db_client.select('orders', {'id': order_id})
     if not orders:
         logger.error(f"❌ choose_minutes_courier (write): Order {order_id} not found in database")
         await update.effective_message.reply_text(
@@ -124,10 +125,10 @@ async def write_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         return ConversationHandler.END
 
     # Using Supabase only
-    from db.db import db_client, get_opened_shift
+    from db.db import async_db_client, get_opened_shift_async
     
     # Update order with error handling
-    update_result = db_client.update('orders', {
+    update_result = await async_db_client.update('orders', {
         'courier_id': update.effective_user.id,
         'courier_name': f"{update.effective_user.first_name} {update.effective_user.last_name if update.effective_user.last_name else ''}".strip(),
         'courier_username': f"@{update.effective_user.username}" if update.effective_user.username else "",
@@ -144,7 +145,7 @@ async def write_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         return ConversationHandler.END
 
     # CRITICAL: Verify order was actually updated
-    orders = db_client.select('orders', {'id': order_id})
+    orders = await async_db_client.select('orders', {'id': order_id})
     if not orders:
         logger.error(f"❌ write_minutes_courier_end: Order {order_id} not found after update")
         await update.effective_message.reply_text(
@@ -153,6 +154,7 @@ async def write_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         return ConversationHandler.END
     
     order_dict = orders[0]
+    order_index.upsert(order_dict)
     
     # CRITICAL: Verify order status and courier_minutes were updated
     if order_dict.get('status') != 'active' or order_dict.get('courier_minutes') != minutes:
@@ -178,12 +180,12 @@ async def write_minutes_courier_end(update: Update, context: ContextTypes.DEFAUL
         text = await form_confirm_order_courier(order, lang)
         context.user_data["choose_min_data"]["start_msg"] = await msg.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=(await form_courier_action_kb(order.id, lang)))
 
-        shift = get_opened_shift()
+        shift = await get_opened_shift_async()
 
         if shift:
             try:
-                operator_lang = get_user_lang(shift['operator_id'])
-                await context.bot.send_message(shift['operator_id'], (await form_notif_ready_order_short(order, operator_lang)), reply_markup=(await form_operator_action_kb(order, operator_lang)), parse_mode=ParseMode.HTML)
+                operator_lang = await get_user_lang_async(shift['operator_id'])
+                await context.bot.send_message(shift['operator_id'], (await form_notif_ready_order_short(order, operator_lang)), reply_markup=(await form_operator_action_kb(order, operator_lang)), parse_mode=ParseMode.HTML, rate_limit_args=COURIER_LANE)
             except Exception as e:
                 print(repr(e))
     except Exception as e:
@@ -4,7 +4,7 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -16,7 +16,7 @@ class CreateTemplateStates:
 
 async def start_template_creation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     start_msg = await update.effective_message.edit_text(
         text=t("enter_template_name", lang),
@@ -53,14 +53,14 @@ async def collecting_new_template_text(update: Update, context: ContextTypes.DEF
     context.user_data["create_new_shab_data"]["text"] = text
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     template_data = {
         'name': context.user_data["create_new_shab_data"]["name"],
         'text': text
     }
     
-    result = db_client.insert('templates', template_data)
+    result = await async_db_client.insert('templates', template_data)
     print(f"Created template: {result}")
 
     start_msg: Message = context.user_data["create_new_shab_data"]["start_msg"]
@@ -4,7 +4,7 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -17,20 +17,20 @@ class EditCrudeStockStates:
 async def start_edit_crude_stock_product(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """START function of collecting data for new order."""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     product_id = int(update.callback_query.data.split('_')[2])
 
     # Using Supabase only
-    from db.db import db_client, get_product_by_id
+    from db.db import async_db_client, get_product_by_id_async
     
     # Check if user is stockman or admin
-    users = db_client.select('users', {'user_id': update.effective_user.id})
-    if not users or users[0].get('role') not in ['stockman', 'admin']:
+    user = await get_user_by_id_async(update.effective_user.id)
+    if not user or user.get('role') not in ['stockman', 'admin']:
         await update.effective_message.reply_text(t('need_stockman_role', lang))
         return ConversationHandler.END
 
-    product = get_product_by_id(product_id)
+    product = await get_product_by_id_async(product_id)
 
     start_msg = await update.effective_message.edit_text(t("product_crude_info", lang).format(product.get('name'), product.get('crude'), product.get('stock')), reply_markup=get_edit_product_crude_kb(lang), parse_mode=ParseMode.HTML)
     context.user_data["edit_product_with_crude_data"] = {}
@@ -60,9 +60,9 @@ async def edit_product_crude_end(update: Update, context: ContextTypes.DEFAULT_T
     product = context.user_data["edit_product_with_crude_data"]["product"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import update_product_async
     
-    db_client.update('products', {'crude': new_stock}, {'id': product['id']})
+    await update_product_async(product['id'], {'crude': new_stock})
 
     msg: Message = context.user_data["edit_product_with_crude_data"]["start_msg"]
 
@@ -92,9 +92,9 @@ async def edit_product_stock_end(update: Update, context: ContextTypes.DEFAULT_T
     product = context.user_data["edit_product_with_crude_data"]["product"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import update_product_async
     
-    db_client.update('products', {'stock': new_stock}, {'id': product['id']})
+    await update_product_async(product['id'], {'stock': new_stock})
 
     msg = context.user_data["edit_product_with_crude_data"]["start_msg"]
 
@@ -111,9 +111,9 @@ async def delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     product = context.user_data["edit_product_with_crude_data"]["product"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import delete_product_async
     
-    db_client.delete('products', {'id': product['id']})
+    await delete_product_async(product['id'])
 
     msg = context.user_data["edit_product_with_crude_data"]["start_msg"]
 
@@ -137,7 +137,7 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 async def timeout_reached(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     msg: Message = context.user_data["edit_product_with_crude_data"]["start_msg"]
-    await msg.reply_text(t("timeout_error", get_user_lang(update.effective_user.id)))
+    await msg.reply_text(t("timeout_error", await get_user_lang_async(update.effective_user.id)))
     del context.user_data["edit_product_with_crude_data"]
 
     return ConversationHandler.END
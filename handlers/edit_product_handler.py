@@ -4,7 +4,7 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -18,16 +18,16 @@ class EditProductStates:
 async def start_edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """START function of collecting data for new order."""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     # Extract product_id from callback_data (format: edit_stock_5, edit_name_5, etc.)
     callback_data = update.callback_query.data
     product_id = int(callback_data.split('_')[-1])  # Get last part after last underscore
 
     # Using Supabase only
-    from db.db import get_product_by_id
+    from db.db import get_product_by_id_async
     
-    product = get_product_by_id(product_id)
+    product = await get_product_by_id_async(product_id)
 
     # בדיקה אם הגענו ממלאי נוכחי - חשוב לניווט חזרה נכון
     from funcs.utils import peek_navigation_history
@@ -77,9 +77,9 @@ async def edit_product_stock_end(update: Update, context: ContextTypes.DEFAULT_T
     product = context.user_data["edit_product_data"]["product"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import update_product_async
     
-    db_client.update('products', {'stock': new_stock}, {'id': product['id']})
+    await update_product_async(product['id'], {'stock': new_stock})
 
     msg = context.user_data["edit_product_data"]["start_msg"]
 
@@ -120,9 +120,9 @@ async def edit_product_name_end(update: Update, context: ContextTypes.DEFAULT_TY
     product = context.user_data["edit_product_data"]["product"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import update_product_async
     
-    db_client.update('products', {'name': new_name}, {'id': product['id']})
+    await update_product_async(product['id'], {'name': new_name})
 
     msg = context.user_data["edit_product_data"]["start_msg"]
 
@@ -165,9 +165,9 @@ async def edit_product_price_end(update: Update, context: ContextTypes.DEFAULT_T
         product = context.user_data["edit_product_data"]["product"]
 
         # Using Supabase only
-        from db.db import db_client
+        from db.db import update_product_async
         
-        db_client.update('products', {'price': new_price}, {'id': product['id']})
+        await update_product_async(product['id'], {'price': new_price})
 
         msg = context.user_data["edit_product_data"]["start_msg"]
 
@@ -192,9 +192,9 @@ async def delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     product = context.user_data["edit_product_data"]["product"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import delete_product_async
     
-    db_client.delete('products', {'id': product['id']})
+    await delete_product_async(product['id'])
 
     msg = context.user_data["edit_product_data"]["start_msg"]
 
@@ -265,7 +265,7 @@ async def back_to_edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def timeout_reached(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     msg: Message = context.user_data["edit_product_data"]["start_msg"]
-    await msg.reply_text(t("timeout_error", get_user_lang(update.effective_user.id)))
+    await msg.reply_text(t("timeout_error", await get_user_lang_async(update.effective_user.id)))
     del context.user_data["edit_product_data"]
 
     return ConversationHandler.END
@@ -4,7 +4,7 @@ from telegram.constants import ParseMode
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -22,30 +22,18 @@ async def start_end_shift(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     """
     print(f"🔧 start_end_shift called")
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     print(f"DEBUG: User {update.effective_user.id} language: {lang}")  # Debug log
     
     # Using Supabase only
-    from db.db import get_opened_shift
-    shift = get_opened_shift()
+    from db.db import get_opened_shift_async
+    shift = await get_opened_shift_async()
 
     if not shift:
         await update.effective_message.edit_text(t("no_open_shifts", lang))
         return ConversationHandler.END
 
-    # Convert dict to object-like
-    class ShiftObj:
-        def __init__(self, data):
-            import datetime
-            for k, v in data.items():
-                if isinstance(v, str) and 'T' in v and '-' in v:  # ISO datetime
-                    try:
-                        v = datetime.datetime.fromisoformat(v)
-                    except:
-                        pass
-                setattr(self, k, v)
-    
-    shift_obj = ShiftObj(shift) if isinstance(shift, dict) else shift
+    shift_obj = Shift.from_row(shift) if isinstance(shift, dict) else shift
 
     # Initialize end_shift_data for confirm_end_shift
     context.user_data["end_shift_data"] = {
@@ -101,9 +89,10 @@ async def collect_petrol_paid(update: Update, context: ContextTypes.DEFAULT_TYPE
     context.user_data["end_shift_data"]["petrol_paid"] = int(update.effective_message.text)
 
     # Using Supabase only
-    from db.db import get_opened_shift, get_all_orders
+    from db.db import get_opened_shift_async, shift_accumulator
+    from db.shift_summary import summary_total
     
-    shift = get_opened_shift()
+    shift = await get_opened_shift_async()
     
     # Convert datetime
     import datetime
@@ -114,54 +103,11 @@ async def collect_petrol_paid(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     shift_start_date = opened_time.strftime("%d.%m.%Y, %H:%M:%S")
 
-    # Get all completed orders and filter by time range
-    all_orders = get_all_orders()
-    orders = []
-    for o in all_orders:
-        if o.get('status') == 'completed' and o.get('delivered'):
-            delivered_time = datetime.datetime.fromisoformat(o['delivered']) if isinstance(o['delivered'], str) else o['delivered']
-            if opened_time <= delivered_time <= datetime.datetime.now():
-                orders.append(o)
-
-    # Extract all products from orders
-    all_products = []
-    for order in orders:
-        # CRITICAL: Safe JSON parsing with error handling
-        products_json = order.get('products', '[]')
-        if not products_json or not isinstance(products_json, str):
-            continue
-        try:
-            products = json.loads(products_json)
-            if isinstance(products, list):
-                all_products.extend([p for p in products if isinstance(p, dict)])
-        except (json.JSONDecodeError, TypeError):
-            continue  # Skip invalid products JSON
-
-    print(all_products)
-
-    summary = {}
-    total_sum = 0  # Variable to store total sum
-
-    # Iterate through all products
-    for product in all_products:
-        name = product["name"]
-        quantity = product["quantity"]
-        total_price = product["total_price"]
-
-        # Calculate sum for current product
-        current_product_total = total_price
-        total_sum += current_product_total  # Add to total sum
-
-        # If product already exists in dictionary, update quantity and sum
-        if name in summary:
-            summary[name]["total_quantity"] += quantity
-            summary[name]["total_price"] += current_product_total
-        else:
-            # If product doesn't exist, add it to dictionary
-            summary[name] = {
-                "total_quantity": quantity,
-                "total_price": current_product_total
-            }
+    # Product summary accumulated while the shift was open (db/shift_summary.py) -
+    # no scan over all orders at close time
+    summary = await shift_accumulator.get_summary(shift)
+    total_sum = summary_total(summary)
+    print(summary)
 
     samples = []
     qty_text = t("units", lang)
@@ -205,13 +151,13 @@ async def confirm_end_shift(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.callback_query.answer()
     
     # Get language first
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     # Get or initialize end_shift_data
     if "end_shift_data" not in context.user_data:
         print(f"⚠️ end_shift_data not found, initializing...")
-        from db.db import get_opened_shift
-        shift = get_opened_shift()
+        from db.db import get_opened_shift_async
+        shift = await get_opened_shift_async()
         context.user_data["end_shift_data"] = {
             "lang": lang,
             "shift_id": shift['id'],
@@ -231,17 +177,17 @@ async def confirm_end_shift(update: Update, context: ContextTypes.DEFAULT_TYPE)
     print(f"🔧 Language: {lang}")
     
     # Using Supabase only
-    from db.db import db_client, get_user_by_id
+    from db.db import async_db_client, get_user_by_id_async, set_current_shift, record_shift_stats_async, shift_accumulator
     
     shift_id = context.user_data["end_shift_data"].get("shift_id")
     if not shift_id:
         # Get the opened shift
-        from db.db import get_opened_shift
-        opened_shift = get_opened_shift()
+        from db.db import get_opened_shift_async
+        opened_shift = await get_opened_shift_async()
         shift_id = opened_shift['id']
     print(f"🔧 Shift ID: {shift_id}")
     
-    user = get_user_by_id(update.effective_user.id)
+    user = await get_user_by_id_async(update.effective_user.id)
 
     # Update shift in Supabase
     import datetime
@@ -249,7 +195,7 @@ async def confirm_end_shift(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     # Get products
     shift = {'id': shift_id}
-    products_list = Shift.set_products()
+    products_list = await Shift.set_products_async()
     
     update_data = {
         'operator_paid': context.user_data["end_shift_data"].get("operator_paid", 0),
@@ -263,24 +209,21 @@ async def confirm_end_shift(update: Update, context: ContextTypes.DEFAULT_TYPE)
         'summary': json.dumps(context.user_data["end_shift_data"].get("summary", {})),
         'products_end': json.dumps(products_list),
         'closed_time': datetime.datetime.now().isoformat(),
-        'status': 'closed'
+        'status': ShiftStatus.closed.value
     }
     print(f"🔧 Updating shift in Supabase with data: {update_data}")
-    db_client.update('shifts', update_data, {'id': shift_id})
-    
-    # Create object for report
-    class ShiftObj:
-        def __init__(self, data):
-            for k, v in data.items():
-                if isinstance(v, str) and 'T' in v and '-' in v:
-                    try:
-                        v = datetime.datetime.fromisoformat(v)
-                    except:
-                        pass
-                setattr(self, k, v)
+    await async_db_client.update('shifts', update_data, {'id': shift_id})
+    set_current_shift(None)
+    shift_accumulator.reset()
+    # Incremental daily_stats rollup for the quick reports
+    await record_shift_stats_async(update_data)
+    # Precomputed week / daily-profit reports now include this shift
+    from funcs.report_store import precomputed_reports
+    precomputed_reports.refresh_in_background()
     
-    shift_data = db_client.select('shifts', {'id': shift_id})[0]
-    shift_obj = ShiftObj(shift_data)
+    # Shift record for the report (timestamps / summary parsed once)
+    shift_data = (await async_db_client.select('shifts', {'id': shift_id}))[0]
+    shift_obj = Shift.from_row(shift_data)
     print(f"🔧 Shift object created for report")
     
     report = await form_end_shift_report(shift_obj, lang)
@@ -292,8 +235,8 @@ async def confirm_end_shift(update: Update, context: ContextTypes.DEFAULT_TYPE)
     print(f"🔧 Report sent to user")
 
     try:
-        from db.db import get_bot_setting
-        admin_chat = get_bot_setting('admin_chat') or links.ADMIN_CHAT
+        from db.db import get_bot_setting_async
+        admin_chat = await get_bot_setting_async('admin_chat') or links.ADMIN_CHAT
         if admin_chat:
             await context.bot.send_message(admin_chat, report, parse_mode=ParseMode.HTML)
             print(f"🔧 Report sent to admin chat: {admin_chat}")
@@ -6,7 +6,7 @@ from pyrogram.errors import BadRequest, SessionPasswordNeeded
 from pyrogram.types import User as PyrogramUser
 from db.db import *
 from config.kb import get_two_step_ask_kb, get_digits_kb, get_cancel_kb
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 
 
 class AuthStates:
@@ -22,7 +22,7 @@ class AuthStates:
 async def start_sessing_creation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """STARTING CREATION OF A SESSION VIA THE BOT BUTTONS."""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     inline_keyboard = [
         [InlineKeyboardButton("Cancel", callback_data="cancel")]
     ]
@@ -36,7 +36,7 @@ async def start_sessing_creation(update: Update, context: ContextTypes.DEFAULT_T
 
 async def handle_acc_phone(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     phone_number = update.message.text
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     context.user_data["auth_data"]["phone_number"] = phone_number
 
@@ -52,7 +52,7 @@ async def handle_acc_phone(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
 async def fetch_actions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await update.callback_query.answer("Processing.")
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     inline_keyboard = [
         [InlineKeyboardButton("Cancel", callback_data="cancel")]
     ]
@@ -94,7 +94,7 @@ async def fetch_actions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
 
         context.user_data["auth_data"]["phone_code_hash"] = sent_code.phone_code_hash
 
-        lang = get_user_lang(update.effective_user.id)
+        lang = await get_user_lang_async(update.effective_user.id)
         await context.bot.edit_message_text(
             text=f"Now type the authorization code:",
             chat_id=update.effective_chat.id,
@@ -136,7 +136,7 @@ async def handle_password(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     context.user_data["auth_data"]["phone_code_hash"] = sent_code.phone_code_hash
 
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     await context.bot.edit_message_text(
         text=f"Now type the authorization code:",
         chat_id=update.effective_chat.id,
@@ -218,10 +218,10 @@ async def process_number(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await app.disconnect()
     
     # Saves to db - Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     # Check if there's already a worker
-    workers = db_client.select('tgsessions', {'is_worker': True})
+    workers = await async_db_client.select('tgsessions', {'is_worker': True})
     is_worker = len(workers) == 0
     
     session_data = {
@@ -232,7 +232,10 @@ async def process_number(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         'is_worker': is_worker
     }
     
-    db_client.insert('tgsessions', session_data)
+    await async_db_client.insert('tgsessions', session_data)
+    if is_worker:
+        from funcs.worker_client import worker_pool
+        worker_pool.invalidate()
 
     await context.bot.edit_message_text(
         text=f"Success! Session of {session_user.first_name} {session_user.last_name} @{session_user.username} was created.",
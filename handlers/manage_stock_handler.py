@@ -4,7 +4,7 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -153,7 +153,7 @@ async def manage_stock(update: Update, context: ContextTypes.DEFAULT_TYPE, from_
     user_id = update.effective_user.id
     logger.info(f"📦 manage_stock() called by user {user_id}, from_back_button: {from_back_button}")
 
-    lang = get_user_lang(user_id)
+    lang = await get_user_lang_async(user_id)
     logger.info(f"🌍 Stock management language: {lang}")
 
     # בדיקה אם באנו מ-list_products (אז זה כמו חזרה)
@@ -192,7 +192,7 @@ async def add_product_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
     logger.info(f"🔧 add_product_start called by user {update.effective_user.id}")
     await update.callback_query.answer()
 
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     logger.info(f"🌍 Add product language: {lang}")
 
     context.user_data['add_product_data'] = {
@@ -226,7 +226,7 @@ async def add_product_name(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         product_name = update.message.text[:50]  # Limit to 50 characters
         logger.info(f"📝 Product name received: '{product_name}'")
 
-        lang = get_user_lang(update.effective_user.id)
+        lang = await get_user_lang_async(update.effective_user.id)
 
         await update.effective_message.delete()
         logger.info(f"🗑️ User message deleted")
@@ -261,7 +261,7 @@ async def add_product_stock(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     logger.info(f"📦 add_product_stock called by user {update.effective_user.id}")
 
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     try:
         stock = int(update.message.text[:10])
@@ -283,7 +283,7 @@ async def add_product_stock(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def add_product_price(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Process product price and save"""
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     try:
         price = int(update.message.text[:10])
@@ -293,7 +293,7 @@ async def add_product_price(update: Update, context: ContextTypes.DEFAULT_TYPE)
         stock = context.user_data["add_product"]["stock"]
         
         # Using Supabase only
-        from db.db import db_client
+        from db.db import insert_product_async
         
         product_data = {
             'name': product_name,
@@ -301,7 +301,7 @@ async def add_product_price(update: Update, context: ContextTypes.DEFAULT_TYPE)
             'price': price,
             'crude': 0
         }
-        result = db_client.insert('products', product_data)
+        result = await insert_product_async(product_data)
         
         # Check if we're coming from order creation
         if "creating_product_from_order" in context.user_data:
@@ -351,7 +351,7 @@ async def list_products(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     user_id = update.effective_user.id
     logger.info(f"📋 list_products() called by user {user_id}")
 
-    lang = get_user_lang(user_id)
+    lang = await get_user_lang_async(user_id)
     logger.info(f"🌍 Products list language: {lang}")
 
     # הוספה: ניקוי הודעה קודמת ורישום ב-navigation
@@ -364,8 +364,8 @@ async def list_products(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     # לא צריך clean_previous_message כי אנחנו עושים edit_text על ההודעה הקיימת
 
-    from db.db import get_all_products
-    products = get_all_products()
+    from db.db import get_all_products_async
+    products = await get_all_products_async()
 
     if not products:
         # כפתור חזור עם טקסט לפי שפה
@@ -415,12 +415,12 @@ async def list_products(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 async def edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Start editing a product"""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     product_id = int(update.callback_query.data.replace('edit_', ''))
 
-    from db.db import get_product_by_id
-    product = get_product_by_id(product_id)
+    from db.db import get_product_by_id_async
+    product = await get_product_by_id_async(product_id)
 
     if not product:
         await update.effective_message.reply_text(t("product_not_found", lang))
@@ -443,12 +443,12 @@ async def edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def delete_product_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Confirm product deletion"""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     product_id = int(update.callback_query.data.replace('delete_product_', ''))
     
-    from db.db import get_product_by_id
-    product = get_product_by_id(product_id)
+    from db.db import get_product_by_id_async
+    product = await get_product_by_id_async(product_id)
     
     if not product:
         await update.effective_message.reply_text(t("product_not_found", lang))
@@ -470,7 +470,7 @@ async def delete_product_confirm(update: Update, context: ContextTypes.DEFAULT_T
 async def delete_product_execute(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Execute product deletion"""
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     
     product_id = context.user_data.get("delete_product")
     
@@ -478,11 +478,11 @@ async def delete_product_execute(update: Update, context: ContextTypes.DEFAULT_T
         await update.effective_message.edit_text(t("error", lang))
         return
     
-    from db.db import db_client, get_product_by_id
-    product = get_product_by_id(product_id)
+    from db.db import delete_product_async, get_product_by_id_async
+    product = await get_product_by_id_async(product_id)
     
     if product:
-        db_client.delete('products', {'id': product_id})
+        await delete_product_async(product_id)
         await update.effective_message.edit_text(
             t("product_deleted", lang).format(product.get('name')),
             parse_mode="HTML"
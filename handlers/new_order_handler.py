@@ -5,10 +5,11 @@ from telegram import Update
 from geopy.geocoders import Nominatim
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from config.kb import get_skip_back_cancel_kb
 from funcs.utils import *
 from funcs.bot_funcs import *
+from funcs.outbound_scheduler import COURIER_LANE
 import asyncio
 import datetime
 import logging
@@ -149,15 +150,15 @@ async def start_collect_data(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """START function of collecting data for new order."""
     print(f"🔧 start_collect_data called")
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
     print(f"🔧 Language: {lang}")
     
     # ניקוי הודעה קודמת
     await clean_previous_message(update, context)
 
     # Using Supabase only
-    from db.db import get_opened_shift
-    shift = get_opened_shift()
+    from db.db import get_opened_shift_async
+    shift = await get_opened_shift_async()
     print(f"🔧 Shift found: {shift is not None}")
 
     if not shift:
@@ -612,8 +613,8 @@ async def collect_product(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     product_id = int(update.callback_query.data)
 
     # Get product from DB
-    from db.db import get_product_by_id
-    product = get_product_by_id(product_id)
+    from db.db import get_product_by_id_async
+    product = await get_product_by_id_async(product_id)
 
     if product:
         # Create new item
@@ -1217,8 +1218,7 @@ async def go_to_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     context.user_data["collect_order_data"]["step"] = CollectOrderDataStates.ADD_MORE_PRODUCTS_OR_CONFIRM
 
     # Create an object-like structure for the order (not saved to DB yet)
-    import json
-    products_json = json.dumps(context.user_data["collect_order_data"]["products"])
+    products = context.user_data["collect_order_data"]["products"]
     
     # Calculate total price
     total_price = sum([product['total_price'] for product in context.user_data["collect_order_data"]["products"]])
@@ -1230,7 +1230,7 @@ async def go_to_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
         'client_username': context.user_data["collect_order_data"]["username"],
         'client_phone': context.user_data["collect_order_data"]["phone"],
         'address': context.user_data["collect_order_data"]["address"],
-        'products': products_json,
+        'products': products,
         'total_order_price': total_price,
         'status': None  # Will be set when saved
     }
@@ -1588,26 +1588,37 @@ async def confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     msg: TgMessage = context.user_data["collect_order_data"]["start_msg"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     import json
     import datetime
     
     # שימוש במבנה הנתונים החדש
     customer = context.user_data["collect_order_data"]["customer"]
 
+    # שורות המוצר נבדקות פעם אחת כאן ונשמרות כ-jsonb (db/order_items.py)
+    from db.order_items import validate_order_items
+    product_ids = {product['name']: product['id'] for product in await get_all_products_async()}
+    try:
+        items = validate_order_items(context.user_data["collect_order_data"]["products"], product_ids.get)
+    except ValueError as e:
+        logger.error(f"❌ confirm_order: Invalid order items: {e}")
+        await msg.reply_text(f"⚠️ {t('error', lang)}: {e}")
+        return CollectOrderDataStates.CONFIRM_OR_NOT
+
     order_data = {
         'client_name': customer.get("name"),
         'client_username': customer.get("username"),
         'client_phone': customer.get("phone"),
         'client_address': customer.get("address"),
-        'products': json.dumps(context.user_data["collect_order_data"]["products"]),
-        'total_order_price': sum(product.get('total_price', 0) for product in context.user_data["collect_order_data"]["products"]),
+        'products': items,
+        'total_order_price': sum(item['total_price'] for item in items),
         'status': 'active',
         'created': datetime.datetime.now().isoformat()
     }
     
-    result = db_client.insert('orders', order_data)
+    result = await async_db_client.insert('orders', order_data)
     context.user_data["collect_order_data"]["order_id"] = result.get('id')
+    order_index.upsert(result)
 
     # Create object-like structure for compatibility
     from funcs.utils import create_order_obj
@@ -1627,14 +1638,16 @@ async def confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
 
     # שליחת הודעה לקבוצת השליחים
     try:
-        from db.db import get_bot_setting
-        order_chat = get_bot_setting('order_chat') or links.ORDER_CHAT
+        from db.db import get_bot_setting_async
+        order_chat = await get_bot_setting_async('order_chat') or links.ORDER_CHAT
         if order_chat and order_obj and hasattr(order_obj, 'id') and order_obj.id:
             # Send BILINGUAL message to courier group (RU + HE)
             crourier_text = await form_confirm_order_courier(order_obj, 'ru')  # lang param ignored - now bilingual
             from config.kb import form_courier_action_kb
             markup = await form_courier_action_kb(order_obj.id, 'ru')  # lang param ignored - now bilingual
-            await context.bot.send_message(order_chat, crourier_text, parse_mode=ParseMode.HTML, reply_markup=markup)
+            # Courier lane of the outbound scheduler - goes out ahead of reports / admin messages
+            await context.bot.send_message(order_chat, crourier_text, parse_mode=ParseMode.HTML, reply_markup=markup,
+                                           rate_limit_args=COURIER_LANE)
             logger.info(f"📨 Order notification sent to courier group: {order_chat}")
         else:
             logger.warning("⚠️ No order_chat configured or invalid order_obj - order notification not sent")
@@ -1661,7 +1674,7 @@ async def timeout_reached(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     try:
         msg: TgMessage = context.user_data["collect_order_data"]["start_msg"]
-        lang = get_user_lang(update.effective_user.id) if update.effective_user else 'ru'
+        lang = await get_user_lang_async(update.effective_user.id) if update.effective_user else 'ru'
         await msg.reply_text(t("timeout_error", lang))
         logger.info("⏰ Conversation timed out - cleaned up user data")
     except Exception as e:
@@ -2,10 +2,9 @@ from telegram.ext import CallbackQueryHandler, TypeHandler, ContextTypes, Conver
 from telegram import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram import Update
 from geopy.geocoders import Nominatim
-from pyrogram import Client
 from db.db import *
 from config.config import *
-from config.translations import t, get_user_lang
+from config.translations import t, get_user_lang, get_user_lang_async
 from funcs.utils import *
 from funcs.bot_funcs import *
 import asyncio
@@ -20,18 +19,18 @@ class DealTemplateStates:
 
 async def start_dealing_template(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.callback_query.answer()
-    lang = get_user_lang(update.effective_user.id)
+    lang = await get_user_lang_async(update.effective_user.id)
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     _, template_id, order_id = update.callback_query.data.split('_')
     print(_, template_id, order_id)
     template_id = int(template_id)
     order_id = int(order_id)
 
-    templates = db_client.select('templates', {'id': template_id})
-    orders = db_client.select('orders', {'id': order_id})
+    templates = await async_db_client.select('templates', {'id': template_id})
+    orders = await async_db_client.select('orders', {'id': order_id})
     
     template = templates[0] if templates else None
     order = orders[0] if orders else None
@@ -58,30 +57,28 @@ async def send_template(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     msg: Message = context.user_data["dealing_template_data"]["start_msg"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
+    # Pool of connected worker accounts (funcs/worker_client.py) - no connect/handshake per message
+    from funcs.worker_client import worker_pool, NoWorkerSession, WorkersThrottled
     
     # Get fresh data from Supabase
-    orders = db_client.select('orders', {'id': order['id']})
-    templates = db_client.select('templates', {'id': template['id']})
-    tgsessions_list = db_client.select('tgsessions', {'is_worker': True})
-
-    if not tgsessions_list:
-        await msg.reply_text(t('no_worker_account', lang))
-        return ConversationHandler.END
-
-    tgsession = tgsessions_list[0]
+    orders, templates = await asyncio.gather(
+        async_db_client.select('orders', {'id': order['id']}),
+        async_db_client.select('templates', {'id': template['id']}),
+    )
     
     # Get fresh data
     order = orders[0] if orders else order
     template = templates[0] if templates else template
 
     try:
-        client = Client(name='default', api_id=tgsession['api_id'], api_hash=tgsession['api_hash'], session_string=tgsession['string'])
-
-        async with client:
-            await client.send_message(order['client_username'], template['text'])
+        await worker_pool.send_message(order['client_username'], template['text'])
 
         await msg.reply_text(t('template_sent', lang).format(template['id'], template['name']))
+    except NoWorkerSession:
+        await msg.reply_text(t('no_worker_account', lang))
+    except WorkersThrottled as e:
+        await msg.reply_text(t('workers_throttled', lang).format(int(e.seconds)))
     except Exception as e:
         await update.effective_message.reply_text(t('send_message_error', lang).format(repr(e)))
     finally:
@@ -96,9 +93,9 @@ async def delete_template(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     template = context.user_data["dealing_template_data"]["template"]
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
-    db_client.delete('templates', {'id': template['id']})
+    await async_db_client.delete('templates', {'id': template['id']})
 
     msg: Message = context.user_data["dealing_template_data"]["start_msg"]
 
@@ -134,11 +131,11 @@ async def editing_template_name_end(update: Update, context: ContextTypes.DEFAUL
     context.user_data["dealing_template_data"]["name"] = name
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     template = context.user_data["dealing_template_data"]["template"]
     
-    db_client.update('templates', {'name': name}, {'id': template['id']})
+    await async_db_client.update('templates', {'name': name}, {'id': template['id']})
     
     # Update in context
     template['name'] = name
@@ -170,11 +167,11 @@ async def editing_template_text_end(update: Update, context: ContextTypes.DEFAUL
     context.user_data["dealing_template_data"]["text"] = text
 
     # Using Supabase only
-    from db.db import db_client
+    from db.db import async_db_client
     
     template = context.user_data["dealing_template_data"]["template"]
     
-    db_client.update('templates', {'text': text}, {'id': template['id']})
+    await async_db_client.update('templates', {'text': text}, {'id': template['id']})
     
     # Update in context
     template['text'] = text
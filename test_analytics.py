@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-analytics (funcs/analytics.py) - pandas על נתונים בזיכרון
+לא דורש חיבור ל-Supabase
+"""
+
+import datetime
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from funcs import analytics
+from funcs.report_engine import build_report_set
+
+
+def make_order(order_id, client, delivered, products):
+    return {'id': order_id, 'client_name': client, 'client_username': f'@{client}', 'client_phone': '972',
+            'delivered': delivered, 'products': json.dumps(products)}
+
+
+ORDERS = [
+    make_order(1, 'dan', '2025-04-13T10:00:00', [{'name': 'Blue', 'quantity': 2, 'total_price': 200}]),
+    make_order(2, 'dan', '2025-04-14T11:00:00', [{'name': 'Blue', 'quantity': 1, 'total_price': 100},
+                                                 {'name': 'Red', 'quantity': 3, 'total_price': 450}]),
+    make_order(3, 'eli', '2025-04-14T12:30:00', [{'name': 'Red', 'quantity': 1, 'total_price': 150}]),
+    make_order(4, 'eli', None, [{'name': 'Red', 'quantity': 9, 'total_price': 900}]),  # בלי delivered
+    {**make_order(5, 'eli', '2025-04-15T09:00:00', []), 'products': 'not json'},
+]
+
+
+def test_frames_types():
+    """delivered כ-datetime64, name כ-category, שורה לכל מוצר"""
+    print("🧪 בדיקת frames")
+    orders, lines = analytics.orders_frame(ORDERS)
+    assert len(orders) == 4
+    assert str(orders['delivered'].dtype).startswith('datetime64')
+    assert str(lines['name'].dtype) == 'category'
+    assert len(lines) == 4
+    assert dict(zip(orders['id'], orders['total'])) == {1: 200, 2: 550, 3: 150, 5: 0}
+
+
+def test_reports_match_loop_engine():
+    """אותם דוחות כמו build_report_set של report_engine (מסלול ה-7 ימים)"""
+    print("🧪 בדיקת דוחות וקטוריים")
+    orders, lines = analytics.orders_frame(ORDERS)
+    report_set = analytics.build_report_set(datetime.datetime(2025, 4, 1), orders, lines, top_n=2)
+
+    assert report_set.products == {'Red': 4, 'Blue': 3}
+    assert report_set.clients == [('dan', '@dan', '972', 2), ('eli', '@eli', '972', 2)]
+    assert dict(report_set.weekdays) == {'Monday': 2, 'Sunday': 1, 'Tuesday': 1}
+
+    loop_set = build_report_set(datetime.datetime(2025, 4, 1), ORDERS, [], [], [], top_n=2)
+    assert report_set.top_orders == loop_set.top_orders
+    assert report_set.top_orders[0].delivered == datetime.datetime(2025, 4, 14, 11, 0)
+
+
+def test_profit_report():
+    """סיכום כספי לטווח"""
+    print("🧪 בדיקת דוח רווח")
+    orders, lines = analytics.orders_frame(ORDERS)
+    shifts = analytics.shifts_frame([
+        {'closed_time': '2025-04-13T23:00:00', 'brutto': 1000, 'netto': 700, 'operator_paid': 100, 'runner_paid': 100, 'petrol_paid': 100},
+        {'closed_time': '2025-04-14T23:00:00', 'brutto': 2000, 'netto': 1500, 'operator_paid': 200, 'runner_paid': None, 'petrol_paid': 300},
+    ])
+    profit = analytics.profit_report(shifts, orders, lines)
+    assert profit['shifts'] == 2 and profit['days'] == 2 and profit['orders'] == 4
+    assert profit['brutto'] == 3000 and profit['runner_paid'] == 100
+    assert list(profit['products']) == ['Red', 'Blue']
+    assert profit['products']['Red'] == {'quantity': 4, 'total_price': 600}
+
+
+def test_empty_window():
+    """חלון ריק לא נופל"""
+    orders, lines = analytics.orders_frame([])
+    report_set = analytics.build_report_set(datetime.datetime(2025, 4, 1), orders, lines)
+    assert report_set.products == {} and report_set.clients == [] and report_set.top_orders == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
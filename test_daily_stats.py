@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+טסטים לבניית שורות daily_stats (db/daily_stats.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import json
+
+import pytest
+
+from db.daily_stats import order_stat_rows, shift_stat_rows, merge_stat_rows, negate_stat_rows, sum_by_key, parse_client_key
+
+
+ORDER = {
+    'id': 7,
+    'delivered': '2025-04-13T22:15:00',
+    'client_name': 'Dan', 'client_username': '@dan', 'client_phone': '972500000000',
+    'products': json.dumps([
+        {'name': 'Blue', 'quantity': 2, 'total_price': 200},
+        {'name': 'Red', 'quantity': 1, 'total_price': 150},
+    ]),
+}
+
+
+def test_order_rows():
+    """הזמנה -> total + client + שורה לכל מוצר, לפי יום ה-delivered"""
+    print("🧪 בדיקת שורות להזמנה")
+    rows = order_stat_rows(ORDER)
+    assert rows[0] == {'day': '2025-04-13', 'dimension': 'total', 'key': '', 'orders': 1, 'revenue': 350}
+    assert parse_client_key(rows[1]['key']) == ('Dan', '@dan', '972500000000')
+    assert [(r['key'], r['quantity'], r['revenue']) for r in rows[2:]] == [('Blue', 2, 200), ('Red', 1, 150)]
+    # הזמנה בלי delivered / products לא תקין
+    assert order_stat_rows({'delivered': None}) == []
+    assert len(order_stat_rows({**ORDER, 'products': 'not json'})) == 2
+
+
+def test_shift_rows():
+    """משמרת -> total עם הכספים + shift_product מתוך summary"""
+    print("🧪 בדיקת שורות למשמרת")
+    shift = {
+        'closed_time': '2025-04-13T23:59:00', 'brutto': 4800, 'netto': 3800,
+        'operator_paid': 500, 'runner_paid': 300, 'petrol_paid': 200,
+        'summary': json.dumps({'Blue': {'total_quantity': 10, 'total_price': 1000}}),
+    }
+    total, product = shift_stat_rows(shift)
+    assert total['shifts'] == 1 and total['brutto'] == 4800 and total['petrol_paid'] == 200
+    assert product == {'day': '2025-04-13', 'dimension': 'shift_product', 'key': 'Blue', 'quantity': 10, 'revenue': 1000}
+    assert len(shift_stat_rows({**shift, 'summary': ''})) == 1
+
+
+def test_merge_and_sum():
+    """backfill מאחד שורות זהות; הדוחות סוכמים לפי key על פני ימים"""
+    print("🧪 בדיקת איחוד וסכום")
+    rows = order_stat_rows(ORDER) + order_stat_rows({**ORDER, 'delivered': '2025-04-14T10:00:00'}) + order_stat_rows(ORDER)
+    merged = merge_stat_rows(rows)
+    total_13 = next(r for r in merged if r['dimension'] == 'total' and r['day'] == '2025-04-13')
+    assert total_13['orders'] == 2 and total_13['revenue'] == 700
+    products = [r for r in merged if r['dimension'] == 'product']
+    assert sum_by_key(products, 'quantity') == {'Blue': 6, 'Red': 3}
+    # numeric מ-PostgREST יכול לחזור כ-float
+    assert sum_by_key([{'key': 'Blue', 'quantity': 2.0}, {'key': 'Blue', 'quantity': '3'}], 'quantity') == {'Blue': 5}
+
+
+def test_negated_rows_cancel_erased_orders():
+    """הזמנות שנמחקו יורדות מה-rollup: השורות השליליות מאפסות את המונים של אותו יום"""
+    rows = merge_stat_rows(order_stat_rows(ORDER) * 2)
+    negated = negate_stat_rows(rows)
+    assert [(r['dimension'], r['day'], r['key']) for r in negated] == [(r['dimension'], r['day'], r['key']) for r in rows]
+    for row in merge_stat_rows(rows + negated):
+        assert all(not row.get(field) for field in ('orders', 'quantity', 'revenue'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+טסטים לייצוא ה-streaming (db/dump.py)
+iter_rows מזויף בזיכרון - בלי חיבור ל-Supabase
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from db.dump import dump_to_file
+
+
+TABLES = {
+    'users': [{'user_id': 1, 'username': '@dan', 'lang': 'he'}, {'user_id': 2, 'username': '@eli', 'lang': 'ru'}],
+    'products': [],
+    'orders': [{'id': i, 'client_name': f'c{i}', 'products': [{'name': 'Blue', 'quantity': 1}]} for i in range(2500)],
+}
+
+
+def fake_iter_rows(fail_after=None):
+    def iter_rows(table):
+        async def rows():
+            for index, row in enumerate(TABLES[table]):
+                if fail_after is not None and table == 'orders' and index == fail_after:
+                    raise RuntimeError("connection reset")
+                await asyncio.sleep(0)
+                yield row
+        return rows()
+    return iter_rows
+
+
+def dump(format, **kwargs):
+    async def scenario():
+        file, filename = await dump_to_file(list(TABLES), fake_iter_rows(**kwargs), format)
+        with file:
+            return file.read(), filename
+    return asyncio.run(scenario())
+
+
+def test_json_dump_is_valid_and_skips_empty_tables():
+    """JSON תקין, טבלה ריקה לא נכתבת"""
+    print("🧪 בדיקת ייצוא JSON")
+    data, filename = dump('json')
+    assert filename.endswith('.json')
+    parsed = json.loads(data)
+    assert list(parsed) == ['users', 'orders']
+    assert len(parsed['orders']) == 2500
+    assert parsed['users'][0] == TABLES['users'][0]
+
+
+def test_json_stays_valid_after_table_failure():
+    """שגיאה באמצע טבלה - הקובץ עדיין JSON תקין עם מה שנקרא"""
+    print("🧪 בדיקת כשל באמצע טבלה")
+    data, _ = dump('json', fail_after=10)
+    assert len(json.loads(data)['orders']) == 10
+
+
+def test_ndjson_gzip_dump():
+    """שורה לכל רשומה, דחוס"""
+    print("🧪 בדיקת NDJSON.gz")
+    data, filename = dump('ndjson_gz')
+    assert filename.endswith('.ndjson.gz')
+    lines = gzip.decompress(data).decode('utf-8').splitlines()
+    assert len(lines) == 2502
+    assert json.loads(lines[0]) == {'table': 'users', 'row': TABLES['users'][0]}
+
+
+def test_xlsx_write_only_dump():
+    """גיליון לכל טבלה עם שורות, כותרות מהשורה הראשונה"""
+    print("🧪 בדיקת XLSX")
+    openpyxl = pytest.importorskip("openpyxl")
+    import io
+    data, filename = dump('xlsx')
+    assert filename.endswith('.xlsx')
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+    assert workbook.sheetnames == ['users', 'orders']
+    rows = list(workbook['orders'].iter_rows(values_only=True))
+    assert rows[0] == ('id', 'client_name', 'products')
+    assert len(rows) == 2501
+    assert json.loads(rows[1][2]) == [{'name': 'Blue', 'quantity': 1}]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        asyncio.run(dump_to_file(['users'], fake_iter_rows(), 'csv'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
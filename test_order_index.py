@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+טסטים לאינדקס חיפוש ההזמנות (db/order_index.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import asyncio
+import datetime
+import json
+
+import pytest
+
+from db.order_index import OrderIndex
+
+
+class FakeAsyncClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.scans = 0
+
+    async def iter_rows(self, table, filters=None, page_size=1000, columns=None, key='id'):
+        assert table == 'orders'
+        self.scans += 1
+        for row in self.rows:
+            yield row
+
+
+def make_order(order_id, username, phone, products, status='active', created='2025-04-13T10:00:00'):
+    return {'id': order_id, 'client_username': username, 'client_phone': phone, 'status': status,
+            'created': created, 'products': json.dumps([{'name': name, 'quantity': 1} for name in products])}
+
+
+@pytest.fixture
+def index():
+    rows = [
+        make_order(1, '@Dan', '+972-50-1', ['Blue', 'Red'], created='2025-04-10T09:00:00'),
+        make_order(2, '@dan', '972501', ['Red'], status='completed', created='2025-04-12T09:00:00'),
+        make_order(3, '@eli', '972502', ['Green'], created='2025-04-14T09:00:00'),
+        {'id': 4, 'client_username': '@x', 'products': '{bad', 'created': None},
+    ]
+    return OrderIndex(FakeAsyncClient(rows))
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+def test_search_by_client_product_status(index):
+    """username בלי תלות ב-@ / אותיות, טלפון לפי ספרות, מוצרים, סטטוס - סריקה אחת"""
+    print("🧪 בדיקת OrderIndex")
+    async def run():
+        assert ids(await index.search_client('dan')) == [1, 2]
+        assert ids(await index.search_client('972501')) == [1, 2]
+        assert ids(await index.search_products(['red', 'Green'])) == [1, 2, 3]
+        assert ids(await index.search_status('completed')) == [2]
+        assert ids(await index.search_created(datetime.datetime(2025, 4, 11), datetime.datetime(2025, 4, 14, 9))) == [2, 3]
+    asyncio.run(run())
+    assert index.async_db_client.scans == 1
+
+
+def test_write_through(index):
+    """upsert מתמזג ומעדכן את ה-posting lists; remove_created_before לפי אינדקס התאריכים"""
+    async def run():
+        await index.ensure_loaded_async()
+        index.upsert({'id': 3, 'status': 'completed'})
+        index.upsert(make_order(5, '@new', '1', ['Blue'], created='2025-04-15T09:00:00'))
+        assert ids(await index.search_status('completed')) == [2, 3]
+        assert ids(await index.search_status('active')) == [1, 5]
+        assert ids(await index.search_products(['Blue'])) == [1, 5]
+
+        assert index.remove_created_before(datetime.datetime(2025, 4, 13)) == 2
+        assert ids(await index.search_client('dan')) == []
+        assert ids(await index.search_created(datetime.datetime(2025, 1, 1), datetime.datetime(2026, 1, 1))) == [3, 5]
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+טסטים לשורות המוצר של הזמנה (db/order_items.py)
+"""
+
+import pytest
+
+from db.order_items import order_items, stock_quantities, validate_order_items
+
+
+def test_order_items_reads_jsonb_and_legacy_strings():
+    """רשימה (jsonb) חוזרת בלי פענוח; מחרוזת JSON ישנה מפוענחת; ערך לא תקין -> []"""
+    print("🧪 בדיקת order_items")
+    items = [{'name': 'Blue', 'quantity': 2, 'total_price': 100}, 'junk']
+    assert order_items(items) == [items[0]]
+    assert order_items('[{"name": "Blue", "quantity": 2}]') == [{'name': 'Blue', 'quantity': 2}]
+    assert order_items('{bad') == []
+    assert order_items(None) == []
+
+
+def test_validate_order_items():
+    """מספרים מנורמלים, product_id מהקטלוג; שורה לא תקינה -> ValueError"""
+    items = validate_order_items([{'name': 'Blue', 'quantity': '2', 'total_price': 100.0, 'unit_price': 50}],
+                                 {'Blue': 3}.get)
+    assert items == [{'name': 'Blue', 'quantity': 2, 'total_price': 100, 'unit_price': 50, 'product_id': 3}]
+
+    for bad in ([], [{'quantity': 1}], [{'name': 'Blue', 'quantity': 'x'}], [{'name': 'Blue', 'quantity': 0}],
+                [{'name': 'Blue', 'quantity': 1, 'total_price': -5}]):
+        with pytest.raises(ValueError):
+            validate_order_items(bad)
+
+
+def test_stock_quantities_by_stored_product_id():
+    """המלאי יורד לפי product_id השמור (גם אם המוצר שונה שם); שורות ישנות בלי id מוחזרות בנפרד"""
+    quantities, missing = stock_quantities([
+        {'product_id': 3, 'name': 'Blue', 'quantity': 2},
+        {'product_id': 3, 'name': 'Blue (old name)', 'quantity': 1},
+        {'product_id': 5, 'name': 'Red', 'quantity': 1},
+        {'product_id': None, 'name': 'Legacy', 'quantity': 4},
+    ])
+    assert quantities == {3: 3, 5: 1} and missing == ['Legacy']
+
+    with pytest.raises(ValueError):
+        stock_quantities([{'product_id': 3, 'name': 'Blue', 'quantity': 'x'}])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
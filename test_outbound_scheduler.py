@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+טסטים לתזמון ההודעות היוצאות (funcs/outbound_scheduler.py)
+לא דורש חיבור לטלגרם - ה-callback הוא פונקציה מקומית
+"""
+
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+from funcs.outbound_scheduler import COURIER_LANE, OutboundScheduler, TokenBucket
+
+
+def make_callback(log, failures=None):
+    failures = failures if failures is not None else {}
+
+    async def callback(endpoint, data):
+        error = failures.get(data['text'])
+        if error:
+            del failures[data['text']]
+            raise error
+        log.append((endpoint, data['chat_id'], data['text'], time.monotonic()))
+        return data['text']
+
+    return callback
+
+
+async def request(scheduler, callback, endpoint, chat_id, text, message_id=None, rate_limit_args=None):
+    data = {'chat_id': chat_id, 'text': text}
+    if message_id is not None:
+        data['message_id'] = message_id
+    return await scheduler.process_request(callback, (endpoint, data), {}, endpoint, data, rate_limit_args)
+
+
+def test_token_bucket():
+    """burst מיידי, ואחריו המתנה לפי הקצב"""
+    print("🧪 בדיקת TokenBucket")
+    bucket = TokenBucket(rate=20, per=60)
+    now = bucket.updated
+    for _ in range(20):
+        assert bucket.delay(now) == 0
+        bucket.consume()
+    assert abs(bucket.delay(now) - 3.0) < 0.01
+    bucket.pause(now, 10)
+    assert bucket.delay(now) == 10
+
+
+def test_burst_is_queued_not_dropped():
+    """מעל המגבלה של הצ'אט ההודעות מחכות - כולן נשלחות, לפי הסדר"""
+    log = []
+    scheduler = OutboundScheduler(global_per_second=1000, private_per_second=20, private_burst=2)
+
+    async def run():
+        callback = make_callback(log)
+        results = await asyncio.gather(*(request(scheduler, callback, 'sendMessage', 5, f'm{i}') for i in range(6)))
+        await scheduler.shutdown()
+        return results
+
+    assert asyncio.run(run()) == [f'm{i}' for i in range(6)]
+    assert [text for _, _, text, _ in log] == [f'm{i}' for i in range(6)]
+    # 2 מיד (burst), 4 אחרי זה בקצב 20 בשנייה
+    assert log[-1][3] - log[0][3] >= 0.15
+    assert scheduler.stats['delayed'] >= 3
+
+
+def test_courier_lane_goes_first():
+    """כשהבאקט הגלובלי מלא - הודעת שליחים עוקפת את מה שמחכה בתור"""
+    log = []
+    scheduler = OutboundScheduler(global_per_second=20, group_per_minute=6000)
+    scheduler._global.tokens = 0
+
+    async def run():
+        callback = make_callback(log)
+        normal = [asyncio.create_task(request(scheduler, callback, 'sendMessage', -100, f'report{i}')) for i in range(3)]
+        await asyncio.sleep(0)
+        courier = asyncio.create_task(request(scheduler, callback, 'sendMessage', -200, 'courier',
+                                              rate_limit_args=COURIER_LANE))
+        await asyncio.gather(*normal, courier)
+        await scheduler.shutdown()
+
+    asyncio.run(run())
+    assert log[0][2] == 'courier'
+
+
+def test_retry_after_requeues_message():
+    """RetryAfter -> הצ'אט מושהה וההודעה נשלחת שוב, בלי שגיאה לקורא"""
+    log = []
+    scheduler = OutboundScheduler(global_per_second=1000, private_per_second=1000)
+
+    async def run():
+        callback = make_callback(log, {'hello': RetryAfter(0)})
+        result = await request(scheduler, callback, 'sendMessage', 7, 'hello')
+        await scheduler.shutdown()
+        return result
+
+    assert asyncio.run(run()) == 'hello'
+    assert [text for _, _, text, _ in log] == ['hello']
+    assert scheduler.stats['retried'] == 1
+
+
+def test_edits_of_same_message_are_coalesced():
+    """עריכות שמחכות לאותה הודעה - נשלחת רק האחרונה, וכל הקוראים מקבלים את התוצאה"""
+    log = []
+    scheduler = OutboundScheduler(global_per_second=1000, private_per_second=20, private_burst=1)
+
+    async def run():
+        callback = make_callback(log)
+        await request(scheduler, callback, 'sendMessage', 9, 'first')
+        edits = [asyncio.create_task(request(scheduler, callback, 'editMessageText', 9, f'edit{i}', message_id=1))
+                 for i in range(4)]
+        results = await asyncio.gather(*edits)
+        await scheduler.shutdown()
+        return results
+
+    assert asyncio.run(run()) == ['edit3'] * 4
+    assert [text for _, _, text, _ in log] == ['first', 'edit3']
+    assert scheduler.stats['coalesced'] == 3
+
+
+def test_unlimited_endpoints_skip_the_queue():
+    """answerCallbackQuery לא מחכה גם כשהכל חסום"""
+    log = []
+    scheduler = OutboundScheduler()
+    scheduler._global.pause(time.monotonic(), 60)
+
+    async def run():
+        result = await asyncio.wait_for(request(scheduler, make_callback(log), 'answerCallbackQuery', 1, 'ok'), 1)
+        await scheduler.shutdown()
+        return result
+
+    assert asyncio.run(run()) == 'ok'
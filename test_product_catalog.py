@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-ProductCatalog (db/product_catalog.py)
+client מזויף בזיכרון - בלי חיבור ל-Supabase
+"""
+
+import asyncio
+
+import pytest
+
+from db.product_catalog import ProductCatalog
+
+
+class FakeProductsClient:
+    """מחקה את iter_rows של SupabaseClient עבור products בלבד"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.iter_calls = 0
+
+    def iter_rows(self, table, filters=None):
+        self.iter_calls += 1
+        yield from [dict(r) for r in self.rows]
+
+
+class FakeAsyncProductsClient(FakeProductsClient):
+    async def iter_rows(self, table, filters=None):
+        self.iter_calls += 1
+        for row in [dict(r) for r in self.rows]:
+            yield row
+
+
+ROWS = [
+    {'id': 1, 'name': 'Blue', 'stock': 10, 'price': 100, 'crude': 0},
+    {'id': 2, 'name': 'Red', 'stock': 3, 'price': 150, 'crude': 5},
+]
+
+
+def test_lookups_by_id_and_name_from_one_load():
+    """טעינה אחת, ואז חיפוש לפי id ולפי name מהזיכרון"""
+    print("🧪 בדיקת חיפוש לפי id / name")
+    client = FakeProductsClient(ROWS)
+    catalog = ProductCatalog(client, None, ttl=60)
+    assert [p['name'] for p in catalog.all()] == ['Blue', 'Red']
+    assert catalog.get(2)['stock'] == 3
+    assert catalog.get_by_name('Blue')['id'] == 1
+    assert catalog.get(99) is None
+    assert client.iter_calls == 1
+
+
+def test_writes_update_indexes_and_version():
+    """apply_write / remove מעדכנים את שני האינדקסים ומעלים את version"""
+    print("🧪 בדיקת write-through")
+    catalog = ProductCatalog(FakeProductsClient(ROWS), None, ttl=60)
+    catalog.load()
+    version = catalog.version
+
+    catalog.apply_write({'id': 1, 'name': 'Navy'})
+    assert catalog.get_by_name('Blue') is None
+    assert catalog.get_by_name('Navy')['stock'] == 10
+    catalog.apply_write({'id': 3, 'name': 'Green', 'stock': 7})
+    catalog.remove(2)
+    assert [p['name'] for p in catalog.all()] == ['Navy', 'Green']
+    assert catalog.version == version + 3
+
+    # עותקים - שינוי של התוצאה לא משנה את הקטלוג
+    catalog.get(1)['stock'] = 0
+    assert catalog.get(1)['stock'] == 10
+
+
+def test_invalidate_reloads_async():
+    """invalidate (למשל אחרי complete_order_with_stock) -> טעינה מחדש בקריאה הבאה"""
+    print("🧪 בדיקת invalidate")
+    client = FakeAsyncProductsClient([dict(r) for r in ROWS])
+    catalog = ProductCatalog(None, client, ttl=60)
+
+    async def scenario():
+        assert (await catalog.get_async(1))['stock'] == 10
+        client.rows[0]['stock'] = 8
+        assert (await catalog.get_async(1))['stock'] == 10
+        catalog.invalidate()
+        assert (await catalog.get_by_name_async('Blue'))['stock'] == 8
+        assert client.iter_calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_sync_access_in_event_loop_does_not_block():
+    """all / get בתוך ה-loop: ה-snapshot הישן מוגש מיד, הטעינה רצה ברקע (לא ב-client הסינכרוני)"""
+    sync_client = FakeProductsClient(ROWS)
+    client = FakeAsyncProductsClient([dict(r) for r in ROWS])
+    catalog = ProductCatalog(sync_client, client, ttl=60)
+
+    async def scenario():
+        await catalog.load_async()
+        client.rows[0]['stock'] = 8
+        catalog.invalidate()
+        assert catalog.get(1)['stock'] == 10
+        assert catalog.get_by_name('Blue')['stock'] == 10
+        await asyncio.sleep(0)
+        assert catalog.get(1)['stock'] == 8
+        assert client.iter_calls == 2
+
+    asyncio.run(scenario())
+    assert sync_client.iter_calls == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+טסטים לדירוג top-N (funcs/ranking.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import json
+import random
+
+import pytest
+
+from funcs.ranking import TopN, top_clients, top_orders
+from funcs.report_engine import ReportOrder
+
+
+def make_order(order_id, total, quantity=1, client='c'):
+    return {'id': order_id, 'client_name': client, 'client_username': '@' + client, 'client_phone': '972',
+            'delivered': '2025-04-13T10:00:00',
+            'products': json.dumps([{'name': 'Blue', 'quantity': quantity, 'total_price': total}])}
+
+
+def test_top_n_matches_full_sort():
+    """אותה תוצאה כמו sorted(reverse=True)[:n], כולל שוויונות"""
+    print("🧪 בדיקת TopN")
+    scores = [random.Random(7).randint(0, 20) for _ in range(200)]
+    top = TopN(10)
+    for index, score in enumerate(scores):
+        top.push(score, index)
+    expected = [index for index, _ in sorted(enumerate(scores), key=lambda item: item[1], reverse=True)[:10]]
+    assert top.items() == expected
+    assert len(top) == 10
+
+
+def test_top_orders_by_key():
+    """total / quantity; שורות לא תקינות מדולגות; מפתח לא מוכר -> ValueError"""
+    rows = [make_order(1, 100, 5), make_order(2, 300, 1), make_order(3, 200, 2), {'id': 4, 'delivered': None}]
+    assert [order.id for order in top_orders(rows, 2)] == [2, 3]
+    assert [order.id for order in top_orders(iter(rows), 2, key='quantity')] == [1, 3]
+    with pytest.raises(ValueError):
+        top_orders(rows, 2, key='username')
+
+
+def test_top_clients_by_lifetime_value():
+    orders = [ReportOrder.from_row(row) for row in
+              (make_order(1, 100, client='a'), make_order(2, 150, client='b'), make_order(3, 100, client='a'))]
+    ranked = top_clients(orders, 1)
+    assert [(client.client_name, client.orders, client.total) for client in ranked] == [('a', 2, 200)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-records של db/db.py (Order / Shift / Product / User)
+from_row לא פונה ל-Supabase
+"""
+
+import datetime
+
+import pytest
+
+from db.db import Order, Product, Shift, User
+
+
+def test_order_from_row_parses_once():
+    """products כרשימה, created כ-datetime, עמודות לא מוכרות ב-extra"""
+    print("🧪 בדיקת Order.from_row")
+    order = Order.from_row({'id': 7, 'client_address': 'Herzl 1', 'status': 'active', 'notes': 'ring twice',
+                            'created': '2025-04-13T10:00:00',
+                            'products': '[{"name": "Blue", "quantity": 2, "total_price": 100}]'})
+    assert order.get_products() == [{'name': 'Blue', 'quantity': 2, 'total_price': 100}]
+    assert order.created == datetime.datetime(2025, 4, 13, 10, 0)
+    assert order.address == 'Herzl 1'
+    assert order.total == 100
+    assert order.notes == 'ring twice'
+    assert order.to_dict()['created'] == '2025-04-13T10:00:00'
+    with pytest.raises(AttributeError):
+        order.missing_column
+
+    preview = Order.from_row({'id': None, 'address': 'Draft 2', 'products': '{bad', 'total_order_price': 0})
+    assert preview.address == 'Draft 2' and preview.get_products() == []
+
+
+def test_shift_and_slots():
+    """Shift נבנה גם שדה-שדה (send_shift_start_msg); __slots__ - אין __dict__"""
+    shift = Shift.from_row({'id': 1, 'opened_time': '2025-04-13T08:00:00', 'summary': '{"Blue": {"total_quantity": 3}}',
+                            'products_start': '[{"name": "Blue", "stock": 5}]'})
+    assert shift.opened_time == datetime.datetime(2025, 4, 13, 8, 0)
+    assert shift.summary == {'Blue': {'total_quantity': 3}}
+    assert shift.get_products() == [{'name': 'Blue', 'stock': 5}]
+
+    draft = Shift()
+    draft.products_start = '[{"name": "Red", "stock": 1}]'
+    assert draft.get_products() == [{'name': 'Red', 'stock': 1}]
+    assert not hasattr(draft, '__dict__')
+
+    assert Product.from_row({'id': 1, 'name': 'Blue', 'stock': 4}).stock == 4
+    assert User.from_row({'user_id': 5, 'role': 'admin'}).role == 'admin'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+טסטים למנוע הדוחות (funcs/report_engine.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import asyncio
+import datetime
+import json
+
+import pytest
+
+from funcs.report_engine import ReportEngine, ReportOrder, ReportSet, build_report_set
+
+
+def make_order(order_id, total, delivered='2025-04-13T10:00:00'):
+    return {'id': order_id, 'client_name': f'c{order_id}', 'client_username': '@c', 'client_phone': '972',
+            'delivered': delivered, 'products': json.dumps([{'name': 'Blue', 'quantity': 1, 'total_price': total}])}
+
+
+def test_build_report_set_in_one_pass():
+    """כל ארבעת הדוחות מאותם נתונים; top_orders לפי total"""
+    print("🧪 בדיקת build_report_set")
+    orders = [make_order(1, 100), make_order(2, 300), make_order(3, 200), {'id': 4, 'delivered': None}]
+    product_rows = [{'key': 'Blue', 'quantity': 2}, {'key': 'Blue', 'quantity': 1.0}, {'key': 'Red', 'quantity': 4}]
+    client_rows = [{'key': '["Dan","@dan","972"]', 'orders': 2}]
+    total_rows = [{'day': '2025-04-13', 'orders': 3}, {'day': '2025-04-14', 'orders': 5}, {'day': '2025-04-15', 'orders': 0}]
+
+    report_set = build_report_set(datetime.datetime(2025, 4, 10), orders, product_rows, client_rows, total_rows, top_n=2)
+    assert report_set.products == {'Blue': 3, 'Red': 4}
+    assert report_set.clients == [('Dan', '@dan', '972', 2)]
+    assert [order.id for order in report_set.top_orders] == [2, 3]
+    assert report_set.top_orders[0].delivered == datetime.datetime(2025, 4, 13, 10, 0)
+    assert report_set.weekdays == [('Monday', 5), ('Sunday', 3)]
+
+
+def test_invalid_orders_are_skipped():
+    """delivered / products לא תקינים -> None"""
+    assert ReportOrder.from_row({'id': 1, 'delivered': 'bad', 'products': '[]'}) is None
+    assert ReportOrder.from_row({'id': 1, 'delivered': '2025-04-13T10:00:00', 'products': '{bad'}) is None
+
+
+def test_engine_loads_once_per_ttl():
+    """ארבע קריאות במקביל -> טעינה אחת; invalidate -> טעינה חדשה"""
+    print("🧪 בדיקת TTL של מנוע הדוחות")
+    engine = ReportEngine(ttl=60)
+    loads = []
+
+    async def fake_load(since):
+        loads.append(since)
+        await asyncio.sleep(0.01)
+        return ReportSet(since=since)
+
+    engine._load = fake_load
+
+    async def scenario():
+        sets = await asyncio.gather(*[engine.get() for _ in range(4)])
+        assert len({id(s) for s in sets}) == 1
+        engine.invalidate()
+        await engine.get()
+
+    asyncio.run(scenario())
+    assert len(loads) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
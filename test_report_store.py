@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+טסטים לדוחות המחושבים מראש (funcs/report_store.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import asyncio
+import datetime
+
+from funcs import report_store
+from funcs.report_store import PrecomputedReports, REPORT_LANGS, REPORT_NAMES
+
+
+def fake_renderer(calls):
+    async def render(name, lang):
+        calls.append((name, lang))
+        return f"{name}:{lang}:{len(calls)}"
+    return render
+
+
+def test_refresh_then_get_is_served_from_store(monkeypatch):
+    """refresh מחשב הכל; get מחזיר את השמור בלי לחשב שוב"""
+    print("🧪 בדיקת PrecomputedReports")
+    calls = []
+    monkeypatch.setattr(report_store, 'render_report', fake_renderer(calls))
+    store = PrecomputedReports()
+
+    asyncio.run(store.refresh())
+    assert len(calls) == len(REPORT_NAMES) * len(REPORT_LANGS)
+
+    report, computed_at = asyncio.run(store.get('week', 'he'))
+    assert report.startswith('week:he:')
+    assert isinstance(computed_at, datetime.datetime)
+    assert len(calls) == len(REPORT_NAMES) * len(REPORT_LANGS)
+
+
+def test_force_and_stale_day_recompute(monkeypatch):
+    """force מחשב מחדש; דוח "היום" מאתמול לא מוגש"""
+    calls = []
+    monkeypatch.setattr(report_store, 'render_report', fake_renderer(calls))
+    store = PrecomputedReports()
+
+    first, _ = asyncio.run(store.get('profit_today', 'ru'))
+    forced, _ = asyncio.run(store.get('profit_today', 'ru', force=True))
+    assert first != forced
+
+    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+    store._reports[('profit_today', 'ru')] = ('old', yesterday)
+    store._reports[('week', 'ru')] = ('week-old', yesterday)
+    assert asyncio.run(store.get('profit_today', 'ru'))[0] != 'old'
+    assert asyncio.run(store.get('week', 'ru'))[0] == 'week-old'
+
+
+def test_refresh_survives_failures(monkeypatch):
+    """דוח שנכשל לא מפיל את השאר"""
+    async def render(name, lang):
+        if name == 'week':
+            raise RuntimeError('db down')
+        return name
+
+    monkeypatch.setattr(report_store, 'render_report', render)
+    store = PrecomputedReports()
+    asyncio.run(store.refresh())
+    assert ('week', 'ru') not in store._reports
+    assert store._reports[('profit_today', 'ru')][0] == 'profit_today'
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
+
+
+def test_week_report_refresh_button_reaches_handler(monkeypatch):
+    """כפתור הרענון של הדוח השבועי עובר דרך ה-pattern של bot.py ומגיע ל-get עם force=True"""
+    from types import SimpleNamespace
+    from telegram import Update
+    from telegram.ext import CallbackQueryHandler
+    from funcs import bot_funcs
+
+    gets, sent = [], []
+
+    async def fake_get(name, lang, force=False):
+        gets.append((name, lang, force))
+        return "report", datetime.datetime(2025, 4, 13, 10, 0)
+
+    async def fake_send(update, context, text, **kwargs):
+        sent.append(kwargs['reply_markup'])
+
+    async def fake_lang(user_id):
+        return 'ru'
+
+    monkeypatch.setattr(report_store.precomputed_reports, 'get', fake_get)
+    monkeypatch.setattr(bot_funcs, 'send_message_with_cleanup', fake_send)
+    monkeypatch.setattr(bot_funcs, 'get_user_lang_async', fake_lang)
+    handler = CallbackQueryHandler(bot_funcs.show_week_report, pattern=bot_funcs.WEEK_REPORT_CALLBACK)
+
+    async def press(data):
+        raw = {'update_id': 1, 'callback_query': {'id': '1', 'chat_instance': '1', 'data': data,
+                                                  'from': {'id': 5, 'is_bot': False, 'first_name': 'A'}}}
+        assert handler.check_update(Update.de_json(raw, None))
+
+        async def answer():
+            pass
+
+        fake_update = SimpleNamespace(callback_query=SimpleNamespace(data=data, answer=answer),
+                                      effective_user=SimpleNamespace(id=5))
+        await handler.callback(fake_update, None)
+        return sent[-1].inline_keyboard[0][0].callback_data
+
+    async def run():
+        refresh_data = await press(bot_funcs.WEEK_REPORT_CALLBACK)
+        await press(refresh_data)
+        return refresh_data
+
+    assert asyncio.run(run()) == 'week_report_refresh'
+    assert gets == [('week', 'ru', False), ('week', 'ru', True)]
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-single-flight של AsyncSupabaseClient.select
+בקשת ה-HTTP מוחלפת בפונקציה מקומית - בלי חיבור ל-Supabase
+"""
+
+import asyncio
+
+import pytest
+
+from db.supabase_client import AsyncSupabaseClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "test")
+    client = AsyncSupabaseClient()
+    client.requests = []
+
+    async def fake_select(table, params):
+        client.requests.append((table, params))
+        await asyncio.sleep(0.01)
+        return [{'id': 1, 'name': 'Blue', 'products': [{'name': 'Blue', 'quantity': 1}]}]
+
+    client._select = fake_select
+    return client
+
+
+def test_identical_concurrent_selects_share_one_request(client):
+    """10 קריאות זהות במקביל -> בקשה אחת, ועותק נפרד לכל קורא"""
+    print("🧪 בדיקת single-flight")
+
+    async def scenario():
+        return await asyncio.gather(*[client.select('products') for _ in range(10)])
+
+    results = asyncio.run(scenario())
+    assert len(client.requests) == 1
+    assert all(rows[0]['name'] == 'Blue' for rows in results)
+    results[0][0]['name'] = 'changed'
+    results[0][0]['products'][0]['quantity'] = 5
+    assert results[1][0]['name'] == 'Blue'
+    assert results[1][0]['products'][0]['quantity'] == 1
+    assert client.get_select_stats() == {'products': {'calls': 10, 'coalesced': 9}}
+
+
+def test_single_caller_gets_rows_without_copy(client):
+    """בלי קוראים נוספים - התוצאה מוחזרת כמו שהיא, בלי deepcopy"""
+    shared = []
+
+    async def fake_select(table, params):
+        shared.append([{'id': 1, 'products': [{'name': 'Blue'}]}])
+        return shared[-1]
+
+    client._select = fake_select
+    assert asyncio.run(client.select('orders')) is shared[0]
+
+
+def test_different_queries_are_not_coalesced(client):
+    """פילטרים / projection שונים -> בקשות נפרדות; קריאות עוקבות לא משתמשות בתוצאה ישנה"""
+    print("🧪 בדיקת מפתחות שונים")
+
+    async def scenario():
+        await asyncio.gather(
+            client.select('users', {'user_id': 1}),
+            client.select('users', {'user_id': 2}),
+            client.select('users', {'user_id': 1}, columns='lang'),
+        )
+        await client.select('users', {'user_id': 1})
+
+    asyncio.run(scenario())
+    assert len(client.requests) == 4
+    assert client.select_stats['users'] == {'calls': 4, 'coalesced': 0}
+    assert not client._inflight
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
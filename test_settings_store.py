@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-BotSettingsStore (db/settings_store.py)
+client מזויף בזיכרון - בלי חיבור ל-Supabase
+"""
+
+import asyncio
+
+import pytest
+
+from db.settings_store import BotSettingsStore
+
+
+class FakeSettingsClient:
+    """מחקה את iter_rows/select של SupabaseClient עבור bot_settings בלבד"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.iter_calls = 0
+        self.select_calls = 0
+
+    def iter_rows(self, table, filters=None):
+        self.iter_calls += 1
+        yield from [dict(r) for r in self.rows]
+
+    def select(self, table, filters=None, order=None, limit=None, columns=None):
+        self.select_calls += 1
+        latest = max((r['updated_at'] for r in self.rows), default=None)
+        return [{'updated_at': latest}] if latest else []
+
+
+class FakeAsyncSettingsClient(FakeSettingsClient):
+    async def iter_rows(self, table, filters=None):
+        self.iter_calls += 1
+        for row in [dict(r) for r in self.rows]:
+            yield row
+
+    async def select(self, table, filters=None, order=None, limit=None, columns=None):
+        return FakeSettingsClient.select(self, table)
+
+
+ROWS = [
+    {'key': 'order_chat', 'value': '@couriers', 'updated_at': '2025-04-01T10:00:00'},
+    {'key': 'admin_chat', 'value': '-100123', 'updated_at': '2025-04-02T10:00:00'},
+]
+
+
+def test_reads_are_served_from_snapshot():
+    """טעינה אחת, ואז קריאות מהזיכרון בלי בקשות נוספות"""
+    print("🧪 בדיקת קריאות מה-snapshot")
+    client = FakeSettingsClient(ROWS)
+    store = BotSettingsStore(client, None, refresh_interval=60)
+    assert store.get('order_chat') == '@couriers'
+    assert store.get('admin_chat') == '-100123'
+    assert store.get('missing', 'default') == 'default'
+    assert client.iter_calls == 1
+    assert client.select_calls == 0
+
+
+def test_refresh_reloads_only_when_version_changes():
+    """refresh טוען מחדש רק כש-max(updated_at) השתנה"""
+    print("🧪 בדיקת רענון לפי גרסה")
+    client = FakeSettingsClient([dict(r) for r in ROWS])
+    store = BotSettingsStore(client, None, refresh_interval=0)
+    store.load()
+    store.refresh()
+    assert client.iter_calls == 1  # אותה גרסה - אין טעינה מחדש
+
+    client.rows[0] = {'key': 'order_chat', 'value': '@new_group', 'updated_at': '2025-05-01T09:00:00'}
+    assert store.get('order_chat') == '@new_group'
+    assert client.iter_calls == 2
+
+
+def test_apply_write_updates_snapshot():
+    """write-through: אחרי set_bot_setting הערך החדש זמין מיד"""
+    print("🧪 בדיקת write-through")
+    store = BotSettingsStore(FakeSettingsClient(ROWS), None, refresh_interval=60)
+    store.load()
+    store.apply_write({'key': 'order_chat', 'value': '@other', 'updated_at': '2025-06-01T00:00:00'})
+    store.apply_write({'key': 'db_dir', 'value': '/data', 'updated_at': '2025-06-01T00:00:01'})
+    assert store.get('order_chat') == '@other'
+    assert store.has('db_dir')
+    assert store._version == '2025-06-01T00:00:01'
+
+
+def test_async_get_refreshes_in_background():
+    """get_async מחזיר מיד מה-snapshot ומרענן ברקע"""
+    print("🧪 בדיקת רענון אסינכרוני ברקע")
+    client = FakeAsyncSettingsClient([dict(r) for r in ROWS])
+    store = BotSettingsStore(None, client, refresh_interval=0)
+
+    async def scenario():
+        assert await store.get_async('order_chat') == '@couriers'
+        client.rows[0] = {'key': 'order_chat', 'value': '@new_group', 'updated_at': '2025-05-01T09:00:00'}
+        # הקריאה הזו עדיין מחזירה את הערך הישן ומתזמנת רענון
+        assert await store.get_async('order_chat') == '@couriers'
+        await store._refresh_task
+        store.refresh_interval = 60
+        assert await store.get_async('order_chat') == '@new_group'
+
+    asyncio.run(scenario())
+
+
+def test_sync_get_in_event_loop_does_not_block():
+    """get הסינכרוני בתוך ה-loop לא פונה ל-client הסינכרוני - הרענון רץ ברקע"""
+    sync_client = FakeSettingsClient(ROWS)
+    client = FakeAsyncSettingsClient([dict(r) for r in ROWS])
+    store = BotSettingsStore(sync_client, client, refresh_interval=0)
+
+    async def scenario():
+        await store.load_async()
+        client.rows[0] = {'key': 'order_chat', 'value': '@new_group', 'updated_at': '2025-05-01T09:00:00'}
+        assert store.get('order_chat') == '@couriers'
+        task = store._refresh_task
+        assert store.get('admin_chat') == '-100123' and store._refresh_task is task
+        await task
+        assert store.get('order_chat') == '@new_group'
+
+    asyncio.run(scenario())
+    assert sync_client.iter_calls == 0 and sync_client.select_calls == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
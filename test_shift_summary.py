@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+טסטים לסיכום המשמרת המצטבר (db/shift_summary.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import asyncio
+import json
+
+from db.shift_summary import ShiftAccumulator, merge_summary, parse_summary, summary_delta, summary_total
+
+
+class FakeAsyncClient:
+    def __init__(self, shift, orders=()):
+        self.shift = shift
+        self.orders = list(orders)
+        self.order_selects = 0
+
+    async def select(self, table, filters=None, columns=None, **kwargs):
+        assert table == 'shifts'
+        return [dict(self.shift)]
+
+    async def iter_rows(self, table, filters=None, page_size=1000, columns=None, key='id'):
+        assert table == 'orders' and filters['status'] == 'completed' and 'gte' in filters['delivered']
+        self.order_selects += 1
+        for order in self.orders:
+            yield order
+
+    async def update(self, table, data, filters=None):
+        assert table == 'shifts' and filters == {'id': self.shift['id']}
+        self.shift.update(data)
+        return [self.shift]
+
+
+def complete_order(shift, params):
+    """החלק של complete_order_with_stock שמגיע ל-bump_shift_summary (summary קיים) - מחזיר shift_summary"""
+    summary = merge_summary(parse_summary(shift['summary']) or {}, params['p_shift_delta'])
+    shift['summary'] = json.dumps(summary)
+    return json.loads(shift['summary'])
+
+
+def order(*items):
+    return {'id': 1, 'products': [{'name': name, 'quantity': quantity, 'total_price': price}
+                                  for name, quantity, price in items]}
+
+
+def test_summary_helpers():
+    """delta לפי שם מוצר, מיזוג, סכום; NULL -> None (עדיין לא נצבר)"""
+    print("🧪 בדיקת summary_delta / merge_summary")
+    delta = summary_delta(order(('Blue', 2, 100), ('Blue', 1, 50), ('Red', 1, 30))['products'])
+    assert delta == {'Blue': {'total_quantity': 3, 'total_price': 150}, 'Red': {'total_quantity': 1, 'total_price': 30}}
+    summary = merge_summary({'Blue': {'total_quantity': 1, 'total_price': 40}}, delta)
+    assert summary['Blue'] == {'total_quantity': 4, 'total_price': 190}
+    assert summary_total(summary) == 220
+    assert parse_summary(None) is None
+    assert parse_summary('') == {} and parse_summary('{bad') == {}
+
+
+def test_rollup_params_track_open_shift(monkeypatch):
+    """order_ready: הפרמטרים ל-RPC (delta + daily_stats) והסיכום שחזר בזיכרון; הסגירה לא סורקת הזמנות"""
+    import db.db as db_module
+
+    client = FakeAsyncClient({'id': 7, 'summary': '{}', 'opened_time': '2025-04-13T08:00:00'})
+    accumulator = ShiftAccumulator(client)
+    accumulator.start(7)
+
+    async def opened_shift():
+        return client.shift
+
+    monkeypatch.setattr(db_module, 'get_opened_shift_async', opened_shift)
+
+    async def run():
+        for products in (order(('Blue', 2, 100)), order(('Blue', 1, 50), ('Red', 1, 30))):
+            params = await db_module.order_rollup_params_async({**products, 'delivered': '2025-04-13T10:00:00'})
+            assert params['p_shift_id'] == 7
+            assert any(row['dimension'] == 'total' and row['day'] == '2025-04-13' for row in params['p_stats'])
+            accumulator.apply(params['p_shift_id'], complete_order(client.shift, params))
+        return params, await accumulator.get_summary({'id': 7})
+
+    params, summary = asyncio.run(run())
+    assert params['p_shift_delta'] == {'Blue': {'total_quantity': 1, 'total_price': 50},
+                                       'Red': {'total_quantity': 1, 'total_price': 30}}
+    assert summary == {'Blue': {'total_quantity': 3, 'total_price': 150}, 'Red': {'total_quantity': 1, 'total_price': 30}}
+    assert json.loads(client.shift['summary']) == summary
+    assert client.order_selects == 0
+
+
+def test_rollup_params_without_open_shift(monkeypatch):
+    """אין משמרת פתוחה - p_shift_id = None, והסיכום בזיכרון לא משתנה"""
+    import db.db as db_module
+
+    async def no_shift():
+        return None
+
+    monkeypatch.setattr(db_module, 'get_opened_shift_async', no_shift)
+    params = asyncio.run(db_module.order_rollup_params_async({**order(('Blue', 2, 100)), 'delivered': None}))
+    assert params['p_shift_id'] is None and params['p_stats'] == []
+
+    accumulator = ShiftAccumulator(FakeAsyncClient({'id': 7, 'summary': '{}'}))
+    accumulator.start(7)
+    accumulator.apply(params['p_shift_id'], {'Blue': {'total_quantity': 2, 'total_price': 100}})
+    assert asyncio.run(accumulator.get_summary({'id': 7})) == {}
+
+
+def test_accumulator_after_restart_and_legacy_shift():
+    """אחרי restart - מהשורה; משמרת בלי summary נבנית פעם אחת מההזמנות ונשמרת"""
+    client = FakeAsyncClient({'id': 7, 'summary': json.dumps({'Blue': {'total_quantity': 1, 'total_price': 50}})})
+    assert asyncio.run(ShiftAccumulator(client).get_summary({'id': 7}))['Blue']['total_price'] == 50
+
+    legacy = FakeAsyncClient({'id': 8, 'summary': None, 'opened_time': '2025-04-13T08:00:00'},
+                             orders=[order(('Red', 2, 60)), order(('Red', 1, 30))])
+    accumulator = ShiftAccumulator(legacy)
+    assert asyncio.run(accumulator.get_summary({'id': 8})) == {'Red': {'total_quantity': 3, 'total_price': 90}}
+    assert json.loads(legacy.shift['summary'])['Red']['total_quantity'] == 3
+    asyncio.run(accumulator.get_summary({'id': 8}))
+    assert legacy.order_selects == 1
+
+
+def test_apply_summary_from_complete_order_rpc():
+    """הסיכום שחזר מ-complete_order_with_stock הופך לסיכום בזיכרון; בלי משמרת / בלי סיכום - לא נוגעים"""
+    client = FakeAsyncClient({'id': 7, 'summary': '{}', 'opened_time': '2025-04-13T08:00:00'})
+    accumulator = ShiftAccumulator(client)
+    accumulator.start(7)
+    accumulator.apply(7, {'Blue': {'total_quantity': 2, 'total_price': 100}})
+    accumulator.apply(None, {'Red': {'total_quantity': 1, 'total_price': 30}})
+    accumulator.apply(7, None)
+    assert asyncio.run(accumulator.get_summary({'id': 7})) == {'Blue': {'total_quantity': 2, 'total_price': 100}}
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+טסטים לבניית query parameters של PostgREST ב-SupabaseClient
+לא דורש חיבור ל-Supabase
+"""
+
+import datetime
+
+import pytest
+
+from db.supabase_client import build_filter_params, build_select_params, build_page_params, parse_content_range_count
+
+
+def test_plain_values_are_eq_filters():
+    """ערך רגיל -> eq. (התנהגות קיימת)"""
+    print("🧪 בדיקת פילטר eq רגיל")
+    assert build_filter_params({'status': 'completed', 'id': 5}) == [
+        ('status', 'eq.completed'),
+        ('id', 'eq.5'),
+    ]
+    # ערך שכבר מתחיל ב-eq. לא מקבל prefix כפול
+    assert build_filter_params({'status': 'eq.closed'}) == [('status', 'eq.closed')]
+    assert build_filter_params(None) == []
+
+
+def test_operator_tuple_and_datetime():
+    """tuple של (אופרטור, ערך) ותאריכים ב-ISO"""
+    print("🧪 בדיקת אופרטורים gte/neq/like")
+    since = datetime.datetime(2025, 4, 13, 10, 30)
+    assert build_filter_params({'delivered': ('gte', since)}) == [('delivered', 'gte.2025-04-13T10:30:00')]
+    assert build_filter_params({'role': ('neq', 'guest')}) == [('role', 'neq.guest')]
+    assert build_filter_params({'client_name': ('like', '*Dan*')}) == [('client_name', 'like.*Dan*')]
+
+
+def test_range_on_same_column():
+    """טווח על אותה עמודה -> שני פרמטרים, כולל קיצורים >= / <="""
+    print("🧪 בדיקת טווח תאריכים")
+    params = build_filter_params({'created': {'>=': '2025-01-01', '<=': '2025-01-31'}})
+    assert params == [('created', 'gte.2025-01-01'), ('created', 'lte.2025-01-31')]
+
+
+def test_in_and_is_null():
+    """in.(...) עם quoting ו-is.null"""
+    print("🧪 בדיקת in / is")
+    assert build_filter_params({'id': ('in', [1, 2, 3])}) == [('id', 'in.(1,2,3)')]
+    assert build_filter_params({'name': ('in', ['a,b', 'c'])}) == [('name', 'in.("a,b",c)')]
+    assert build_filter_params({'courier_id': ('is', None)}) == [('courier_id', 'is.null')]
+    assert build_filter_params({'is_worker': ('is', True)}) == [('is_worker', 'is.true')]
+
+
+def test_unknown_operator_raises():
+    """אופרטור לא מוכר -> ValueError"""
+    with pytest.raises(ValueError):
+        build_filter_params({'created': {'between': (1, 2)}})
+
+
+def test_order_limit_offset():
+    """order / limit / offset"""
+    print("🧪 בדיקת order/limit/offset")
+    params = build_select_params({'status': 'completed'}, order=['delivered.desc', 'id'], limit=50, offset=100)
+    assert params == [
+        ('status', 'eq.completed'),
+        ('order', 'delivered.desc,id'),
+        ('limit', '50'),
+        ('offset', '100'),
+    ]
+    assert build_select_params(order='id.desc', limit=1) == [('order', 'id.desc'), ('limit', '1')]
+
+
+def test_column_projection():
+    """columns -> select= בתחילת ה-query"""
+    print("🧪 בדיקת select= (projection)")
+    assert build_select_params({'user_id': 7}, columns='role,lang') == [
+        ('select', 'role,lang'),
+        ('user_id', 'eq.7'),
+    ]
+    assert build_select_params(columns=['id', 'status']) == [('select', 'id,status')]
+    # בלי columns - אין select= (כל העמודות)
+    assert ('select', '*') not in build_select_params({'id': 1})
+
+
+def test_keyset_page_params():
+    """עמודים של iter_rows: order לפי key, limit, ו-key > last_key מהעמוד השני"""
+    print("🧪 בדיקת keyset pagination")
+    first = build_page_params({'status': 'completed'}, 'id', None, 500)
+    assert first == [('status', 'eq.completed'), ('order', 'id.asc'), ('limit', '500')]
+    
+    next_page = build_page_params({'status': 'completed'}, 'id', 1500, 500)
+    assert next_page[-1] == ('id', 'gt.1500')
+    
+    # key נוסף ל-projection כדי שאפשר יהיה להמשיך מהשורה האחרונה
+    projected = build_page_params(None, 'user_id', None, 100, columns='lang')
+    assert projected[0] == ('select', 'lang,user_id')
+
+
+def test_content_range_count():
+    """ספירת שורות מ-Content-Range (Prefer: count=exact)"""
+    print("🧪 בדיקת Content-Range")
+    assert parse_content_range_count('*/1234') == 1234
+    assert parse_content_range_count('0-9/10') == 10
+    assert parse_content_range_count('*/*') == 0
+    assert parse_content_range_count(None) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-TTLCache (db/cache.py)
+לא דורש חיבור ל-Supabase
+"""
+
+import time
+
+import pytest
+
+from db.cache import TTLCache
+
+
+def test_get_set_and_invalidate():
+    """set/get/invalidate בסיסי"""
+    print("🧪 בדיקת get/set/invalidate")
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get(1) is None
+    cache.set(1, {'role': 'admin', 'lang': 'he'})
+    assert cache.get(1) == {'role': 'admin', 'lang': 'he'}
+    cache.invalidate(1)
+    assert cache.get(1, 'missing') == 'missing'
+    assert cache.hits == 1 and cache.misses == 2
+
+
+def test_ttl_expiry(monkeypatch):
+    """פריט שפג תוקפו לא מוחזר ונמחק"""
+    print("🧪 בדיקת תפוגת TTL")
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set('k', 'v')
+    now[0] += 4
+    assert cache.get('k') == 'v'
+    now[0] += 2
+    assert cache.get('k') is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    """מעבר ל-maxsize מוציא את הפריט שהשתמשו בו הכי מזמן"""
+    print("🧪 בדיקת LRU")
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')          # a עכשיו הכי "טרי"
+    cache.set('c', 3)       # b יוצא
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
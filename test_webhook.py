@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+טסטים למצב ה-webhook (funcs/webhook.py)
+"""
+
+import json
+import re
+
+from telegram import Update
+
+import funcs.webhook as webhook
+
+
+def test_webhook_secret_is_valid_token():
+    """ה-secret שנגזר מ-BOT_TOKEN עומד בדרישות של טלגרם ויציב בין הרצות"""
+    print("🧪 בדיקת webhook_secret")
+    secret = webhook.webhook_secret()
+    assert re.fullmatch(r'[A-Za-z0-9_-]{1,256}', secret)
+    assert secret == webhook.webhook_secret()
+
+
+def test_record_update_appends_jsonl(tmp_path, monkeypatch):
+    """updates נכנסים נשמרים שורה לשורה - הקלט של webhook_selftest.py"""
+    import asyncio
+
+    path = tmp_path / 'updates.jsonl'
+    monkeypatch.setattr(webhook, 'WEBHOOK_RECORD_FILE', str(path))
+    raw = {'update_id': 7, 'message': {'message_id': 1, 'date': 0, 'chat': {'id': 5, 'type': 'private'}, 'text': 'שלום'}}
+    for update_id in (7, 8):
+        asyncio.run(webhook.record_update(Update.de_json({**raw, 'update_id': update_id}, None), None))
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['update_id'] for line in lines] == [7, 8]
+    assert json.loads(lines[0])['message']['text'] == 'שלום'
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+טסטים ל-pool של חשבונות ה-worker (funcs/worker_client.py)
+לא דורש חיבור לטלגרם
+"""
+
+import asyncio
+
+import pytest
+from pyrogram.errors import FloodWait
+
+from funcs.worker_client import NoWorkerSession, WorkerPool, WorkersThrottled, WorkerStopped
+
+
+class FakePyrogramClient:
+    def __init__(self, session, log, failures):
+        self.session = session
+        self.log = log
+        self.failures = failures
+        self.is_connected = False
+
+    async def start(self):
+        await asyncio.sleep(0.01)
+        self.log.append(('start', self.session['id']))
+        self.is_connected = True
+
+    async def stop(self):
+        self.log.append(('stop', self.session['id']))
+        self.is_connected = False
+
+    async def send_message(self, chat_id, text):
+        await asyncio.sleep(0.01)
+        failures = self.failures.get(self.session['id'])
+        if failures:
+            error = failures.pop(0)
+            if isinstance(error, ConnectionError):
+                self.is_connected = False
+            raise error
+        self.log.append(('send', self.session['id'], chat_id, text))
+        return text
+
+    async def get_me(self):
+        return {'id': self.session['id']}
+
+
+def make_pool(sessions, log, failures=None, max_flood_sleep=30):
+    failures = failures if failures is not None else {}
+
+    async def load_sessions():
+        return list(sessions)
+
+    def factory(session):
+        return FakePyrogramClient(session, log, failures)
+
+    return WorkerPool(health_interval=60, max_flood_sleep=max_flood_sleep,
+                      load_sessions=load_sessions, client_factory=factory)
+
+
+def sends(log):
+    return [entry[1:] for entry in log if entry[0] == 'send']
+
+
+def test_one_connection_per_account_and_load_balancing():
+    """שליחות במקביל מתחלקות בין החשבונות; חיבור אחד לכל חשבון"""
+    print("🧪 בדיקת pool: חיבור לכל חשבון + איזון עומסים")
+    log = []
+    pool = make_pool([{'id': 1, 'string': 'a'}, {'id': 2, 'string': 'b'}], log)
+
+    async def run():
+        results = await asyncio.gather(*(pool.send_message(f'@c{i}', f'm{i}') for i in range(6)))
+        await pool.stop()
+        return results
+
+    assert asyncio.run(run()) == [f'm{i}' for i in range(6)]
+    assert sorted(entry for entry in log if entry[0] == 'start') == [('start', 1), ('start', 2)]
+    per_account = [account for account, _, _ in sends(log)]
+    assert per_account.count(1) == 3 and per_account.count(2) == 3
+
+
+def test_client_is_pinned_to_one_account():
+    """אותו לקוח - אותו חשבון (גם '@Dan' וגם 'dan')"""
+    log = []
+    pool = make_pool([{'id': 1, 'string': 'a'}, {'id': 2, 'string': 'b'}], log)
+
+    async def run():
+        await pool.send_message('@Dan', 'first')
+        await pool.send_message('@eli', 'other')
+        await pool.send_message('dan', 'second')
+        await pool.stop()
+
+    asyncio.run(run())
+    accounts = {text: account for account, _, text in sends(log)}
+    assert accounts['first'] == accounts['second'] != accounts['other']
+
+
+def test_flood_wait_routes_to_another_account():
+    """FloodWait -> ההודעה עוברת לחשבון אחר והחשבון החסום לא נבחר; כולם חסומים -> WorkersThrottled"""
+    log = []
+    failures = {1: [FloodWait(value=120)]}
+    pool = make_pool([{'id': 1, 'string': 'a'}, {'id': 2, 'string': 'b'}], log, failures)
+
+    async def run():
+        await pool.send_message('@dan', 'first')
+        await pool.send_message('@eli', 'second')
+        status = {account['id']: account for account in pool.status()}
+        failures[2] = [FloodWait(value=300)]
+        with pytest.raises(WorkersThrottled):
+            await pool.send_message('@dan', 'third')
+        await pool.stop()
+        return status
+
+    status = asyncio.run(run())
+    assert sends(log) == [(2, '@dan', 'first'), (2, '@eli', 'second')]
+    assert status[1]['flood_wait'] > 100 and status[2]['sent'] == 2
+
+
+def test_reconnect_and_invalidate():
+    """חיבור שנפל נפתח מחדש; invalidate טוען את רשימת ה-workers מחדש"""
+    log = []
+    sessions = [{'id': 1, 'string': 'a'}]
+    pool = make_pool(sessions, log, {1: [ConnectionError('connection lost')]})
+
+    async def run():
+        await pool.send_message('@a', 'first')
+        sessions[0] = {'id': 2, 'string': 'b'}
+        pool.invalidate()
+        await pool.send_message('@a', 'second')
+        await pool.stop()
+
+    asyncio.run(run())
+    assert sends(log) == [(1, '@a', 'first'), (2, '@a', 'second')]
+    assert [entry for entry in log if entry[0] == 'start'] == [('start', 1), ('start', 1), ('start', 2)]
+
+
+def test_no_worker_session():
+    pool = make_pool([], [])
+
+    with pytest.raises(NoWorkerSession):
+        asyncio.run(pool.send_message('@a', 'text'))
+
+
+def test_session_replaced_mid_send():
+    """session שהוחלף באמצע שליחה: ההודעה שבשליחה נכשלת, ההודעות שבתור עוברות לחשבון החדש - אף אחת לא נתקעת"""
+    log = []
+    sessions = [{'id': 1, 'string': 'a'}]
+    pool = make_pool(sessions, log)
+
+    async def run():
+        tasks = [asyncio.create_task(pool.send_message('@a', f'm{i}')) for i in range(3)]
+        await asyncio.sleep(0.015)  # חיבור (0.01) - m0 באמצע השליחה
+        sessions[0] = {'id': 1, 'string': 'b'}
+        pool.invalidate()
+        await pool._refresh()
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=1)
+        await pool.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert isinstance(results[0], WorkerStopped) and results[0].started
+    assert results[1:] == ['m1', 'm2']
+    assert sends(log) == [(1, '@a', 'm1'), (1, '@a', 'm2')]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+בדיקה מקומית של מצב ה-webhook: שליחת updates מוקלטים לשרת ה-webhook של הבוט
+
+שימוש:
+    python webhook_selftest.py updates.jsonl                 # ל-http://127.0.0.1:$PORT/$WEBHOOK_PATH
+    python webhook_selftest.py updates.jsonl http://host:8080/telegram
+
+updates.jsonl - update אחד בכל שורה (JSON של Telegram), למשל מ-WEBHOOK_RECORD_FILE של הבוט.
+הבקשות נשלחות עם X-Telegram-Bot-Api-Secret-Token כמו מטלגרם. בנוסף נבדק ש-secret שגוי נדחה (403).
+ה-updates מטופלים כרגיל - עדיף להריץ מול בוט ו-DB של בדיקות.
+"""
+
+import asyncio
+import json
+import sys
+import os
+import time
+
+# הוספת הנתיב לפרויקט
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from funcs.webhook import webhook_secret, webhook_local_url
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def load_updates(path: str) -> list:
+    with open(path, encoding='utf-8') as file:
+        text = file.read().strip()
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def selftest(path: str, url: str) -> bool:
+    updates = load_updates(path)
+    print(f"🚀 שולח {len(updates)} updates ל-{url}")
+    ok = True
+    async with httpx.AsyncClient(timeout=10) as client:
+        rejected = await client.post(url, json=updates[0] if updates else {}, headers={SECRET_HEADER: 'wrong'})
+        if rejected.status_code != 403:
+            print(f"❌ secret שגוי התקבל: HTTP {rejected.status_code}")
+            ok = False
+
+        for update in updates:
+            started = time.perf_counter()
+            response = await client.post(url, json=update, headers={SECRET_HEADER: webhook_secret()})
+            elapsed = (time.perf_counter() - started) * 1000
+            status = '✅' if response.status_code == 200 else '❌'
+            ok = ok and response.status_code == 200
+            print(f"{status} update {update.get('update_id')}: HTTP {response.status_code} ({elapsed:.0f} ms)")
+    print("🎉 הבדיקה עברה" if ok else "❌ הבדיקה נכשלה")
+    return ok
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    url = sys.argv[2] if len(sys.argv) > 2 else webhook_local_url()
+    sys.exit(0 if asyncio.run(selftest(sys.argv[1], url)) else 1)